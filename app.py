@@ -18,7 +18,6 @@ from viktor.result import (
     DownloadResult)
 
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
 from io import StringIO
 import fkit
@@ -147,11 +146,9 @@ class Controller(ViktorController):
 
         # plot geometry
         fig, axs = plt.subplots(1,3,figsize=(16,9))
-        for f in section.node_fibers:
-            radius = (f.area/3.1415926)**(0.5)
-            axs[0].add_patch(patches.Circle(f.coord,radius=radius,facecolor=f.default_color,edgecolor="black",zorder=2,lw=2))
-        for f in section.patch_fibers:
-            axs[0].add_patch(patches.Polygon(np.array(f.vertices),closed=True,facecolor=f.default_color,edgecolor="black",zorder=1,lw=1.0))
+        patch_colors = [f.default_color for f in section.patch_fibers]
+        node_colors = [f.default_color for f in section.node_fibers]
+        fkit.plotter.add_fiber_collections(axs[0], section, patch_colors, node_colors, node_lw=2, rasterize=True)
         axs[0].scatter(section.centroid[0], section.centroid[1], c="red", marker="x",linewidth=3, s=240, zorder=3)
         axs[0].xaxis.grid()
         axs[0].yaxis.grid()
@@ -242,7 +239,7 @@ class Controller(ViktorController):
         MK_results = section.run_moment_curvature(phi_target=params.section4.phi_target, P=params.section4.pu)
 
         # plot results
-        fig = fkit.plotter.plot_MK(section)
+        fig = fkit.plotter.plot_MK(section, rasterize=True)
 
 
         svg_data = StringIO()
@@ -293,7 +290,7 @@ class Controller(ViktorController):
         PM_results = section.run_PM_interaction(fpc=params.section2.fpc1, fy=params.section2.fy, Es=params.section2.Es)
 
         # plot PM interaction surface
-        fig=fkit.plotter.plot_PM(section)
+        fig=fkit.plotter.plot_PM(section, rasterize=True)
 
         svg_data = StringIO()
         fig.savefig(svg_data, format='svg')
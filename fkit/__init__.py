@@ -1,5 +1,35 @@
-import fkit.nodefiber
-import fkit.patchfiber
-import fkit.section
-import fkit.sectionbuilder
-import fkit.plotter
\ No newline at end of file
+import importlib
+import logging
+
+# submodules are imported on first attribute access (e.g. fkit.plotter) so that
+# matplotlib and friends are only loaded when actually needed
+__all__ = ["nodefiber",
+           "patchfiber",
+           "section",
+           "sectionbuilder",
+           "plotter",
+           "postprocessor",
+           "asyncrunner",
+           "batchrunner",
+           "profiler",
+           "progress",
+           "convergence",
+           "hysteresis",
+           "kernels",
+           "tabulation",
+           "compiled",
+           "member"]
+
+# library default: no output unless the application configures logging or opts in with
+# fkit.progress.set_verbosity(). Attached here so that importing any submodule is enough
+logging.getLogger("fkit").addHandler(logging.NullHandler())
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module("fkit." + name)
+    raise AttributeError("module 'fkit' has no attribute '{}'".format(name))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,4 @@
+import sys
+import fkit.batchrunner
+
+sys.exit(fkit.batchrunner.main())
@@ -0,0 +1,135 @@
+"""
+Asyncio-friendly wrappers around the blocking analysis entry points.
+
+Analyses are offloaded to a shared process pool so that an event loop (e.g. a web service
+handling many users) is never blocked by CPU-bound work. Each coroutine can be scheduled
+with asyncio.create_task() to obtain a future which may be cancelled, for example when a
+user changes inputs mid-run.
+
+Because the analysis runs in another process, the section object passed in is not modified.
+The analyzed copy of the section is returned instead. export_data_async() creates the output
+folder on the section passed in and returns its path.
+
+Example:
+    task = asyncio.create_task(fkit.asyncrunner.run_moment_curvature_async(section, phi_target=0.0005))
+    ...
+    task.cancel()                   # user changed inputs
+    ...
+    section = await task            # analyzed section with table_MK, fiber history, etc.
+"""
+import asyncio
+import concurrent.futures
+import multiprocessing
+
+
+_executor = None
+_manager = None
+
+
+def get_executor(max_workers=None):
+    """
+    Return the shared process pool, creating it on first use.
+    Arguments:
+        max_workers     number of worker processes. Only used when the pool is first created.
+                            OPTIONAL: default = None (number of CPUs)
+    """
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    return _executor
+
+
+def get_manager():
+    """
+    Return the shared multiprocessing manager used to signal cancellation to running workers.
+    """
+    global _manager
+    if _manager is None:
+        _manager = multiprocessing.Manager()
+    return _manager
+
+
+def shutdown(wait=True):
+    """
+    Shut down the shared process pool and manager. They are re-created on next use.
+    """
+    global _executor, _manager
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
+
+async def run_moment_curvature_async(section, phi_target, P=0, N_step=100):
+    """
+    Non-blocking version of section.run_moment_curvature(). Cancelling the awaiting task
+    stops the analysis at the next converged step.
+    Arguments:
+        see section.run_moment_curvature()
+    Returns:
+        section         analyzed copy of the section
+    """
+    cancel_event = get_manager().Event()
+    kwargs = {"phi_target": phi_target, "P": P, "N_step": N_step}
+    return await submit(_run_moment_curvature_job, section, cancel_event, kwargs, cancel_event=cancel_event)
+
+
+async def run_PM_interaction_async(section, fpc, fy, Es):
+    """
+    Non-blocking version of section.run_PM_interaction(). Cancelling the awaiting task
+    stops the analysis after the next orientation is solved.
+    Arguments:
+        see section.run_PM_interaction()
+    Returns:
+        section         analyzed copy of the section
+    """
+    cancel_event = get_manager().Event()
+    kwargs = {"fpc": fpc, "fy": fy, "Es": Es}
+    return await submit(_run_PM_interaction_job, section, cancel_event, kwargs, cancel_event=cancel_event)
+
+
+async def export_data_async(section, file_format="csv", compression=None):
+    """
+    Non-blocking version of section.export_data(). The output folder is created (see
+    section.create_output_folder()) on the section passed in, so repeated exports of the
+    same section go to the same folder.
+    Arguments:
+        see section.export_data()
+    Returns:
+        output_dir      folder the results were exported to
+    """
+    if not section.folder_created:
+        section.create_output_folder()
+    return await submit(_export_data_job, section, file_format, compression)
+
+
+async def submit(function, *args, cancel_event=None):
+    """
+    Run function(*args) in the shared process pool and await the result. If the awaiting
+    task is cancelled, cancel_event (if provided) is set so the worker can stop early.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), function, *args)
+    try:
+        return await future
+    except asyncio.CancelledError:
+        if cancel_event is not None:
+            cancel_event.set()
+        raise
+
+
+def _run_moment_curvature_job(section, cancel_event, kwargs):
+    section.run_moment_curvature(**kwargs, callback=lambda result: not cancel_event.is_set())
+    return section
+
+
+def _run_PM_interaction_job(section, cancel_event, kwargs):
+    section.run_PM_interaction(**kwargs, callback=lambda result: not cancel_event.is_set())
+    return section
+
+
+def _export_data_job(section, file_format, compression):
+    section.export_data(file_format=file_format, compression=compression)
+    return section.output_dir
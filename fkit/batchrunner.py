@@ -0,0 +1,273 @@
+"""
+Headless batch runner for section analyses.
+
+Usage:
+    python -m fkit manifest.yaml --output results --workers 4 --format csv
+
+A manifest (JSON or YAML) defines materials, sections and jobs:
+
+    materials:
+        unconfined: {type: patchfiber.Todeschini, fpc: 5}
+        steel:      {type: nodefiber.Bilinear, fy: 60, fu: 90, Es: 29000}
+    sections:
+        col1:
+            builder: rectangular
+            width: 18
+            height: 18
+            cover: 1.5
+            top_bar: [0.6, 3, 1, 0]
+            bot_bar: [0.6, 3, 1, 0]
+            concrete_fiber: unconfined
+            steel_fiber: steel
+        col2:
+            patches: [{xo: 0, yo: 0, b: 18, h: 18, nx: 25, ny: 25, fiber: unconfined}]
+            bar_groups: [{xo: 2, yo: 2, b: 14, h: 14, nx: 3, ny: 3, area: 0.6, perimeter_only: true, fiber: steel}]
+            bars: [{coord: [9, 9], area: 1.0, fiber: steel}]
+            rotate: 45
+    jobs:
+        - {name: col1_MK, section: col1, analysis: moment_curvature, options: {phi_target: 0.0006, P: -180}}
+        - {name: col1_PM, section: col1, analysis: PM_interaction, options: {fpc: 5, fy: 60, Es: 29000}}
+        - {name: col1_PM_fiber, section: col1, analysis: fiber_PM_interaction, options: {ecu: -0.003, esu: 0.05}}
+
+A section is either built by a sectionbuilder function ("builder") or assembled from patches, bar groups
+and bars. Any argument ending with "fiber" refers to a material by name, or defines one inline as a
+dictionary with a "type" key. Jobs may also define their section inline instead of by name.
+
+A CSV manifest has one job per row. Nested keys are written with dots in the column header
+(e.g. "section.builder", "section.width", "options.phi_target") and cells are parsed as JSON where
+possible (e.g. [0.6, 3, 1, 0] or {"type": "nodefiber.Bilinear", "fy": 60}). Materials must be defined inline.
+
+Results of each job are written to <output>/<job name>.<format>. A summary with status, error message
+and elapsed time of each job is written to <output>/summary.<format>.
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import logging
+import os
+import time
+import fkit.nodefiber
+import fkit.patchfiber
+import fkit.section
+import fkit.sectionbuilder
+import fkit.progress
+
+
+logger = logging.getLogger(__name__)
+
+
+ANALYSES = ["moment_curvature", "biaxial_moment_curvature", "cyclic_moment_curvature", "MK_surface", "PM_interaction", "fiber_PM_interaction"]
+FORMATS = ["csv", "parquet"]
+SUMMARY_COLUMNS = ["Job", "Section", "Analysis", "Status", "Error", "MeshTime", "AnalysisTime"]
+
+
+def load_manifest(path):
+    """
+    Read a JSON, YAML, or CSV manifest. Returns a dictionary with keys "materials", "sections", "jobs".
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="") as f:
+        if extension == ".json":
+            manifest = json.load(f)
+        elif extension in [".yaml", ".yml"]:
+            import yaml
+            manifest = yaml.safe_load(f)
+        elif extension == ".csv":
+            manifest = {"jobs": [unflatten(row) for row in csv.DictReader(f)]}
+        else:
+            raise ValueError("Unknown manifest format: {}. Use .json, .yaml, or .csv".format(extension))
+
+    manifest.setdefault("materials", {})
+    manifest.setdefault("sections", {})
+    manifest.setdefault("jobs", [])
+    for i, job in enumerate(manifest["jobs"]):
+        job.setdefault("name", "job{}".format(i))
+        job.setdefault("options", {})
+    return manifest
+
+
+def unflatten(row):
+    """
+    Convert a CSV row with dotted column names into a nested dictionary. Cells are parsed as JSON where possible.
+    """
+    result = dict()
+    for key, value in row.items():
+        if value is None or value == "":
+            continue
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        target = result
+        keys = key.split(".")
+        for k in keys[:-1]:
+            target = target.setdefault(k, {})
+        target[keys[-1]] = value
+    return result
+
+
+def build_material(spec, materials):
+    """
+    Create a fiber object from a material name or an inline dictionary (e.g. {"type": "patchfiber.Mander", "fpc": 6})
+    """
+    if isinstance(spec, str):
+        spec = materials[spec]
+    params = dict(spec)
+    module_name, class_name = params.pop("type").split(".")
+    if module_name not in ["patchfiber", "nodefiber"]:
+        raise ValueError("Unknown fiber module: {}".format(module_name))
+    module = getattr(fkit, module_name)
+    return getattr(module, class_name)(**params)
+
+
+def resolve_fibers(args, materials):
+    """Replace every argument ending with "fiber" by the corresponding fiber object"""
+    return {k: build_material(v, materials) if k.endswith("fiber") else v for k, v in args.items()}
+
+
+def build_section(spec, sections, materials):
+    """
+    Create a meshed section from a section name or an inline dictionary.
+    """
+    if isinstance(spec, str):
+        spec = sections[spec]
+    spec = dict(spec)
+
+    if "builder" in spec:
+        builder = getattr(fkit.sectionbuilder, spec.pop("builder"))
+        return builder(**resolve_fibers(spec, materials))
+
+    section = fkit.section.Section()
+    for patch in spec.get("patches", []):
+        section.add_patch(**resolve_fibers(patch, materials))
+    for bar_group in spec.get("bar_groups", []):
+        section.add_bar_group(**resolve_fibers(bar_group, materials))
+    for bar in spec.get("bars", []):
+        section.add_bar(**resolve_fibers(bar, materials))
+    section.mesh(rotate=spec.get("rotate", 0))
+    return section
+
+
+def run_job(job, sections, materials, verbose=False):
+    """
+    Run a single job. Never raises; failures are reported in the returned summary.
+    Returns:
+        summary         dictionary with job name, status, error message, and elapsed time
+        table           result dataframe (None if failed)
+    """
+    summary = get_summary(job)
+    table = None
+    try:
+        with fkit.progress.verbosity(logging.INFO if verbose else None):
+            if job["analysis"] not in ANALYSES:
+                raise ValueError("Unknown analysis: {}. Use one of {}".format(job["analysis"], ANALYSES))
+            time_start = time.time()
+            section = build_section(job["section"], sections, materials)
+            time_mesh = time.time()
+            table = getattr(section, "run_" + job["analysis"])(**job["options"])
+            time_end = time.time()
+        summary["MeshTime"] = time_mesh - time_start
+        summary["AnalysisTime"] = time_end - time_mesh
+    except Exception as error:
+        summary = get_summary(job, error)
+    return summary, table
+
+
+def get_summary(job, error=None):
+    """
+    Summary of a job. Missing keys are left blank so that malformed jobs can still be reported
+    """
+    section = job.get("section", "")
+    summary = {"Job": job.get("name", ""),
+               "Section": section if isinstance(section, str) else "inline",
+               "Analysis": job.get("analysis", ""),
+               "Status": "success",
+               "Error": "",
+               "MeshTime": 0.0,
+               "AnalysisTime": 0.0}
+    if error is not None:
+        summary["Status"] = "failed"
+        summary["Error"] = "{}: {}".format(type(error).__name__, error)
+    return summary
+
+
+def run_batch(manifest, output_dir, n_workers=1, file_format="csv", verbose=False):
+    """
+    Run all jobs in a manifest and write results to output_dir.
+    Arguments:
+        manifest        dictionary returned by load_manifest()
+        output_dir      folder to write results to. Created if it does not exist
+        n_workers       number of worker processes. Jobs are run in the current process if n_workers = 1
+                            OPTIONAL: default = 1
+        file_format     "csv" or "parquet"
+                            OPTIONAL: default = "csv"
+        verbose         flag to show analysis log output. Batch runs are silent otherwise
+                            OPTIONAL: default = False
+    Returns:
+        df_summary      a dataframe with status and timing of each job
+    """
+    if file_format not in FORMATS:
+        raise ValueError("Unknown format: {}. Use one of {}".format(file_format, FORMATS))
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = manifest["jobs"]
+    args = (manifest["sections"], manifest["materials"], verbose)
+
+    if n_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(run_job, job, *args) for job in jobs]
+            results = []
+            for job, future in zip(jobs, futures):
+                # a worker that dies (e.g. BrokenProcessPool) fails its job only
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    results.append((get_summary(job, error), None))
+    else:
+        results = [run_job(job, *args) for job in jobs]
+
+    for summary, table in results:
+        if table is not None:
+            write_table(table, os.path.join(output_dir, summary["Job"]), file_format)
+    summary_dict = {column: [summary[column] for summary, _ in results] for column in SUMMARY_COLUMNS}
+    df_summary = fkit.section.create_table(summary_dict)
+    write_table(df_summary, os.path.join(output_dir, "summary"), file_format)
+    return df_summary
+
+
+def parquet_available():
+    """Check if a parquet engine (pyarrow or fastparquet) is installed"""
+    import importlib.util
+    return any(importlib.util.find_spec(engine) is not None for engine in ["pyarrow", "fastparquet"])
+
+
+def write_table(table, filename, file_format):
+    if file_format == "parquet":
+        table.to_parquet(filename + ".parquet")
+    else:
+        table.to_csv(filename + ".csv", index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m fkit", description="Run fkit section analyses defined in a manifest")
+    parser.add_argument("manifest", help="manifest file (.json, .yaml, or .csv)")
+    parser.add_argument("-o", "--output", default="exported_data_fkit", help="output folder (default: exported_data_fkit)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="csv", help="output file format (default: csv)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show analysis log output and job summary")
+    args = parser.parse_args(argv)
+    if args.format == "parquet" and not parquet_available():
+        parser.error("parquet output requires pyarrow or fastparquet")
+
+    fkit.progress.set_verbosity(logging.INFO if args.verbose else None)
+    time_start = time.time()
+    manifest = load_manifest(args.manifest)
+    df_summary = run_batch(manifest, args.output, args.workers, args.format, args.verbose)
+
+    N_failed = 0
+    for _, row in df_summary.iterrows():
+        logger.info("%-30s %-26s %-8s %8.2f s  %s", row["Job"], row["Analysis"], row["Status"],
+                    row["MeshTime"] + row["AnalysisTime"], row["Error"])
+        N_failed += row["Status"] == "failed"
+    logger.info("%d jobs completed (%d failed). Elapsed time: %.2f seconds", len(df_summary), N_failed, time.time() - time_start)
+    return 1 if N_failed > 0 else 0
@@ -0,0 +1,102 @@
+"""
+Batch evaluation of section response for external solvers.
+
+Force-based and displacement-based frame elements call the section constitutive law at every
+integration point of every element in every iteration. CompiledSection maps arrays of section
+deformations to stress resultants (and optionally the section tangent stiffness) directly from
+the fiber arrays:
+
+    deformation = [eps0, kx, ky]        strain = eps0 + kx*dy + ky*dx    (see section.evaluate_strain_plane)
+    forces      = [N, Mx, My]           N = sum(stress*area), Mx = sum(stress*area*dy), My = sum(stress*area*dx)
+    tangent     = d(forces)/d(deformation)
+
+All strain planes of a batch are evaluated at once. Fiber strains are a single matrix product of the
+deformations with the fiber geometry matrix B = [1, dy, dx], each material evaluates all of its fibers
+of all planes in one stress_strain_array() call, and resultants are reduced with another matrix product.
+Fibers are reordered by material so that each material works on a contiguous block of columns rather
+than a gathered copy. Large batches are split into chunks to bound memory.
+
+A CompiledSection is a snapshot of the section's fiber arrays, materials, and material tables at the
+time it is created. It only holds numpy arrays and material objects, so it can be pickled and sent
+to worker processes. Materials follow their monotonic stress-strain relationship.
+
+Example:
+    compiled = section.compile()
+    deformation = np.column_stack([eps0_array, kx_array, np.zeros(n)])
+    forces, tangent = compiled.evaluate(deformation, tangent=True)      # shapes (n,3) and (n,3,3)
+"""
+import numpy as np
+
+
+class CompiledSection:
+    """
+    Compiled section used for batch evaluation of strain planes
+        fiber_order         section fiber index of each compiled fiber. Fibers are sorted by material
+        fiber_area          array of fiber areas (in compiled order)
+        B                   fiber geometry matrix [1, dy, dx] of shape (N_fiber, 3)
+        BB                  products B[:,i]*B[:,j] of shape (N_fiber, 9) used to assemble the tangent
+        material_groups     list of [curve, fiber_slice]. curve is the material or its TabulatedCurve
+        chunk_size          maximum number of fiber strains (planes x fibers) evaluated at once
+    """
+    def __init__(self, section, chunk_size=2_000_000):
+        if section.fiber_area is None:
+            raise RuntimeError("Section has not been meshed. Please call section.mesh() first")
+        self.material_groups = []
+        start = 0
+        for material, indices in section.material_groups:
+            self.material_groups.append([section.material_tables.get(material, material), slice(start, start + len(indices))])
+            start += len(indices)
+        self.fiber_order = np.concatenate([indices for material, indices in section.material_groups]).astype(int)
+        
+        self.fiber_area = section.fiber_area[self.fiber_order]
+        ecc = section.fiber_ecc[self.fiber_order]
+        self.B = np.column_stack([np.ones(len(self.fiber_area)), ecc[:,1], ecc[:,0]])
+        self.BB = (self.B[:,:,None] * self.B[:,None,:]).reshape(-1,9)
+        self.chunk_size = chunk_size
+
+    @property
+    def N_fiber(self):
+        return len(self.fiber_area)
+
+    def get_strain(self, deformation):
+        """fiber strains of each strain plane in compiled fiber order (see fiber_order). Shape = (N_plane, N_fiber)"""
+        return np.atleast_2d(deformation) @ self.B.T
+
+    def evaluate(self, deformation, tangent=False):
+        """
+        Stress resultants of an array of strain planes.
+        Arguments:
+            deformation     section deformations [eps0, kx, ky]. Shape = (3,) or (N_plane, 3)
+            tangent         flag to also return the section tangent stiffness (see section.get_section_tangent)
+                                OPTIONAL: default = False
+        Returns:
+            forces          [N, Mx, My] of each strain plane. Shape = (3,) or (N_plane, 3)
+            K               (if tangent = True) tangent stiffness of each plane. Shape = (3,3) or (N_plane, 3, 3)
+        """
+        deformation = np.asarray(deformation, dtype=float)
+        single = deformation.ndim == 1
+        deformation = deformation.reshape(-1,3)
+
+        N_plane = len(deformation)
+        forces = np.empty((N_plane, 3))
+        K = np.empty((N_plane, 9)) if tangent else None
+        step = max(1, self.chunk_size // max(self.N_fiber, 1))
+        for start in range(0, N_plane, step):
+            chunk = slice(start, start + step)
+            strain = self.get_strain(deformation[chunk])
+            stress = np.empty(strain.shape)
+            for curve, fibers in self.material_groups:
+                stress[:, fibers] = curve.stress_strain_array(strain[:, fibers])
+            forces[chunk] = (stress * self.fiber_area) @ self.B
+            if tangent:
+                Et = np.empty(strain.shape)
+                for curve, fibers in self.material_groups:
+                    Et[:, fibers] = curve.tangent_array(strain[:, fibers])
+                K[chunk] = (Et * self.fiber_area) @ self.BB
+
+        if single:
+            forces = forces[0]
+            K = K[0].reshape(3,3) if tangent else None
+        elif tangent:
+            K = K.reshape(-1,3,3)
+        return (forces, K) if tangent else forces
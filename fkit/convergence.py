@@ -0,0 +1,144 @@
+"""
+Mesh convergence study.
+
+Mesh density of the sectionbuilder functions (mesh_nx, mesh_ny, mesh_n) trades accuracy for speed.
+find_mesh_density() analyzes a section at increasing densities and returns the coarsest mesh whose
+moment curvature peak moment and PM interaction capacities are within a tolerance of the next finer mesh.
+
+Example:
+    def build(density):
+        return fkit.sectionbuilder.rectangular(18, 24, 1.5, [0.6,3,1,0], [0.6,3,1,0], fc, fs,
+                                               mesh_nx=density, mesh_ny=density)
+    density, df_study = fkit.convergence.find_mesh_density(build, phi_target=0.0006, PM_args={"fpc":5, "fy":60, "Es":29000})
+"""
+import logging
+import math
+import time
+import numpy as np
+import fkit.progress
+import fkit.section
+
+
+logger = logging.getLogger(__name__)
+DENSITIES = [0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0]
+
+
+def find_mesh_density(build_section, phi_target=None, P=0, N_step=50, PM_args=None, densities=None, tol=0.01):
+    """
+    Run moment curvature and/or PM interaction analyses at increasing mesh densities until results converge.
+    Arguments:
+        build_section   function that takes a mesh density and returns a meshed section object
+                            example: lambda n: fkit.sectionbuilder.circular(..., mesh_n=n)
+        phi_target      target curvature of moment curvature analysis (see section.run_moment_curvature)
+                            OPTIONAL: default = None (skip moment curvature)
+        P               applied axial load of moment curvature analysis (-ve is compression)
+                            OPTIONAL: default = 0
+        N_step          number of curvature increments
+                            OPTIONAL: default = 50
+        PM_args         dictionary of arguments of section.run_PM_interaction() (fpc, fy, Es)
+                            OPTIONAL: default = None (skip PM interaction)
+        densities       mesh densities to try in increasing order
+                            OPTIONAL: default = [0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0]
+        tol             maximum relative change between consecutive densities
+                            OPTIONAL: default = 0.01 (1%)
+    Returns:
+        density         coarsest adequate mesh density. The finest density tried if results did not converge
+        df_study        a dataframe with fiber count, results, relative change, and elapsed time of each density
+
+    Algorithm:
+        0.) build section at the next density and count fibers
+        1.) moment curvature is solved with the vectorized strain plane solver (neutral axis parallel to x-axis).
+            The converged strain plane of the previous density at the same curvature is used as initial guess,
+            so finer meshes usually converge in one or two iterations
+        2.) PM interaction capacities: maximum compression, maximum tension, maximum moment at 0 and 180 degrees
+        3.) change of each quantity with respect to the previous density is compared to tol. Axial capacities are
+            normalized by the range of axial capacity and moments by the largest moment capacity, so that
+            quantities close to zero do not dominate. Once an analysis has converged it is not repeated
+            at finer densities
+        4.) the adequate density is the coarsest density of the first converged pair for all analyses
+    """
+    if phi_target is None and PM_args is None:
+        raise ValueError("Please specify phi_target and/or PM_args")
+    densities = DENSITIES if densities is None else sorted(densities)
+    phi_list = None if phi_target is None else np.linspace(phi_target/10000, phi_target, num=N_step)
+    keys_MK = [] if phi_target is None else ["PeakMoment"]
+    keys_PM = [] if PM_args is None else ["P_compression", "P_tension", "Mx_0", "Mx_180"]
+
+    study = {key: [] for key in ["Density", "N_fiber"] + keys_MK + keys_PM + ["Change", "Time"]}
+    x_previous = None
+    converged_at = {"MK": None if keys_MK else -1, "PM": None if keys_PM else -1}
+
+    # silence per-analysis messages of each level
+    level = max(logging.WARNING, logging.getLogger("fkit").getEffectiveLevel())
+    for i, density in enumerate(densities):
+        time_start = time.time()
+        section = build_section(density)
+        row = dict.fromkeys(keys_MK + keys_PM, math.nan)
+
+        if converged_at["MK"] is None:
+            row["PeakMoment"], x_previous = get_peak_moment(section, phi_list, P, x_previous)
+        if converged_at["PM"] is None:
+            with fkit.progress.verbosity(level):
+                table = section.run_PM_interaction(**PM_args)
+            row["P_compression"] = table["P"].min()
+            row["P_tension"] = table["P"].max()
+            row["Mx_0"] = table["Mx"][table["Rotation"] == 0].abs().max()
+            row["Mx_180"] = table["Mx"][table["Rotation"] == 180].abs().max()
+
+        # relative change with respect to previous density
+        change = math.nan
+        if i > 0:
+            scale = {"PeakMoment": abs(study["PeakMoment"][-1]) if keys_MK else 0}
+            if keys_PM:
+                scale["P_compression"] = scale["P_tension"] = study["P_tension"][-1] - study["P_compression"][-1]
+                scale["Mx_0"] = scale["Mx_180"] = max(study["Mx_0"][-1], study["Mx_180"][-1])
+            for name, keys in [("MK", keys_MK), ("PM", keys_PM)]:
+                if converged_at[name] is not None:
+                    continue
+                change_i = max(abs(row[k] - study[k][-1]) / max(scale[k], 1e-12) for k in keys)
+                change = change_i if math.isnan(change) else max(change, change_i)
+                if change_i < tol:
+                    converged_at[name] = i
+
+        study["Density"].append(density)
+        study["N_fiber"].append(len(section.patch_fibers) + len(section.node_fibers))
+        for k in keys_MK + keys_PM:
+            study[k].append(row[k])
+        study["Change"].append(change)
+        study["Time"].append(time.time() - time_start)
+        logger.info("\tdensity %.2f: %d fibers, change = %.2e, elapsed time %.2f seconds", density, study["N_fiber"][-1], change, study["Time"][-1])
+
+        if converged_at["MK"] is not None and converged_at["PM"] is not None:
+            break
+
+    if converged_at["MK"] is None or converged_at["PM"] is None:
+        logger.warning("\tWarning: mesh did not converge within tol = %.2e. Using finest density %.2f", tol, densities[-1])
+        density = densities[-1]
+    else:
+        density = densities[max(converged_at["MK"], converged_at["PM"]) - 1]
+    logger.info("Mesh convergence study completed. Adequate mesh density = %.2f", density)
+    return density, fkit.section.create_table(study)
+
+
+def get_peak_moment(section, phi_list, P, x_guess=None):
+    """
+    Peak moment of a moment curvature curve solved with the vectorized strain plane solver. Fiber
+    history is not recorded.
+    Arguments:
+        x_guess         array of strain planes [eps0, theta] at each curvature used as initial guess
+                            OPTIONAL: default = None (use previous step)
+    Returns:
+        peak_moment, x_solution
+    """
+    x_solution = np.zeros((len(phi_list), 2))
+    x = np.zeros(2)
+    moment = np.full(len(phi_list), np.nan)
+    for i, curvature in enumerate(phi_list):
+        x0 = x if x_guess is None else x_guess[i]
+        x, converged, sumF, sumMx, sumMy, strain, stress = section.solve_strain_plane(curvature, P, x0, angle=0)
+        if not converged and x_guess is not None:
+            x, converged, sumF, sumMx, sumMy, strain, stress = section.solve_strain_plane(curvature, P, x_solution[i-1] if i > 0 else np.zeros(2), angle=0)
+        x_solution[i] = x
+        if converged:
+            moment[i] = sumMx
+    return np.nanmax(moment), x_solution
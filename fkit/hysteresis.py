@@ -0,0 +1,167 @@
+"""
+Vectorized hysteretic stress-strain rules used by cyclic analyses.
+
+Each rule evaluates all fibers of one material at once. Path-dependent variables (reversal points,
+maximum strains, etc.) are held in a dictionary of numpy arrays with one entry per fiber rather than
+as attributes of fiber objects. Rules are pure functions of the committed state and a trial strain:
+
+    stress, trial_state = rule(material, strain, state)
+
+The solver evaluates as many trial strains as needed. Once equilibrium is found, the trial state of
+the converged strain is committed and becomes the state of the next step.
+
+Currently available:
+    1. bilinear             bilinear steel with kinematic hardening
+    2. menegotto_pinto      Menegotto-Pinto steel with Filippou et al. (1983) curvature degradation
+    3. concrete             compression envelope with Karsan-Jirsa (1969) unloading and reloading
+"""
+import numpy as np
+
+
+
+
+def bilinear_state(N):
+    """initial state of N bilinear fibers"""
+    return {"strain": np.zeros(N),
+            "stress": np.zeros(N),
+            "fractured": np.zeros(N, dtype=bool)}
+
+
+def bilinear(material, strain, state):
+    """
+    Bilinear steel with kinematic hardening. Loading and unloading is elastic (slope Es) until the
+    stress reaches one of the two hardening lines of the monotonic backbone:
+        upper = fy + Esh * (strain - ey)
+        lower = -fy + Esh * (strain + ey)
+    Fibers beyond emax fracture and carry no stress for the rest of the analysis.
+    """
+    Esh = (material.fu - material.fy) / (material.emax - material.ey)
+    stress = state["stress"] + material.Es * (strain - state["strain"])
+    upper = material.fy + Esh * (strain - material.ey)
+    lower = -material.fy + Esh * (strain + material.ey)
+    stress = np.minimum(np.maximum(stress, lower), upper)
+
+    fractured = state["fractured"]
+    if material.emax != "inf":
+        fractured = fractured | (np.abs(strain) > material.emax)
+    stress = np.where(fractured, 0.0, stress)
+    return stress, {"strain": strain, "stress": stress, "fractured": fractured}
+
+
+
+
+def menegotto_pinto_state(N, n):
+    """initial state of N Menegotto-Pinto fibers with initial curvature parameter n"""
+    return {"strain": np.zeros(N),
+            "stress": np.zeros(N),
+            "direction": np.zeros(N, dtype=np.int8),
+            "strain_r": np.zeros(N),
+            "stress_r": np.zeros(N),
+            "strain_0": np.zeros(N),
+            "stress_0": np.zeros(N),
+            "R": np.full(N, float(n)),
+            "fractured": np.zeros(N, dtype=bool)}
+
+
+def menegotto_pinto(material, strain, state):
+    """
+    Menegotto-Pinto steel. Each branch is a smooth transition from the last reversal point (strain_r, stress_r)
+    to the yield asymptote of the loading direction, which it meets at (strain_0, stress_0):
+        e* = (strain - strain_r) / (strain_0 - strain_r)
+        s* = b*e* + (1-b)*e* / (1 + |e*|^R)^(1/R)
+        stress = s* (stress_0 - stress_r) + stress_r
+    Asymptotes are the hardening lines of the monotonic backbone (kinematic hardening). The curvature
+    parameter R degrades with the plastic excursion xi of the previous branch (ref A):
+        R = n - cR1*xi / (cR2 + xi)
+    The first branch from the origin (xi = 0, R = n) is identical to the monotonic MenegottoPinto curve.
+
+    References:
+        A. Filippou, Popov, Bertero (1983). Effects of Bond Deterioration on Hysteretic Behavior of
+           Reinforced Concrete Joints. EERC 83/19
+    """
+    fy, Es, b = material.fy, material.Es, material.b
+    ey = fy / Es
+
+    # reversal if strain increment changes sign (first loading counts as reversal from origin)
+    d_strain = strain - state["strain"]
+    direction = np.where(d_strain > 0, 1, np.where(d_strain < 0, -1, state["direction"])).astype(np.int8)
+    reversal = (direction != state["direction"]) & (direction != 0)
+
+    xi = np.where(state["direction"] == 0, 0.0, np.abs(state["strain"] - state["strain_0"]) / ey)
+    R = np.where(reversal, material.n - material.cR1*xi/(material.cR2 + xi), state["R"])
+    strain_r = np.where(reversal, state["strain"], state["strain_r"])
+    stress_r = np.where(reversal, state["stress"], state["stress_r"])
+
+    # intersection of elastic line from reversal point and yield asymptote of new loading direction
+    strain_0_new = (Es*strain_r - stress_r + direction*fy*(1-b)) / (Es*(1-b))
+    stress_0_new = direction*fy + b*Es*(strain_0_new - direction*ey)
+    strain_0 = np.where(reversal, strain_0_new, state["strain_0"])
+    stress_0 = np.where(reversal, stress_0_new, state["stress_0"])
+
+    # no branch defined yet (strain has not moved from origin)
+    span = strain_0 - strain_r
+    defined = span != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        e_star = np.where(defined, (strain - strain_r) / np.where(defined, span, 1.0), 0.0)
+        s_star = b*e_star + (1-b)*e_star / (1 + np.abs(e_star)**R)**(1/R)
+    stress = np.where(defined, s_star*(stress_0 - stress_r) + stress_r, state["stress"])
+
+    fractured = state["fractured"] | (np.abs(strain) > material.emax)
+    stress = np.where(fractured, 0.0, stress)
+    return stress, {"strain": strain,
+                    "stress": stress,
+                    "direction": direction,
+                    "strain_r": strain_r,
+                    "stress_r": stress_r,
+                    "strain_0": strain_0,
+                    "stress_0": stress_0,
+                    "R": R,
+                    "fractured": fractured}
+
+
+
+
+def concrete_state(N):
+    """initial state of N concrete fibers"""
+    return {"strain_min": np.zeros(N),
+            "stress_min": np.zeros(N),
+            "cracked": np.zeros(N, dtype=bool)}
+
+
+def concrete(material, strain, state):
+    """
+    Concrete with a monotonic compression envelope (material.stress_strain_array) and linear unloading
+    and reloading between the most compressive point reached (strain_min, stress_min) and the plastic
+    strain at zero stress (ref A):
+        strain_p / eo = 0.145 (strain_min/eo)^2 + 0.13 (strain_min/eo)
+    Unloading is not allowed to be stiffer than Ec. Beyond strain_p the fiber follows the tension rule of
+    the material shifted by strain_p, and carries no tension after it cracks (strain - strain_p > er).
+
+    References:
+        A. Karsan, Jirsa (1969). Behavior of Concrete under Compressive Loadings. ASCE J. Struct. Div. 95(12)
+    """
+    envelope = material.stress_strain_array(np.minimum(strain, 0.0))
+    strain_min = np.minimum(strain, state["strain_min"])
+    stress_min = np.where(strain < state["strain_min"], envelope, state["stress_min"])
+
+    # plastic strain
+    x = strain_min / material.eo
+    strain_p = material.eo * (0.145*x**2 + 0.13*x)
+    strain_p = np.minimum(np.maximum(strain_p, strain_min - stress_min/material.Ec), 0.0)
+
+    # linear unloading/reloading branch
+    span = strain_min - strain_p
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stress_u = np.where(span < 0, stress_min * (strain - strain_p) / np.where(span < 0, span, -1.0), 0.0)
+
+    # tension
+    strain_t = strain - strain_p
+    cracked = state["cracked"]
+    if material.take_tension:
+        cracked = cracked | (strain_t > material.er)
+        stress_t = np.where(cracked, 0.0, material.Ec * np.maximum(strain_t, 0.0))
+    else:
+        stress_t = np.zeros(np.shape(strain))
+
+    stress = np.select([strain <= strain_min, strain < strain_p], [envelope, stress_u], default=stress_t)
+    return stress, {"strain_min": strain_min, "stress_min": stress_min, "cracked": cracked}
@@ -0,0 +1,339 @@
+"""
+Optional compiled backend for fiber stress evaluation.
+
+The vectorized solvers evaluate every fiber of a section for each trial plane of strain. With the
+default numpy backend, each material group creates several temporary arrays per evaluation (strain,
+intermediate terms of the stress-strain relationship, stress, force). If numba is installed, the
+numba backend fuses strain computation, stress evaluation, and force/moment reduction into a single
+compiled loop over the fiber arrays.
+
+Backend is selected at runtime:
+    "auto"      numba if installed, numpy otherwise (default)
+    "numba"     compiled kernels. Raises ImportError if numba is not installed
+    "numpy"     vectorized numpy (material.stress_strain_array)
+The environment variable FKIT_BACKEND sets the initial backend.
+
+Supported materials (including subclasses used in monotonic analyses):
+    patchfiber: Hognestad, Mander, Todeschini, Bilinear, Multilinear, MenegottoPinto, Custom_Trilinear
+    nodefiber:  Bilinear, Multilinear, MenegottoPinto, Custom_Trilinear
+Other materials (e.g. RambergOsgood, user-defined) and tabulated materials (see fkit.tabulation) are
+evaluated with numpy after the compiled pass. Cyclic analyses always use the numpy backend.
+
+Example:
+    fkit.kernels.set_backend("numba")
+    section.run_biaxial_moment_curvature(phi_target=0.0005)
+"""
+import importlib.util
+import math
+import os
+import numpy as np
+import fkit.nodefiber
+import fkit.patchfiber
+
+
+# numba is only imported when kernels are compiled
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+BACKENDS = ["auto", "numba", "numpy"]
+KERNELS = []
+_backend = None
+_compiled = False
+
+
+def set_backend(backend="auto"):
+    """
+    Select backend used by section.evaluate_strain_plane()
+        backend     "auto", "numba", or "numpy"
+                        OPTIONAL: default = "auto"
+    """
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend: {}. Use one of {}".format(backend, BACKENDS))
+    if backend == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("numba backend requires numba to be installed")
+    _backend = backend
+
+
+def get_backend():
+    """Return the active backend ("numba" or "numpy")"""
+    if _backend is None:
+        set_backend(os.environ.get("FKIT_BACKEND", "auto"))
+    if _backend == "auto":
+        return "numba" if NUMBA_AVAILABLE else "numpy"
+    return _backend
+
+
+def jit(function):
+    """Register a kernel to be compiled by compile_kernels(). The pure python function is kept until then"""
+    KERNELS.append(function.__name__)
+    return function
+
+
+def compile_kernels():
+    """
+    Replace registered kernels with numba-compiled versions. Kernels calling each other look them up
+    as module globals when they are first called, so all of them are compiled together.
+    Compiled machine code is cached on disk.
+    """
+    global _compiled
+    if not _compiled:
+        import numba
+        for name in KERNELS:
+            globals()[name] = numba.njit(cache=True, nogil=True)(globals()[name])
+        _compiled = True
+
+
+
+
+# model ids
+UNSUPPORTED = 0
+HOGNESTAD = 1
+MANDER = 2
+TODESCHINI = 3
+BILINEAR = 4
+MULTILINEAR = 5
+MENEGOTTO_PINTO = 6
+CUSTOM_TRILINEAR = 7
+N_PARAMS = 14
+
+
+def _inf(value):
+    return math.inf if value == "inf" else value
+
+
+def _concrete_params(m, *args):
+    return [m.fo, m.eo, m.emax, m.alpha, m.Ec, m.er, 1.0 if m.take_tension else 0.0] + list(args)
+
+
+def _bilinear_params(m):
+    emax = _inf(m.emax)
+    slope = (m.fu - m.fy) / (emax - m.ey)
+    return [m.fy, m.Es, m.ey, slope, emax]
+
+
+def _multilinear_params(m):
+    return [m.fy, m.Es, m.ey1, m.ey2, m.strain1, m.strain2, m.strain3, m.strain4,
+            m.stress1, m.stress2, m.stress3, m.stress4]
+
+
+def _menegotto_pinto_params(m):
+    return [m.fy, m.Es, m.b, m.n, m.emax]
+
+
+def _custom_trilinear_params(m):
+    return [m.strain1p, m.strain2p, m.strain3p, m.stress1p, m.stress2p, m.stress3p,
+            m.strain1n, m.strain2n, m.strain3n, m.stress1n, m.stress2n, m.stress3n]
+
+
+def _mander_params(m):
+    r = m.Ec / (m.Ec - m.fo/m.eo)
+    return _concrete_params(m, r)
+
+
+# material class => (model id, parameter function). Classes are matched exactly: a user subclass may override
+# stress_strain() or stress_strain_array() and is evaluated in python. Hysteretic subclasses only add cyclic rules
+# and share the monotonic kernel of their parent
+MODELS = {
+    fkit.patchfiber.Hognestad: (HOGNESTAD, _concrete_params),
+    fkit.patchfiber.Mander: (MANDER, _mander_params),
+    fkit.patchfiber.Todeschini: (TODESCHINI, _concrete_params),
+    fkit.patchfiber.Bilinear: (BILINEAR, _bilinear_params),
+    fkit.patchfiber.Multilinear: (MULTILINEAR, _multilinear_params),
+    fkit.patchfiber.MenegottoPinto: (MENEGOTTO_PINTO, _menegotto_pinto_params),
+    fkit.patchfiber.Custom_Trilinear: (CUSTOM_TRILINEAR, _custom_trilinear_params),
+    fkit.nodefiber.Bilinear: (BILINEAR, _bilinear_params),
+    fkit.nodefiber.Multilinear: (MULTILINEAR, _multilinear_params),
+    fkit.nodefiber.MenegottoPinto: (MENEGOTTO_PINTO, _menegotto_pinto_params),
+    fkit.nodefiber.Custom_Trilinear: (CUSTOM_TRILINEAR, _custom_trilinear_params),
+    fkit.patchfiber.ManderHysteretic: (MANDER, _mander_params),
+    fkit.patchfiber.TodeschiniHysteretic: (TODESCHINI, _concrete_params),
+    fkit.patchfiber.BilinearHysteretic: (BILINEAR, _bilinear_params),
+    fkit.patchfiber.MenegottoPintoHysteretic: (MENEGOTTO_PINTO, _menegotto_pinto_params),
+    fkit.nodefiber.BilinearHysteretic: (BILINEAR, _bilinear_params),
+    fkit.nodefiber.MenegottoPintoHysteretic: (MENEGOTTO_PINTO, _menegotto_pinto_params),
+}
+
+
+def get_model(material):
+    """Return model id and parameter array of a material. Model id is UNSUPPORTED if there is no compiled kernel"""
+    if type(material) not in MODELS:
+        return UNSUPPORTED, np.zeros(N_PARAMS)
+    model, get_params = MODELS[type(material)]
+    params = np.zeros(N_PARAMS)
+    values = get_params(material)
+    params[:len(values)] = values
+    return model, params
+
+
+def compile_section(section):
+    """
+    Collect model ids and parameters of all fibers of a section for the compiled kernels.
+    Returns:
+        fiber_model         model id of each fiber
+        fiber_params        parameter array of each fiber's material. Shape = (N_material, N_PARAMS)
+        fiber_material      row of fiber_params for each fiber
+        unsupported         list of [material, indices] evaluated with numpy. Includes tabulated materials
+    """
+    N = len(section.fiber_area)
+    fiber_model = np.zeros(N, dtype=np.int64)
+    fiber_material = np.zeros(N, dtype=np.int64)
+    fiber_params = np.zeros((max(len(section.material_groups), 1), N_PARAMS))
+    unsupported = []
+    for i, (material, indices) in enumerate(section.material_groups):
+        if material in section.material_tables:
+            model, params = UNSUPPORTED, np.zeros(N_PARAMS)
+        else:
+            model, params = get_model(material)
+        fiber_model[indices] = model
+        fiber_material[indices] = i
+        fiber_params[i] = params
+        if model == UNSUPPORTED:
+            unsupported.append([material, indices])
+    return fiber_model, fiber_params, fiber_material, unsupported
+
+
+def evaluate_strain_plane(section, eps0, curvaturex, curvaturey=0):
+    """
+    Compiled version of section.evaluate_strain_plane()
+    Returns:
+        sumF, sumMx, sumMy, strain, stress
+    """
+    compile_kernels()
+    if section.kernel_data is None:
+        section.kernel_data = compile_section(section)
+    fiber_model, fiber_params, fiber_material, unsupported = section.kernel_data
+
+    N = len(section.fiber_area)
+    strain = np.empty(N)
+    stress = np.empty(N)
+    sumF, sumMx, sumMy = fused_strain_plane(eps0, curvaturex, curvaturey, section.fiber_ecc, section.fiber_area,
+                                            fiber_model, fiber_params, fiber_material, strain, stress)
+    for material, indices in unsupported:
+        curve = section.material_tables.get(material, material)
+        stress[indices] = curve.stress_strain_array(strain[indices])
+        force = stress[indices] * section.fiber_area[indices]
+        sumF += force.sum()
+        sumMx += force @ section.fiber_ecc[indices,1]
+        sumMy += force @ section.fiber_ecc[indices,0]
+    return sumF, sumMx, sumMy, strain, stress
+
+
+
+
+@jit
+def concrete_tension(strain, p):
+    """tension rule shared by concrete models. p = [fo, eo, emax, alpha, Ec, er, take_tension, ...]"""
+    if p[6] == 0.0 or strain > p[5]:
+        return 0.0
+    return p[4] * strain
+
+
+@jit
+def fiber_stress(model, p, strain):
+    """stress of a single fiber. Mirrors stress_strain() of each supported material"""
+    if model == HOGNESTAD:
+        if strain >= 0.0:
+            return concrete_tension(strain, p)
+        if strain >= p[1]:
+            X = strain / p[1]
+            return p[0] * (2*X - X*X)
+        if strain >= p[2]:
+            return p[0] + (0.15*p[0])/(p[2] - p[1]) * (p[1] - strain)
+        return p[3] * p[0]
+
+    elif model == MANDER:
+        if strain >= 0.0:
+            return concrete_tension(strain, p)
+        if strain > p[2]:
+            X = strain / p[1]
+            r = p[7]
+            return p[0]*X*r / (r - 1 + X**r)
+        return p[3] * p[0]
+
+    elif model == TODESCHINI:
+        if strain >= 0.0:
+            return concrete_tension(strain, p)
+        if strain > p[2]:
+            X = strain / p[1]
+            return 2*p[0]*X / (1 + X*X)
+        return p[3] * p[0]
+
+    elif model == BILINEAR:
+        fy, Es, ey, slope, emax = p[0], p[1], p[2], p[3], p[4]
+        if strain < -emax or strain > emax:
+            return 0.0
+        stress = Es * strain
+        if stress < -fy:
+            return -fy + slope*(strain + ey)
+        if stress > fy:
+            return fy + slope*(strain - ey)
+        return stress
+
+    elif model == MULTILINEAR:
+        e = abs(strain)
+        if e <= p[2]:
+            stress = p[1] * e
+        elif e <= p[3]:
+            stress = p[0]
+        elif e <= p[4]:
+            stress = p[0] + (p[8] - p[0])/(p[4] - p[3]) * (e - p[3])
+        elif e <= p[5]:
+            stress = p[8] + (p[9] - p[8])/(p[5] - p[4]) * (e - p[4])
+        elif e <= p[6]:
+            stress = p[9] + (p[10] - p[9])/(p[6] - p[5]) * (e - p[5])
+        elif e <= p[7]:
+            stress = p[10] + (p[11] - p[10])/(p[7] - p[6]) * (e - p[6])
+        else:
+            stress = 0.0
+        return stress if strain > 0 else -stress
+
+    elif model == MENEGOTTO_PINTO:
+        e = abs(strain)
+        if e > p[4]:
+            return 0.0
+        eo = e / (p[0] / p[1])
+        b, n = p[2], p[3]
+        stress = (b*eo + (1-b)*eo / (1 + eo**n)**(1/n)) * p[0]
+        return stress if strain > 0 else -stress
+
+    elif model == CUSTOM_TRILINEAR:
+        if strain < 0:
+            if strain >= p[6]:
+                return p[9] / p[6] * strain
+            if strain >= p[7]:
+                return p[9] + (p[10] - p[9])/(p[7] - p[6]) * (strain - p[6])
+            if strain >= p[8]:
+                return p[10] + (p[11] - p[10])/(p[8] - p[7]) * (strain - p[7])
+            return 0.0
+        if strain <= p[0]:
+            return p[3] / p[0] * strain
+        if strain <= p[1]:
+            return p[3] + (p[4] - p[3])/(p[1] - p[0]) * (strain - p[0])
+        if strain <= p[2]:
+            return p[4] + (p[5] - p[4])/(p[2] - p[1]) * (strain - p[1])
+        return 0.0
+
+    return 0.0
+
+
+@jit
+def fused_strain_plane(eps0, curvaturex, curvaturey, fiber_ecc, fiber_area, fiber_model, fiber_params, fiber_material, strain, stress):
+    """
+    Single pass over all fibers: strain = eps0 + curvaturex*dy + curvaturey*dx, stress, and force/moment sums.
+    strain and stress are filled in place. Stress of unsupported fibers is left for numpy evaluation.
+    """
+    sumF = 0.0
+    sumMx = 0.0
+    sumMy = 0.0
+    for i in range(fiber_area.shape[0]):
+        e = eps0 + curvaturex*fiber_ecc[i,1] + curvaturey*fiber_ecc[i,0]
+        strain[i] = e
+        model = fiber_model[i]
+        if model == UNSUPPORTED:
+            continue
+        s = fiber_stress(model, fiber_params[fiber_material[i]], e)
+        stress[i] = s
+        F = s * fiber_area[i]
+        sumF += F
+        sumMx += F * fiber_ecc[i,1]
+        sumMy += F * fiber_ecc[i,0]
+    return sumF, sumMx, sumMy
@@ -0,0 +1,356 @@
+"""
+Fiber beam-column member analysis.
+
+A Member places one meshed section at the Gauss-Lobatto integration points of a prismatic member and
+solves its lateral load-displacement response (pushover) under constant axial load. All integration
+points share a single CompiledSection (see fkit.compiled); section states are evaluated for all
+integration points in one batch call per iteration instead of analyzing a copy of the section at
+each point.
+
+Formulation (force-based, bending about the section x-axis):
+    x                   distance from the fixed base (0 <= x <= L)
+    M(x)                = M_base - V*x + P*v(x)             (P*v(x) only with p_delta = True)
+    kappa(x)            curvature interpolated through the integration points (Lagrange polynomial)
+    v(x), theta(x)      lateral displacement and rotation integrated from kappa with v(0) = theta(0) = 0
+    cantilever          top is free:   M(L) = 0           =>  M_base = V*L - P*delta
+    fixed-fixed         top is guided: theta(L) = 0      (double curvature, no top rotation)
+At every step the top displacement delta is imposed and the base shear V, base moment M_base, and
+section deformations [eps0, kappa] of every integration point are solved simultaneously with
+Newton-Raphson using the analytic section tangent. Steps that do not converge are cut in half. Where the
+member snaps back after the peak (the base section softens faster than the rest of the member unloads),
+the base curvature is imposed instead until the top displacement is recovered. The analysis ends when
+no equilibrium state is found, typically when the base section can no longer carry the axial load.
+Materials whose fibers drop out beyond emax (alpha = 0) lose capacity in jumps, and the analysis may end
+at the first jump that has no nearby equilibrium state.
+
+Example:
+    column = fkit.member.Member(section, length=120, N_ip=5, boundary="cantilever")
+    df = column.run_pushover(target_displacement=6, P=-200, N_step=200)
+"""
+import logging
+import time
+import numpy as np
+import fkit.progress
+import fkit.section
+from fkit.profiler import create_stats, NULL_STATS
+
+
+logger = logging.getLogger(__name__)
+BOUNDARIES = ["cantilever", "fixed-fixed"]
+
+
+class Member:
+    """
+    Member object definition:
+        section             meshed section object shared by all integration points
+        compiled            CompiledSection used to evaluate all integration points at once
+        length              member length
+        boundary            "cantilever" (fixed base, free top) or "fixed-fixed" (fixed base, guided top)
+        N_ip                number of Gauss-Lobatto integration points (>= 3)
+        ip_location         distance of each integration point from the base
+        ip_weight           integration length of each integration point (Gauss-Lobatto weight * L/2).
+                                The weight of the end points is the plastic hinge length implied by the
+                                integration scheme when deformations localize
+        G                   matrix mapping integration point curvatures to lateral displacements at the integration points
+        g_top, h_top        vectors mapping integration point curvatures to top displacement and rotation
+
+    From pushover analysis
+        displacement        list of top displacement
+        shear               list of base shear
+        base_moment         list of base moment
+        ip_curvature        list of curvature at each integration point
+        ip_strain           list of centroidal strain at each integration point
+        table_pushover      dataframe containing all pushover results
+        stats               AnalysisStats of the latest run with profile=True (see fkit.profiler)
+    """
+    def __init__(self, section, length, N_ip=5, boundary="cantilever"):
+        if boundary not in BOUNDARIES:
+            raise ValueError("Unknown boundary: {}. Use one of {}".format(boundary, BOUNDARIES))
+        if N_ip < 3:
+            raise ValueError("At least 3 integration points are required")
+        self.section = section
+        self.compiled = section.compile()
+        self.length = length
+        self.boundary = boundary
+        self.N_ip = N_ip
+
+        xi, weight = get_lobatto_points(N_ip)
+        self.ip_location = length * (1 + xi) / 2
+        self.ip_weight = length * weight / 2
+        self.G, self.g_top, self.h_top = get_curvature_integration(self.ip_location, length)
+
+        self.axial = 0
+        self.displacement = []
+        self.shear = []
+        self.base_moment = []
+        self.ip_curvature = []
+        self.ip_strain = []
+        self.table_pushover = None
+        self.stats = None
+
+
+    def run_pushover(self, target_displacement, P=0, N_step=200, p_delta=True, tol=1e-8, max_iteration=30, max_cut=10,
+                     show_progress=False, callback=None, profile=False):
+        """
+        Start pushover analysis. Top displacement is increased from 0 to target_displacement under constant axial load.
+        Arguments:
+            target_displacement     lateral displacement imposed at the top of the member
+            P                       applied axial load (-ve is compression)
+                                        OPTIONAL: default = 0
+            N_step                  number of displacement increments
+                                        OPTIONAL: default = 200
+            p_delta                 flag to include second-order moments P*(delta - v(x))
+                                        OPTIONAL: default = True
+            tol                     convergence tolerance on normalized residuals
+                                        OPTIONAL: default = 1e-8
+            max_iteration           maximum number of Newton-Raphson iterations per step
+                                        OPTIONAL: default = 30
+            max_cut                 maximum number of times the increment of a step is halved before the analysis ends
+                                        OPTIONAL: default = 10
+            show_progress           flag to print status of every step (see fkit.progress.progress_output())
+                                        OPTIONAL: default = False
+            callback                function called with each converged step (a dictionary with keys "Step", "Displacement",
+                                        "Shear", "BaseMoment", "BaseCurvature"). Analysis stops early if the callback returns False
+                                        OPTIONAL: default = None
+            profile                 flag to collect solver and timing statistics in member.stats (see fkit.profiler)
+                                        OPTIONAL: default = False
+        Returns:
+            df_results              a dataframe containing all pushover results
+
+        Algorithm:
+            0.) unknowns z = [eps0 (N_ip), kappa (N_ip), V, M_base]. Previous step is used as initial guess
+            1.) evaluate resisting forces and tangent of all integration points in one batch call
+            2.) residuals:
+                    section axial       N_R - P
+                    section moment      M_R - (M_base - V*x + P*v(x))
+                    compatibility       g_top @ kappa - delta
+                    boundary            cantilever: M_base - V*L + P*delta, fixed-fixed: h_top @ kappa
+            3.) solve the linearized system for the correction of z and repeat until residuals < tol
+            4.) if a step does not converge, halve its increment (up to max_cut times). States where an end section
+                reverses its moment or curvature are rejected as a jump to another equilibrium branch
+            5.) if the step still fails, replace the compatibility residual with base curvature - target and advance
+                base curvature until the top displacement reaches delta (snap-back), then solve at delta
+            6.) analysis ends at the first step that does not converge (e.g. collapse of the base section)
+        """
+        self.axial = P
+        P_delta = P if p_delta else 0.0
+        n = self.N_ip
+        L = self.length
+        x_ip = self.ip_location
+        G = self.G if p_delta else np.zeros((n, n))
+
+        # residual scales from initial section stiffness
+        forces0, K0 = self.compiled.evaluate(np.zeros(3), tangent=True)
+        scale_F = max(abs(K0[0,0]) * 1e-3, abs(P), 1e-12)
+        scale_M = max(abs(K0[1,1]) * 1e-3 / self.section.depth, 1e-12)
+        scale = np.concatenate([np.full(n, scale_F), np.full(n, scale_M), [L*1e-3, scale_M if self.boundary == "cantilever" else 1e-3]])
+
+        self.stats = create_stats(profile, "run_pushover", self.section)
+        stats = self.stats or NULL_STATS
+        stats.start()
+        time_start = time.time()
+
+        def residual(z, control, target):
+            eps0, kappa, V, M_base = z[:n], z[n:2*n], z[2*n], z[2*n+1]
+            deformation = np.column_stack([eps0, kappa, np.zeros(n)])
+            stats.count_residual()
+            with stats.timer("stress"):
+                forces, K = self.compiled.evaluate(deformation, tangent=True)
+            R = np.empty(2*n + 2)
+            R[:n] = forces[:,0] - P
+            R[n:2*n] = forces[:,1] - (M_base - V*x_ip + P_delta*(G @ kappa))
+            delta = self.g_top @ kappa
+            R[2*n] = control @ kappa - target
+            R[2*n+1] = M_base - V*L + P_delta*delta if self.boundary == "cantilever" else self.h_top @ kappa
+            return R / scale, K
+
+        # constant part of jacobian
+        i = np.arange(n)
+        J = np.zeros((2*n + 2, 2*n + 2))
+        J[n:2*n, 2*n] = x_ip
+        J[n:2*n, 2*n+1] = -1
+        if self.boundary == "cantilever":
+            J[2*n+1, 2*n] = -L
+            J[2*n+1, 2*n+1] = 1
+            J[2*n+1, n:2*n] = P_delta*self.g_top
+        else:
+            J[2*n+1, n:2*n] = self.h_top
+
+        def solve(z, control, target):
+            J[2*n, n:2*n] = control
+            R, K = residual(z, control, target)
+            for iteration in range(max_iteration):
+                if np.all(np.abs(R) < tol):
+                    return True, z
+
+                # jacobian with section tangents
+                stats.count_iteration()
+                J[i, i] = K[:,0,0]
+                J[i, n+i] = K[:,0,1]
+                J[n+i, i] = K[:,1,0]
+                J[n:2*n, n:2*n] = np.diag(K[:,1,1]) - P_delta*G
+                try:
+                    dz = -np.linalg.solve(J / scale[:,None], R)
+                except np.linalg.LinAlgError:
+                    return False, z
+
+                # backtrack until step reduces residual. Concrete without tension makes the section
+                # response non-smooth at zero strain, where full Newton steps can cycle. Fibers dropping
+                # out (e.g. concrete beyond emax) make the residual discontinuous, in which case no
+                # fraction of the step reduces it and the full step is taken
+                alpha = 1.0
+                trial = None
+                while alpha > 1e-3:
+                    candidate = residual(z + alpha*dz, control, target)
+                    if np.linalg.norm(candidate[0]) < np.linalg.norm(R):
+                        trial = candidate
+                        break
+                    alpha = alpha/2
+                if trial is None:
+                    alpha = 1.0
+                    trial = residual(z + dz, control, target)
+                z = z + alpha*dz
+                R, K = trial
+            return bool(np.all(np.abs(R) < tol)), z
+
+        # end sections carry the largest moments. Their moment and curvature keep the same sign along the
+        # loading path; a converged state where one reverses lies on another equilibrium branch (e.g. after
+        # the base section has lost its compression zone) and is rejected
+        ends = np.array([0] if self.boundary == "cantilever" else [0, n-1])
+        def end_state(z):
+            kappa, V, M_base = z[n:2*n], z[2*n], z[2*n+1]
+            return np.concatenate([kappa[ends], M_base - V*x_ip[ends] + P_delta*(G[ends] @ kappa)])
+        def advance(z, control, target, N_cut):
+            """solve from z until control @ kappa = target. The increment is halved after every failed
+            attempt and doubled back after every success, so it is only refined where needed"""
+            start = control @ z[n:2*n]
+            fraction = 0.0
+            size = 1.0
+            while fraction < 1.0:
+                size = min(size, 1.0 - fraction)
+                converged, z_trial = solve(z, control, start + (fraction + size)*(target - start))
+                if converged and np.all(end_state(z_trial) * end_state(z) >= 0):
+                    z = z_trial
+                    fraction = 1.0 if size == 1.0 - fraction else fraction + size
+                    size = 2*size
+                elif N_cut > 0:
+                    N_cut = N_cut - 1
+                    size = size/2
+                else:
+                    return False, z
+            return True, z
+
+        with fkit.progress.progress_output(show_progress):
+            base = np.zeros(n)
+            base[0] = 1.0
+            z = np.zeros(2*n + 2)
+            for step, delta in enumerate(np.linspace(0, target_displacement, N_step + 1)[1:], start=1):
+                stats.new_step()
+                converged, z_trial = advance(z, self.g_top, delta, max_cut)
+
+                # displacement control fails where the member snaps back, i.e. the base section softens faster
+                # than the rest of the member unloads. Base curvature is advanced instead until the top
+                # displacement is recovered, in increments that would impose the remaining displacement
+                # if all of it came from the base section
+                if not converged:
+                    d_kappa = (delta - self.g_top @ z[n:2*n]) / self.g_top[0]
+                    z_trial = z
+                    for substep in range(max_iteration):
+                        converged, z_trial = advance(z_trial, base, z_trial[n] + d_kappa, max_cut)
+                        if not converged or (self.g_top @ z_trial[n:2*n] - delta) * d_kappa >= 0:
+                            break
+                    if converged:
+                        converged, z_trial = advance(z_trial, self.g_top, delta, max_cut)
+
+                if not converged:
+                    logger.warning("\tWarning: step %d: could not converge. Ending pushover analysis at delta = %.3e", step, delta)
+                    break
+                z = z_trial
+
+                eps0, kappa, V, M_base = z[:n], z[n:2*n], z[2*n], z[2*n+1]
+                self.displacement.append(delta)
+                self.shear.append(V)
+                self.base_moment.append(M_base)
+                self.ip_curvature.append(kappa.copy())
+                self.ip_strain.append(eps0.copy())
+
+                if show_progress:
+                    logger.info("\tstep %d: delta = %.3e, V = %.2f, M_base = %.1f, base curvature = %.2e", step, delta, V, M_base, kappa[0])
+                if callback is not None:
+                    result = {"Step": step,
+                              "Displacement": delta,
+                              "Shear": V,
+                              "BaseMoment": M_base,
+                              "BaseCurvature": kappa[0]}
+                    if callback(result) is False:
+                        break
+
+            time_end = time.time()
+            stats.stop()
+            logger.info("Pushover analysis completed. Elapsed time: %.2f seconds", time_end - time_start)
+
+        # compile result dictionary for return
+        result_dict = dict()
+        result_dict["Displacement"] = self.displacement
+        result_dict["Shear"] = self.shear
+        result_dict["BaseMoment"] = self.base_moment
+        result_dict["BaseCurvature"] = [k[0] for k in self.ip_curvature]
+        result_dict["Axial"] = self.axial
+        self.table_pushover = fkit.section.create_table(result_dict)
+        if profile:
+            self.table_pushover.attrs["stats"] = self.stats.summary()
+        return self.table_pushover
+
+
+    def get_deflected_shape(self, step=-1, N_point=50):
+        """
+        Lateral displacement along the member at a pushover step. Curvature is interpolated through
+        the integration points and integrated twice from the fixed base.
+        Returns:
+            x, v
+        """
+        kappa = self.ip_curvature[step]
+        x = np.linspace(0, self.length, N_point)
+        G, g_top, h_top = get_curvature_integration(self.ip_location, self.length, x)
+        return x, G @ kappa
+
+
+
+
+def get_lobatto_points(N):
+    """
+    Gauss-Lobatto integration points and weights on [-1, 1]. End points are included.
+    Interior points are the roots of P'_(N-1), weights are 2 / (N(N-1) P_(N-1)(xi)^2)
+    """
+    legendre = np.polynomial.legendre.Legendre.basis(N - 1)
+    xi = np.concatenate([[-1.0], np.sort(legendre.deriv().roots().real), [1.0]])
+    weight = 2 / (N * (N-1) * legendre(xi)**2)
+    return xi, weight
+
+
+def get_curvature_integration(ip_location, length, x=None):
+    """
+    Matrices mapping curvature at the integration points to displacement and rotation of a member fixed at x = 0.
+    Curvature is interpolated with the Lagrange polynomial through the integration points and integrated exactly:
+        theta(x) = integral_0^x kappa(s) ds
+        v(x) = integral_0^x (x - s) kappa(s) ds
+    Arguments:
+        ip_location     integration point locations
+        length          member length
+        x               locations where displacement is evaluated
+                            OPTIONAL: default = None (integration points)
+    Returns:
+        G               v(x) = G @ kappa
+        g_top           v(L) = g_top @ kappa
+        h_top           theta(L) = h_top @ kappa
+    """
+    x = ip_location if x is None else np.asarray(x, dtype=float)
+    j = np.arange(len(ip_location))
+
+    # kappa(s) = sum_j a_j (s/L)^j with a = V^-1 @ kappa
+    V_inverse = np.linalg.inv((ip_location[:,None] / length) ** j)
+    t = x[:,None] / length
+    G = length**2 * t**(j+2) / ((j+1) * (j+2)) @ V_inverse
+    g_top = length**2 / ((j+1) * (j+2)) @ V_inverse
+    h_top = length / (j+1) @ V_inverse
+    return G, g_top, h_top
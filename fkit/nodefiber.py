@@ -10,7 +10,16 @@ Currently available:
     3. RambergOsgood
     4. MenegottoPinto
     5. Custom_Trilinear
+    6. BilinearHysteretic
+    7. MenegottoPintoHysteretic
 """
+import logging
+import numpy as np
+
+import fkit.hysteresis
+
+
+logger = logging.getLogger(__name__)
 
 class BaseNodeFiber:
     """
@@ -108,12 +117,30 @@ class BaseNodeFiber:
             momenty = force * self.ecc[0]
             return force, momentx, momenty
     
+    def stress_strain_array(self, strain):
+        """
+        Vectorized stress-strain relationship used by the array-based solvers.
+        Default implementation loops over stress_strain(). Override for speed.
+        """
+        strain = np.asarray(strain, dtype=float)
+        stress = [self.stress_strain(e) for e in strain.ravel()]
+        return np.array(stress, dtype=float).reshape(strain.shape)
+    
+    def tangent_array(self, strain):
+        """
+        Vectorized tangent modulus (dstress/dstrain) used to assemble the section tangent stiffness.
+        Default implementation is a central difference of stress_strain_array(). Override for an analytic tangent.
+        """
+        strain = np.asarray(strain, dtype=float)
+        h = 1e-7
+        return (self.stress_strain_array(strain + h) - self.stress_strain_array(strain - h)) / (2*h)
+    
     #abstractmethod
     def stress_strain(self, strain):
         """
         OVERRIDE - define material stress-strain relationship
         """
-        print("WARNING: fiber stress-strain relationship not defined")
+        logger.warning("fiber stress-strain relationship not defined")
         return 0
     
     #abstractmethod
@@ -121,7 +148,7 @@ class BaseNodeFiber:
         """
         OVERRIDE - define color map for fiber for visualization purposes
         """
-        print("WARNING: fiber color map not defined")
+        logger.warning("fiber color map not defined")
         return self.default_color
 
 
@@ -193,6 +220,31 @@ class Bilinear(BaseNodeFiber):
             
         return stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        stress = self.Es * strain
+        
+        slope = (self.fu-self.fy)/(self.emax-self.ey)
+        stress = np.where(stress < -self.fy, -self.fy + slope*(strain + self.ey),
+                 np.where(stress > self.fy, self.fy + slope*(strain - self.ey), stress))
+        
+        if self.emax != "inf":
+            stress = np.where((strain < -self.emax) | (strain > self.emax), 0.0, stress)
+        
+        return stress
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus (dstress/dstrain)"""
+        strain = np.asarray(strain, dtype=float)
+        slope = (self.fu-self.fy)/(self.emax-self.ey)
+        Et = np.where(np.abs(self.Es * strain) > self.fy, slope, self.Es)
+        
+        if self.emax != "inf":
+            Et = np.where(np.abs(strain) > self.emax, 0.0, Et)
+        
+        return Et
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -334,6 +386,27 @@ class Multilinear(BaseNodeFiber):
         else:
             return -stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        conditions = [abs_strain <= self.ey1,
+                      abs_strain <= self.ey2,
+                      abs_strain <= self.strain1,
+                      abs_strain <= self.strain2,
+                      abs_strain <= self.strain3,
+                      abs_strain <= self.strain4]
+        choices = [self.Es * abs_strain,
+                   np.full(strain.shape, self.fy),
+                   self.fy + (self.stress1-self.fy)/(self.strain1-self.ey2) * (abs_strain-self.ey2),
+                   self.stress1 + (self.stress2-self.stress1)/(self.strain2-self.strain1) * (abs_strain-self.strain1),
+                   self.stress2 + (self.stress3-self.stress2)/(self.strain3-self.strain2) * (abs_strain-self.strain2),
+                   self.stress3 + (self.stress4-self.stress3)/(self.strain4-self.strain3) * (abs_strain-self.strain3)]
+        stress = np.select(conditions, choices, default=0.0)
+        
+        return np.where(strain > 0, stress, -stress)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -438,6 +511,36 @@ class RambergOsgood(BaseNodeFiber):
         else:
             return -stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain(). Newton-Raphson is run on all fibers at once"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        # Newton raphson (x = sigma, fx = strain)
+        tol = 1e-5
+        x = np.zeros(strain.shape)
+        for N in range(1000):
+            func = x/self.Es + 0.002 * (x/self.fy)**(self.n) - abs_strain
+            func_prime = 1/self.Es + (0.002/self.fy) * (self.n) * (x/self.fy)**(self.n - 1)
+            x = x - func/func_prime
+            if np.all(np.abs(func) <= tol):
+                break
+        else:
+            raise RuntimeError("Newton Raphson could not converge")
+        
+        # check if limiting strain is exceeded
+        stress = np.where(abs_strain > self.emax, 0.0, x)
+        
+        return np.where(strain > 0, stress, -stress)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus. Inverse of dstrain/dstress = 1/E + (0.002/fy)(n) * (stress/fy)^(n-1)"""
+        strain = np.asarray(strain, dtype=float)
+        stress = np.abs(self.stress_strain_array(strain))
+        Et = 1 / (1/self.Es + (0.002/self.fy) * (self.n) * (stress/self.fy)**(self.n - 1))
+        
+        return np.where(np.abs(strain) > self.emax, 0.0, Et)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -538,6 +641,32 @@ class MenegottoPinto(BaseNodeFiber):
         else:
             return -stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        # calculate stress
+        ey = self.fy / self.Es
+        eo = abs_strain / ey
+        stress = (  self.b*eo + (1-self.b)*eo/ (1 + eo**self.n)**(1/self.n) ) * self.fy
+        
+        # check if limiting strain is exceeded
+        stress = np.where(abs_strain > self.emax, 0.0, stress)
+        
+        return np.where(strain > 0, stress, -stress)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus. dstress/dstrain = Es * (b + (1-b) / (1 + eo^n)^(1+1/n))"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        ey = self.fy / self.Es
+        eo = abs_strain / ey
+        Et = self.Es * (self.b + (1-self.b) / (1 + eo**self.n)**(1 + 1/self.n))
+        
+        return np.where(abs_strain > self.emax, 0.0, Et)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -652,6 +781,28 @@ class Custom_Trilinear(BaseNodeFiber):
             
         return stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # compression backbone curve
+        stress_c = np.select(
+            [strain >= self.strain1n, strain >= self.strain2n, strain >= self.strain3n],
+            [0 + (self.stress1n - 0)/(self.strain1n - 0) * strain,
+             self.stress1n + (self.stress2n - self.stress1n)/(self.strain2n - self.strain1n) * (strain - self.strain1n),
+             self.stress2n + (self.stress3n - self.stress2n)/(self.strain3n - self.strain2n) * (strain - self.strain2n)],
+            default=0.0)
+        
+        # tension backbone curve
+        stress_t = np.select(
+            [strain <= self.strain1p, strain <= self.strain2p, strain <= self.strain3p],
+            [0 + (self.stress1p - 0)/(self.strain1p - 0) * strain,
+             self.stress1p + (self.stress2p - self.stress1p)/(self.strain2p - self.strain1p) * (strain - self.strain1p),
+             self.stress2p + (self.stress3p - self.stress2p)/(self.strain3p - self.strain2p) * (strain - self.strain2p)],
+            default=0.0)
+        
+        return np.where(strain < 0, stress_c, stress_t)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if strain < 0:
@@ -672,3 +823,69 @@ class Custom_Trilinear(BaseNodeFiber):
                 return "royalblue"
             elif stress > self.stress3p:
                 return "white"
+
+
+
+
+class BilinearHysteretic(Bilinear):
+    """
+    Bilinear model with kinematic hardening for cyclic analysis (see section.run_cyclic_moment_curvature).
+    Monotonic behavior is identical to Bilinear, which is used as the backbone curve.
+        
+    Input parameters:
+        see Bilinear
+                            
+    Hysteretic Behavior:
+        Unloading and reloading is elastic with slope Es until the stress reaches one of the two hardening
+        lines of the backbone curve (see fkit.hysteresis.bilinear). Fibers beyond emax fracture and carry
+        no stress for the rest of the analysis.
+    """
+    def __init__(self, fy, Es, fu="default", ey="default", emax=0.1, 
+                 default_color="black", coord=None, area=None):
+        super().__init__(fy, Es, fu=fu, ey=ey, emax=emax, default_color=default_color, coord=coord, area=area)
+        self.name = "BilinearHysteretic"
+    
+    def init_state(self, N):
+        """initial hysteretic state of N fibers"""
+        return fkit.hysteresis.bilinear_state(N)
+    
+    def stress_strain_cyclic(self, strain, state):
+        """path-dependent stress-strain relationship. Returns stress and trial state"""
+        return fkit.hysteresis.bilinear(self, np.asarray(strain, dtype=float), state)
+
+
+
+
+class MenegottoPintoHysteretic(MenegottoPinto):
+    """
+    Menegotto-Pinto model for cyclic analysis (see section.run_cyclic_moment_curvature).
+    Monotonic behavior is identical to MenegottoPinto, which is used as the backbone curve.
+        
+    Input parameters:
+        see MenegottoPinto. n is the initial value of the curvature parameter R
+        
+        cR1             (OPTIONAL) curvature degradation parameter
+                            - Default = 0.925
+        cR2             (OPTIONAL) curvature degradation parameter
+                            - Default = 0.15
+                            
+    Hysteretic Behavior:
+        Each branch is a smooth transition from the last reversal point to the yield asymptote of the
+        loading direction. Transitions become rounder (Bauschinger effect) as plastic excursions increase:
+            R = n - cR1*xi / (cR2 + xi)
+        See fkit.hysteresis.menegotto_pinto for details.
+    """
+    def __init__(self, fy, Es, b, n, emax=0.16, cR1=0.925, cR2=0.15,
+                 default_color="black", coord=None, area=None):
+        super().__init__(fy, Es, b, n, emax=emax, default_color=default_color, coord=coord, area=area)
+        self.name = "MenegottoPintoHysteretic"
+        self.cR1 = cR1
+        self.cR2 = cR2
+    
+    def init_state(self, N):
+        """initial hysteretic state of N fibers"""
+        return fkit.hysteresis.menegotto_pinto_state(N, self.n)
+    
+    def stress_strain_cyclic(self, strain, state):
+        """path-dependent stress-strain relationship. Returns stress and trial state"""
+        return fkit.hysteresis.menegotto_pinto(self, np.asarray(strain, dtype=float), state)
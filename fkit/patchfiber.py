@@ -13,8 +13,19 @@ Currently available:
     6. RambergOsgood
     7. MenegottoPinto
     8. Custom_Trilinear
+    9. ManderHysteretic
+    10. TodeschiniHysteretic
+    11. BilinearHysteretic
+    12. MenegottoPintoHysteretic
 """
+import logging
 import math
+import numpy as np
+
+import fkit.hysteresis
+
+
+logger = logging.getLogger(__name__)
 
 class BasePatchFiber:
     """
@@ -126,12 +137,30 @@ class BasePatchFiber:
         momenty = force * self.ecc[0]
         return force, momentx, momenty
     
+    def stress_strain_array(self, strain):
+        """
+        Vectorized stress-strain relationship used by the array-based solvers.
+        Default implementation loops over stress_strain(). Override for speed.
+        """
+        strain = np.asarray(strain, dtype=float)
+        stress = [self.stress_strain(e) for e in strain.ravel()]
+        return np.array(stress, dtype=float).reshape(strain.shape)
+    
+    def tangent_array(self, strain):
+        """
+        Vectorized tangent modulus (dstress/dstrain) used to assemble the section tangent stiffness.
+        Default implementation is a central difference of stress_strain_array(). Override for an analytic tangent.
+        """
+        strain = np.asarray(strain, dtype=float)
+        h = 1e-7
+        return (self.stress_strain_array(strain + h) - self.stress_strain_array(strain - h)) / (2*h)
+    
     #abstractmethod
     def stress_strain(self, strain):
         """
         OVERRIDE - define material stress-strain relationship
         """
-        print("WARNING: fiber stress-strain relationship not defined")
+        logger.warning("fiber stress-strain relationship not defined")
         return 0
     
     #abstractmethod
@@ -139,7 +168,7 @@ class BasePatchFiber:
         """
         OVERRIDE - define color map for fiber for visualization purposes
         """
-        print("WARNING: fiber color map not defined")
+        logger.warning("fiber color map not defined")
         return self.default_color
     
 
@@ -262,6 +291,41 @@ class Hognestad(BasePatchFiber):
         return stress
     
     
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # tension
+        if self.take_tension:
+            stress_t = np.where(self.er < strain, 0.0, self.Ec * strain)
+        else:
+            stress_t = np.zeros(strain.shape)
+        
+        # compression
+        X = strain/self.eo
+        stress_c = np.where(strain >= self.eo, self.fo * (2*X-X*X),
+                   np.where(strain >= self.emax, self.fo + ((0.15)*self.fo)/(self.emax-self.eo) * (self.eo-strain),
+                            self.alpha*self.fo))
+        
+        return np.where(strain >= 0, stress_t, stress_c)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus (dstress/dstrain)"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # tension
+        if self.take_tension:
+            Et_t = np.where(self.er < strain, 0.0, self.Ec)
+        else:
+            Et_t = np.zeros(strain.shape)
+        
+        # compression
+        X = strain/self.eo
+        Et_c = np.where(strain >= self.eo, self.fo * (2-2*X) / self.eo,
+               np.where(strain >= self.emax, -(0.15*self.fo)/(self.emax-self.eo), 0.0))
+        
+        return np.where(strain >= 0, Et_t, Et_c)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         # if in tension
@@ -418,6 +482,40 @@ class Mander(BasePatchFiber):
         return stress
     
     
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # tension
+        if self.take_tension:
+            stress_t = np.where(self.er < strain, 0.0, self.Ec * strain)
+        else:
+            stress_t = np.zeros(strain.shape)
+        
+        # compression (X is clipped at zero so X**r is defined in tension region)
+        X = np.maximum(strain/self.eo, 0.0)
+        r = self.Ec / (self.Ec - self.fo/self.eo)
+        stress_c = np.where(self.emax < strain, (self.fo)*(X)*(r) / (r - 1 + X**r), self.alpha*self.fo)
+        
+        return np.where(strain >= 0, stress_t, stress_c)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus (dstress/dstrain)"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # tension
+        if self.take_tension:
+            Et_t = np.where(self.er < strain, 0.0, self.Ec)
+        else:
+            Et_t = np.zeros(strain.shape)
+        
+        # compression: d/dX [fo*X*r / (r-1+X^r)] = fo*r*(r-1)*(1-X^r) / (r-1+X^r)^2
+        X = np.maximum(strain/self.eo, 0.0)
+        r = self.Ec / (self.Ec - self.fo/self.eo)
+        Et_c = np.where(self.emax < strain, self.fo*r*(r-1)*(1 - X**r) / (r - 1 + X**r)**2 / self.eo, 0.0)
+        
+        return np.where(strain >= 0, Et_t, Et_c)
+    
     def color_map(self, strain, stress):   
         """color map for visualization"""
         # if in tension
@@ -570,6 +668,38 @@ class Todeschini(BasePatchFiber):
         
         return stress
     
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # tension
+        if self.take_tension:
+            stress_t = np.where(self.er < strain, 0.0, self.Ec * strain)
+        else:
+            stress_t = np.zeros(strain.shape)
+        
+        # compression
+        X = strain/self.eo
+        stress_c = np.where(self.emax < strain, 2*(self.fo)*(X) / (1 + X**2), self.alpha*self.fo)
+        
+        return np.where(strain >= 0, stress_t, stress_c)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus (dstress/dstrain)"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # tension
+        if self.take_tension:
+            Et_t = np.where(self.er < strain, 0.0, self.Ec)
+        else:
+            Et_t = np.zeros(strain.shape)
+        
+        # compression
+        X = strain/self.eo
+        Et_c = np.where(self.emax < strain, 2*self.fo*(1 - X**2) / (1 + X**2)**2 / self.eo, 0.0)
+        
+        return np.where(strain >= 0, Et_t, Et_c)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         # if in tension
@@ -672,6 +802,31 @@ class Bilinear(BasePatchFiber):
             
         return stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        stress = self.Es * strain
+        
+        slope = (self.fu-self.fy)/(self.emax-self.ey)
+        stress = np.where(stress < -self.fy, -self.fy + slope*(strain + self.ey),
+                 np.where(stress > self.fy, self.fy + slope*(strain - self.ey), stress))
+        
+        if self.emax != "inf":
+            stress = np.where((strain < -self.emax) | (strain > self.emax), 0.0, stress)
+        
+        return stress
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus (dstress/dstrain)"""
+        strain = np.asarray(strain, dtype=float)
+        slope = (self.fu-self.fy)/(self.emax-self.ey)
+        Et = np.where(np.abs(self.Es * strain) > self.fy, slope, self.Es)
+        
+        if self.emax != "inf":
+            Et = np.where(np.abs(strain) > self.emax, 0.0, Et)
+        
+        return Et
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -812,6 +967,27 @@ class Multilinear(BasePatchFiber):
         else:
             return -stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        conditions = [abs_strain <= self.ey1,
+                      abs_strain <= self.ey2,
+                      abs_strain <= self.strain1,
+                      abs_strain <= self.strain2,
+                      abs_strain <= self.strain3,
+                      abs_strain <= self.strain4]
+        choices = [self.Es * abs_strain,
+                   np.full(strain.shape, self.fy),
+                   self.fy + (self.stress1-self.fy)/(self.strain1-self.ey2) * (abs_strain-self.ey2),
+                   self.stress1 + (self.stress2-self.stress1)/(self.strain2-self.strain1) * (abs_strain-self.strain1),
+                   self.stress2 + (self.stress3-self.stress2)/(self.strain3-self.strain2) * (abs_strain-self.strain2),
+                   self.stress3 + (self.stress4-self.stress3)/(self.strain4-self.strain3) * (abs_strain-self.strain3)]
+        stress = np.select(conditions, choices, default=0.0)
+        
+        return np.where(strain > 0, stress, -stress)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -915,6 +1091,36 @@ class RambergOsgood(BasePatchFiber):
         else:
             return -stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain(). Newton-Raphson is run on all fibers at once"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        # Newton raphson (x = sigma, fx = strain)
+        tol = 1e-5
+        x = np.zeros(strain.shape)
+        for N in range(1000):
+            func = x/self.Es + 0.002 * (x/self.fy)**(self.n) - abs_strain
+            func_prime = 1/self.Es + (0.002/self.fy) * (self.n) * (x/self.fy)**(self.n - 1)
+            x = x - func/func_prime
+            if np.all(np.abs(func) <= tol):
+                break
+        else:
+            raise RuntimeError("Newton Raphson could not converge")
+        
+        # check if limiting strain is exceeded
+        stress = np.where(abs_strain > self.emax, 0.0, x)
+        
+        return np.where(strain > 0, stress, -stress)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus. Inverse of dstrain/dstress = 1/E + (0.002/fy)(n) * (stress/fy)^(n-1)"""
+        strain = np.asarray(strain, dtype=float)
+        stress = np.abs(self.stress_strain_array(strain))
+        Et = 1 / (1/self.Es + (0.002/self.fy) * (self.n) * (stress/self.fy)**(self.n - 1))
+        
+        return np.where(np.abs(strain) > self.emax, 0.0, Et)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -1014,6 +1220,32 @@ class MenegottoPinto(BasePatchFiber):
         else:
             return -stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        # calculate stress
+        ey = self.fy / self.Es
+        eo = abs_strain / ey
+        stress = (  self.b*eo + (1-self.b)*eo/ (1 + eo**self.n)**(1/self.n) ) * self.fy
+        
+        # check if limiting strain is exceeded
+        stress = np.where(abs_strain > self.emax, 0.0, stress)
+        
+        return np.where(strain > 0, stress, -stress)
+    
+    def tangent_array(self, strain):
+        """vectorized tangent modulus. dstress/dstrain = Es * (b + (1-b) / (1 + eo^n)^(1+1/n))"""
+        strain = np.asarray(strain, dtype=float)
+        abs_strain = np.abs(strain)
+        
+        ey = self.fy / self.Es
+        eo = abs_strain / ey
+        Et = self.Es * (self.b + (1-self.b) / (1 + eo**self.n)**(1 + 1/self.n))
+        
+        return np.where(abs_strain > self.emax, 0.0, Et)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if abs(strain) > self.emax:
@@ -1128,6 +1360,28 @@ class Custom_Trilinear(BasePatchFiber):
             
         return stress
         
+    def stress_strain_array(self, strain):
+        """vectorized version of stress_strain()"""
+        strain = np.asarray(strain, dtype=float)
+        
+        # compression backbone curve
+        stress_c = np.select(
+            [strain >= self.strain1n, strain >= self.strain2n, strain >= self.strain3n],
+            [0 + (self.stress1n - 0)/(self.strain1n - 0) * strain,
+             self.stress1n + (self.stress2n - self.stress1n)/(self.strain2n - self.strain1n) * (strain - self.strain1n),
+             self.stress2n + (self.stress3n - self.stress2n)/(self.strain3n - self.strain2n) * (strain - self.strain2n)],
+            default=0.0)
+        
+        # tension backbone curve
+        stress_t = np.select(
+            [strain <= self.strain1p, strain <= self.strain2p, strain <= self.strain3p],
+            [0 + (self.stress1p - 0)/(self.strain1p - 0) * strain,
+             self.stress1p + (self.stress2p - self.stress1p)/(self.strain2p - self.strain1p) * (strain - self.strain1p),
+             self.stress2p + (self.stress3p - self.stress2p)/(self.strain3p - self.strain2p) * (strain - self.strain2p)],
+            default=0.0)
+        
+        return np.where(strain < 0, stress_c, stress_t)
+    
     def color_map(self, strain, stress):
         """color map for visualization"""
         if strain < 0:
@@ -1149,3 +1403,123 @@ class Custom_Trilinear(BasePatchFiber):
             elif stress > self.stress3p:
                 return "white"
 
+
+
+
+
+class ManderHysteretic(Mander):
+    """
+    Mander model for cyclic analysis (see section.run_cyclic_moment_curvature).
+    Monotonic behavior is identical to Mander, which is used as the compression envelope.
+        
+    Input parameters:
+        see Mander
+                            
+    Hysteretic Behavior:
+        Unloading and reloading follow a straight line between the most compressive point reached on the
+        envelope and the plastic strain at zero stress (Karsan & Jirsa 1969). Concrete in tension follows
+        the tension rule of Mander shifted by the plastic strain, and carries no tension once cracked.
+        See fkit.hysteresis.concrete for details.
+    """
+    def __init__(self, fpc, eo, emax, Ec="default", alpha=0, 
+                 take_tension=False, fr="default", er="default",
+                 default_color="lightgray", vertices=None):
+        super().__init__(fpc, eo, emax, Ec=Ec, alpha=alpha, take_tension=take_tension, fr=fr, er=er,
+                         default_color=default_color, vertices=vertices)
+        self.name = "ManderHysteretic"
+    
+    def init_state(self, N):
+        """initial hysteretic state of N fibers"""
+        return fkit.hysteresis.concrete_state(N)
+    
+    def stress_strain_cyclic(self, strain, state):
+        """path-dependent stress-strain relationship. Returns stress and trial state"""
+        return fkit.hysteresis.concrete(self, np.asarray(strain, dtype=float), state)
+
+
+
+
+class TodeschiniHysteretic(Todeschini):
+    """
+    Todeschini model for cyclic analysis (see section.run_cyclic_moment_curvature).
+    Monotonic behavior is identical to Todeschini, which is used as the compression envelope.
+        
+    Input parameters:
+        see Todeschini
+                            
+    Hysteretic Behavior:
+        see ManderHysteretic
+    """
+    def __init__(self, fpc, Ec="default", eo="default", emax=0.0038, alpha=0, 
+                 take_tension=False, fr="default", er="default",
+                 default_color="lightgray", vertices=None):
+        super().__init__(fpc, Ec=Ec, eo=eo, emax=emax, alpha=alpha, take_tension=take_tension, fr=fr, er=er,
+                         default_color=default_color, vertices=vertices)
+        self.name = "TodeschiniHysteretic"
+    
+    def init_state(self, N):
+        """initial hysteretic state of N fibers"""
+        return fkit.hysteresis.concrete_state(N)
+    
+    def stress_strain_cyclic(self, strain, state):
+        """path-dependent stress-strain relationship. Returns stress and trial state"""
+        return fkit.hysteresis.concrete(self, np.asarray(strain, dtype=float), state)
+
+
+
+
+class BilinearHysteretic(Bilinear):
+    """
+    Bilinear model with kinematic hardening for cyclic analysis (see section.run_cyclic_moment_curvature).
+    Monotonic behavior is identical to Bilinear, which is used as the backbone curve.
+        
+    Input parameters:
+        see Bilinear
+                            
+    Hysteretic Behavior:
+        see fkit.nodefiber.BilinearHysteretic
+    """
+    def __init__(self, fy, Es, fu="default", ey="default", emax=0.1, default_color="slategray", vertices=None):
+        super().__init__(fy, Es, fu=fu, ey=ey, emax=emax, default_color=default_color, vertices=vertices)
+        self.name = "BilinearHysteretic"
+    
+    def init_state(self, N):
+        """initial hysteretic state of N fibers"""
+        return fkit.hysteresis.bilinear_state(N)
+    
+    def stress_strain_cyclic(self, strain, state):
+        """path-dependent stress-strain relationship. Returns stress and trial state"""
+        return fkit.hysteresis.bilinear(self, np.asarray(strain, dtype=float), state)
+
+
+
+
+class MenegottoPintoHysteretic(MenegottoPinto):
+    """
+    Menegotto-Pinto model for cyclic analysis (see section.run_cyclic_moment_curvature).
+    Monotonic behavior is identical to MenegottoPinto, which is used as the backbone curve.
+        
+    Input parameters:
+        see MenegottoPinto. n is the initial value of the curvature parameter R
+        
+        cR1             (OPTIONAL) curvature degradation parameter
+                            - Default = 0.925
+        cR2             (OPTIONAL) curvature degradation parameter
+                            - Default = 0.15
+                            
+    Hysteretic Behavior:
+        see fkit.nodefiber.MenegottoPintoHysteretic
+    """
+    def __init__(self, fy, Es, b, n, emax=0.16, cR1=0.925, cR2=0.15, default_color="slategray", vertices=None):
+        super().__init__(fy, Es, b, n, emax=emax, default_color=default_color, vertices=vertices)
+        self.name = "MenegottoPintoHysteretic"
+        self.cR1 = cR1
+        self.cR2 = cR2
+    
+    def init_state(self, N):
+        """initial hysteretic state of N fibers"""
+        return fkit.hysteresis.menegotto_pinto_state(N, self.n)
+    
+    def stress_strain_cyclic(self, strain, state):
+        """path-dependent stress-strain relationship. Returns stress and trial state"""
+        return fkit.hysteresis.menegotto_pinto(self, np.asarray(strain, dtype=float), state)
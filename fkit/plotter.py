@@ -1,7 +1,15 @@
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import matplotlib.collections
+import matplotlib.colors
+import matplotlib.animation
+import matplotlib.figure
 import numpy as np
 import os
+import concurrent.futures
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 def preview_fiber(fiber,x_limit=[-0.03, 0.03]):
@@ -59,22 +67,23 @@ def compare_fibers(fibers, labels, x_limit):
     return fig
 
 
-def preview_section(section, show_tag=False):
+def preview_section(section, show_tag=False, rasterize=False):
     """
     Preview section geometry
         section         section object
         show_tag        flag to show node fiber tags
                             OPTIONAL: default = False
+        rasterize       flag to rasterize fibers when saving to vector formats (e.g. svg) to reduce file size
+                            OPTIONAL: default = False
     """
     # initialize
     fig, axs = plt.subplots(figsize=(11,8.5))
-    for f in section.node_fibers:
-        radius = (f.area/3.1415926)**(0.5)
-        axs.add_patch(patches.Circle(f.coord,radius=radius,facecolor=f.default_color,edgecolor="black",zorder=2,lw=2))
-        if show_tag:
+    patch_colors = [f.default_color for f in section.patch_fibers]
+    node_colors = [f.default_color for f in section.node_fibers]
+    add_fiber_collections(axs, section, patch_colors, node_colors, node_lw=2, rasterize=rasterize)
+    if show_tag:
+        for f in section.node_fibers:
             axs.annotate("{}".format(f.tag), xy=(f.coord[0],f.coord[1]), xycoords='data', xytext=(0, 15), textcoords='offset points', fontsize=24, c="red")
-    for f in section.patch_fibers:
-        axs.add_patch(patches.Polygon(np.array(f.vertices),closed=True,facecolor=f.default_color,edgecolor="black",zorder=1,lw=1.0))
         
     # plot centroid
     axs.scatter(section.centroid[0], section.centroid[1], c="red", marker="x",linewidth=3, s=240, zorder=3)
@@ -89,10 +98,12 @@ def preview_section(section, show_tag=False):
     return fig
 
 
-def plot_MK(section):
+def plot_MK(section, rasterize=False):
     """
     Plot moment curvature analysis
         section     section object
+        rasterize   flag to rasterize fibers when saving to vector formats (e.g. svg) to reduce file size
+                        OPTIONAL: default = False
     """
     if not section.MK_solved:
         raise RuntimeError("Please run moment curvature analysis before plotting")
@@ -100,11 +111,9 @@ def plot_MK(section):
     fig, axs = plt.subplots(1,2,figsize=(16,9),gridspec_kw={'width_ratios':[1,1]})
     
     # plot meshes
-    for f in section.node_fibers:
-        radius = (f.area/3.1415926)**(0.5)
-        axs[0].add_patch(patches.Circle(f.coord,radius=radius,facecolor=f.color_list[-1],edgecolor="black",zorder=2))
-    for f in section.patch_fibers:
-        axs[0].add_patch(patches.Polygon(np.array(f.vertices),closed=True,facecolor=f.color_list[-1],edgecolor="black",zorder=1,lw=1.0))
+    patch_colors = [f.color_list[-1] for f in section.patch_fibers]
+    node_colors = [f.color_list[-1] for f in section.node_fibers]
+    add_fiber_collections(axs[0], section, patch_colors, node_colors, rasterize=rasterize)
     
     # plot centroid
     axs[0].scatter(section.centroid[0], section.centroid[1], c="red", marker="x",linewidth=3,s=240, zorder=3)
@@ -131,63 +140,172 @@ def plot_MK(section):
 
 
 
-def animate_MK(section):
+def animate_MK(section, filename=None, fps=20, dpi=100, callback=None):
     """
-    Generate a folder containing pngs which can be converted to gif
+    Animate moment curvature analysis
         section     section object
-        
-    Run this in cmd with ImageMagick: "magick -delay 5 -loop 0 *.png demo.gif"
+        filename    output file. Format is determined by the extension:
+                        .gif    written with pillow
+                        .mp4    streamed to ffmpeg (must be installed)
+                        .png    one png per frame in a folder named after the file (e.g. for ImageMagick)
+                        OPTIONAL: default = "animate_MK.gif" in the section output folder
+        fps         frames per second
+                        OPTIONAL: default = 20
+        dpi         resolution of each frame
+                        OPTIONAL: default = 100
+        callback    function called with (frame, N_frame) after each frame is rendered. See fkit.progress.throttle()
+                        OPTIONAL: default = None
+    
+    A single off-screen figure is rendered once. Each fiber type is drawn as one collection and only
+    face colors and the moment curvature curve are redrawn on top of the static background (blitting).
     """
-    plt.ioff()
+    import subprocess
+    from PIL import Image
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
     if not section.MK_solved:
         raise RuntimeError("Please run moment curvature analysis before animating")
-        
-    if not section.folder_created:
-        section.create_output_folder()
     
+    if filename is None:
+        if not section.folder_created:
+            section.create_output_folder()
+        filename = os.path.join(section.output_dir, "animate_MK.gif")
+    file_format = os.path.splitext(filename)[1].lower()
+    if file_format not in [".gif", ".mp4", ".png"]:
+        raise ValueError("Unknown animation format: {}. Use .gif, .mp4, or .png".format(file_format))
+    
+    # fiber colors of all frames. Shape = (N_frame, N_fiber, 4)
     N_frame = len(section.curvature)
-    save_dir = os.path.join(section.output_dir, "animate")
-    os.makedirs(save_dir)
+    patch_colors = get_color_history(section.patch_fibers, N_frame)
+    node_colors = get_color_history(section.node_fibers, N_frame)
     
-    for i in range(N_frame):  
-        print("\tcreating frame {}...".format(i))
-        fig, axs = plt.subplots(1,2,figsize=(16,9),gridspec_kw={'width_ratios':[1,1]})
-        
-        # plot meshes
-        for f in section.node_fibers:
-            radius = (f.area/3.1415926)**(0.5)
-            axs[0].add_patch(patches.Circle(f.coord,radius=radius,facecolor=f.color_list[i],edgecolor="black",zorder=2))
-        for f in section.patch_fibers:
-            axs[0].add_patch(patches.Polygon(np.array(f.vertices),closed=True,facecolor=f.color_list[i],edgecolor="black",zorder=1,lw=1.0))
-        
-        # plot centroid
-        axs[0].scatter(section.centroid[0], section.centroid[1], c="red", marker="x",linewidth=3,s=240, zorder=3)
-        
-        # formatting
-        fig.suptitle("Moment Curvature Analysis (P = {})".format(section.axial))
-        axs[0].xaxis.grid()
-        axs[0].yaxis.grid()
-        axs[0].set_axisbelow(True)
-        axs[0].set_aspect('equal', 'box')
+    # figure is not managed by pyplot, so it does not need to be closed
+    fig = matplotlib.figure.Figure(figsize=(16,9), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    axs = fig.subplots(1,2,gridspec_kw={'width_ratios':[1,1]})
     
-        # plot Moment Curvature
-        axs[1].plot(section.curvature[:i],section.momentx[:i], lw=3, c="#435be2")
-        axs[1].set_xlim(0, max(section.curvature)*1.1)
-        axs[1].set_ylim(0, max(section.momentx)*1.1)
-        axs[1].xaxis.grid()
-        axs[1].yaxis.grid()
-        axs[1].axhline(0, color='black')
-        axs[1].axvline(0, color='black')
-        axs[1].set_xlabel("Curvature")
-        axs[1].set_ylabel("Moment")
-        plt.tight_layout()
-        
-        filename = os.path.join(save_dir,"frame{:04d}.png".format(i))
-        fig.savefig(filename)
-        
+    # plot meshes
+    patch_collection, node_collection = add_fiber_collections(axs[0], section, patch_colors[0], node_colors[0])
+    
+    # plot centroid
+    axs[0].scatter(section.centroid[0], section.centroid[1], c="red", marker="x",linewidth=3,s=240, zorder=3)
+    
+    # formatting
+    fig.suptitle("Moment Curvature Analysis (P = {})".format(section.axial))
+    axs[0].xaxis.grid()
+    axs[0].yaxis.grid()
+    axs[0].set_axisbelow(True)
+    axs[0].set_aspect('equal', 'box')
+    
+    # plot Moment Curvature
+    line, = axs[1].plot([], [], lw=3, c="#435be2")
+    axs[1].set_xlim(min(0, min(section.curvature))*1.1, max(0, max(section.curvature))*1.1)
+    axs[1].set_ylim(min(0, min(section.momentx))*1.1, max(0, max(section.momentx))*1.1)
+    axs[1].xaxis.grid()
+    axs[1].yaxis.grid()
+    axs[1].axhline(0, color='black')
+    axs[1].axvline(0, color='black')
+    axs[1].set_xlabel("Curvature")
+    axs[1].set_ylabel("Moment")
+    fig.tight_layout()
+    
+    # render static background once
+    animated_artists = [patch_collection, node_collection, line]
+    for artist in animated_artists:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    width, height = canvas.get_width_height()
+    
+    def render_frame(i):
+        patch_collection.set_facecolor(patch_colors[i])
+        node_collection.set_facecolor(node_colors[i])
+        line.set_data(section.curvature[:i], section.momentx[:i])
+        canvas.restore_region(background)
+        for artist in animated_artists:
+            fig.draw_artist(artist)
+        if callback is not None:
+            callback(i+1, N_frame)
+        return np.asarray(canvas.buffer_rgba())
+    
+    # frames are rendered sequentially, image encoding (which releases the GIL) runs in a thread pool
+    if file_format == ".png":
+        save_dir = os.path.splitext(filename)[0]
+        os.makedirs(save_dir, exist_ok=True)
+        def save_png(image, i):
+            image.save(os.path.join(save_dir,"frame{:04d}.png".format(i)), compress_level=1)
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            futures = [pool.submit(save_png, Image.fromarray(render_frame(i).copy()), i) for i in range(N_frame)]
+            [f.result() for f in futures]
+    elif file_format == ".gif":
+        def quantize(image):
+            return image.convert("RGB").quantize(method=Image.Quantize.FASTOCTREE)
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            frames = list(pool.map(quantize, [Image.fromarray(render_frame(i).copy()) for i in range(N_frame)]))
+        frames[0].save(filename, save_all=True, append_images=frames[1:], duration=1000/fps, loop=0)
+    else:
+        command = [matplotlib.animation.FFMpegWriter.bin_path(), "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "rgba", "-s", "{}x{}".format(width, height), "-r", str(fps), "-i", "-",
+                   "-vcodec", "libx264", "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", filename]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as process:
+            for i in range(N_frame):
+                process.stdin.write(render_frame(i).tobytes())
+            process.stdin.close()
+    logger.info("Animation saved to: %s", filename)
+    return filename
+
+
+
+def get_color_history(fibers, N_frame):
+    """color_list of all fibers converted to an RGBA array of shape (N_frame, N_fiber, 4)"""
+    colors = [c for f in fibers for c in f.color_list[:N_frame]]
+    colors = matplotlib.colors.to_rgba_array(colors) if len(colors) > 0 else np.zeros((0,4))
+    return colors.reshape(len(fibers), N_frame, 4).transpose(1,0,2)
+
+
+
+def get_patch_vertices(section):
+    """vertices of all patch fibers as an array of shape (N_patch, N_vertex, 2)"""
+    if len(section.patch_fibers) == 0:
+        return np.zeros((0,5,2))
+    return np.array([f.vertices for f in section.patch_fibers], dtype=float)
+
+
+
+def get_node_vertices(section, N_side=24):
+    """node fibers approximated as polygons with the same area as the rebar. Shape = (N_node, N_side, 2)"""
+    if len(section.node_fibers) == 0:
+        return np.zeros((0,N_side,2))
+    coord = np.array([f.coord for f in section.node_fibers], dtype=float)
+    radius = (np.array([f.area for f in section.node_fibers], dtype=float)/3.1415926)**(0.5)
+    theta = np.linspace(0, 2*np.pi, N_side, endpoint=False)
+    unit_circle = np.column_stack([np.cos(theta), np.sin(theta)])
+    return coord[:,None,:] + radius[:,None,None] * unit_circle[None,:,:]
+
+
+
+def add_fiber_collections(ax, section, patch_color, node_color, node_lw=1.0, rasterize=False):
+    """
+    Draw all patch fibers as one PolyCollection and all node fibers as another
+        patch_color     a color or list of colors (one per patch fiber)
+        node_color      a color or list of colors (one per node fiber)
+        node_lw         edge line width of node fibers
+        rasterize       flag to rasterize fibers when saving to vector formats
+    Returns:
+        patch_collection, node_collection
+    """
+    patch_collection = matplotlib.collections.PolyCollection(get_patch_vertices(section), closed=True, rasterized=rasterize,
+                                                             facecolors=patch_color, edgecolors="black", zorder=1, lw=1.0)
+    node_collection = matplotlib.collections.PolyCollection(get_node_vertices(section), closed=True, rasterized=rasterize,
+                                                            facecolors=node_color, edgecolors="black", zorder=2, lw=node_lw)
+    ax.add_collection(patch_collection)
+    ax.add_collection(node_collection)
+    ax.autoscale_view()
+    return patch_collection, node_collection
+
 
 
-def plot_PM(section, P=None, M=None):
+def plot_PM(section, P=None, M=None, rasterize=False):
     """
     Plot section ACI 318 PM interaction surface (both nominal and factored)
         section     section object
@@ -195,6 +313,8 @@ def plot_PM(section, P=None, M=None):
                         OPTIONAL: default = None
         M           list of moment demand
                         OPTIONAL: default = None
+        rasterize   flag to rasterize fibers when saving to vector formats (e.g. svg) to reduce file size
+                        OPTIONAL: default = False
     Note:
         Internally within fkit, the sign convention is +P = tension, -P = compression
         For plotting and exporting purposes, the sign on P is flipped such that the positive
@@ -206,11 +326,9 @@ def plot_PM(section, P=None, M=None):
     fig, axs = plt.subplots(1,2,figsize=(16,9),gridspec_kw={'width_ratios':[1,1]})
     
     # plot meshes
-    for f in section.node_fibers:
-        radius = (f.area/3.1415926)**(0.5)
-        axs[0].add_patch(patches.Circle(f.coord,radius=radius,facecolor=f.default_color,edgecolor="black",zorder=2))
-    for f in section.patch_fibers:
-        axs[0].add_patch(patches.Polygon(np.array(f.vertices),closed=True,facecolor=f.default_color,edgecolor="black",zorder=1,lw=1.0))
+    patch_colors = [f.default_color for f in section.patch_fibers]
+    node_colors = [f.default_color for f in section.node_fibers]
+    add_fiber_collections(axs[0], section, patch_colors, node_colors, rasterize=rasterize)
     
     # plot centroid
     axs[0].scatter(section.centroid[0], section.centroid[1], c="red", marker="x",linewidth=3,s=300, zorder=3)
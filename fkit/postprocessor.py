@@ -0,0 +1,168 @@
+"""
+Post-processing of moment curvature results.
+
+Functions in this module operate on one or many analyzed sections (or table_MK dataframes)
+at once and reduce each moment curvature curve to a handful of key points.
+"""
+import numpy as np
+import fkit.section
+
+
+
+
+def get_yield_strain(fiber):
+    """
+    Infer yield strain of a fiber material. Returns None for materials without a yield point (e.g. concrete)
+    """
+    if hasattr(fiber, "ey"):
+        return fiber.ey
+    elif hasattr(fiber, "ey1"):
+        return fiber.ey1
+    elif hasattr(fiber, "fy") and hasattr(fiber, "Es"):
+        return fiber.fy / fiber.Es
+    elif hasattr(fiber, "strain1p"):
+        return fiber.strain1p
+    return None
+
+
+def get_yield_ratio(section, concrete_strain=0.002):
+    """
+    Ratio of fiber strain to yield strain at each step of moment curvature analysis.
+    Steel fibers yield at their yield strain (tension or compression). Fibers without a yield
+    point (concrete) yield when compressive strain reaches concrete_strain.
+
+    Returns:
+        array of length N_step containing the maximum ratio over all fibers
+    """
+    fibers = section.patch_fibers + section.node_fibers
+    strain = np.array([f.strain for f in fibers], dtype=float)
+
+    ratio = np.zeros(strain.shape)
+    for material, indices in section.material_groups:
+        ey = get_yield_strain(material)
+        if ey is not None:
+            ratio[indices] = np.abs(strain[indices]) / ey
+        elif concrete_strain is not None:
+            ratio[indices] = -strain[indices] / concrete_strain
+    return ratio.max(axis=0)
+
+
+def idealize_MK(results, concrete_strain=0.002, ultimate_drop=0.8, secant_fraction=0.75):
+    """
+    Extract key points and an equivalent elastic-perfectly-plastic (bilinear) idealization
+    from one or many moment curvature results. All curves are padded into 2D arrays
+    and processed together.
+
+    Arguments:
+        results             a section object or table_MK dataframe, or a list of them.
+                                First yield can only be determined from section objects since it
+                                requires fiber strain history. It is reported as NaN for dataframes,
+                                and EI_eff is taken as a secant stiffness instead (see secant_fraction)
+        concrete_strain     compressive strain at which fibers without a yield point (concrete) are considered yielded
+                                OPTIONAL: default = 0.002. Set to None to only consider steel yielding
+        ultimate_drop       ultimate curvature is taken where moment drops to this fraction of peak moment
+                                OPTIONAL: default = 0.8. Last analysis point is used if moment never drops that far
+        secant_fraction     for dataframe results, EI_eff is the secant stiffness where moment first reaches
+                            secant_fraction * peak moment
+                                OPTIONAL: default = 0.75
+
+    Returns:
+        df_summary          a dataframe with one row per result
+
+    Algorithm:
+        1.) first yield is the first point where any fiber reaches its yield strain. Linearly interpolated
+            between analysis steps using fiber strain history.
+        2.) effective stiffness is the secant stiffness at first yield: EI_eff = M_firstyield / phi_firstyield
+            For dataframes, the secant is taken where moment first reaches secant_fraction * peak moment
+        3.) ultimate curvature (phi_u) is where moment falls below ultimate_drop * peak moment after the peak
+        4.) idealized plastic moment (Mp) is chosen such that area under bilinear curve with initial slope EI_eff
+            is equal to area under the moment curvature curve up to phi_u:
+                area = Mp * phi_u - Mp^2 / (2 EI_eff)
+        5.) idealized yield curvature = Mp / EI_eff, ductility = phi_u / idealized yield curvature
+    """
+    if not isinstance(results, (list, tuple)):
+        results = [results]
+
+    # pad all curves into 2D arrays
+    N_result = len(results)
+    N_step = 0
+    tables = []
+    for r in results:
+        table = r.table_MK if isinstance(r, fkit.section.Section) else r
+        tables.append(table)
+        N_step = max(N_step, len(table))
+    phi = np.full((N_result, N_step), np.nan)
+    M = np.full((N_result, N_step), np.nan)
+    yield_ratio = np.full((N_result, N_step), np.nan)
+    axial = np.zeros(N_result)
+    is_section = np.array([isinstance(r, fkit.section.Section) for r in results])
+    for i, (r, table) in enumerate(zip(results, tables)):
+        n = len(table)
+        phi[i,:n] = table["Curvature"]
+        M[i,:n] = table["Moment"]
+        axial[i] = table["Axial"].iloc[0]
+        if isinstance(r, fkit.section.Section):
+            yield_ratio[i,:n] = get_yield_ratio(r, concrete_strain)
+    rows = np.arange(N_result)
+    last = np.sum(~np.isnan(phi), axis=1) - 1
+
+    # first yield (interpolated between step k-1 and k)
+    yielded = yield_ratio >= 1
+    has_yield = yielded.any(axis=1)
+    k = np.maximum(np.argmax(yielded, axis=1), 1)
+    r0, r1 = yield_ratio[rows,k-1], yield_ratio[rows,k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip((1 - r0) / (r1 - r0), 0, 1)
+    phi_y = np.where(has_yield, phi[rows,k-1] + t*(phi[rows,k] - phi[rows,k-1]), np.nan)
+    M_y = np.where(has_yield, M[rows,k-1] + t*(M[rows,k] - M[rows,k-1]), np.nan)
+
+    # peak moment
+    k_peak = np.nanargmax(M, axis=1)
+    M_peak = M[rows,k_peak]
+    phi_peak = phi[rows,k_peak]
+    steps = np.arange(N_step)
+
+    # effective stiffness. Secant at secant_fraction * peak moment without fiber strain history
+    reached = (steps[None,:] <= k_peak[:,None]) & (M >= secant_fraction*M_peak[:,None])
+    k = np.maximum(np.argmax(reached, axis=1), 1)
+    m0, m1 = M[rows,k-1], M[rows,k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip((secant_fraction*M_peak - m0) / (m1 - m0), 0, 1)
+        EI_secant = (m0 + t*(m1 - m0)) / (phi[rows,k-1] + t*(phi[rows,k] - phi[rows,k-1]))
+    EI_eff = np.where(is_section, M_y / phi_y, EI_secant)
+
+    # ultimate curvature (interpolated between step k-1 and k)
+    dropped = (steps[None,:] > k_peak[:,None]) & (M < ultimate_drop*M_peak[:,None])
+    has_drop = dropped.any(axis=1)
+    k = np.where(has_drop, np.argmax(dropped, axis=1), last)
+    m0, m1 = M[rows,k-1], M[rows,k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(has_drop, np.clip((ultimate_drop*M_peak - m0) / (m1 - m0), 0, 1), 1.0)
+    phi_u = phi[rows,k-1] + t*(phi[rows,k] - phi[rows,k-1])
+    M_u = m0 + t*(m1 - m0)
+
+    # area under curve up to ultimate curvature (trapezoidal rule)
+    segment = 0.5 * (M[:,1:] + M[:,:-1]) * (phi[:,1:] - phi[:,:-1])
+    segment = np.where(steps[None,1:] < k[:,None], segment, 0)
+    area = np.nansum(segment, axis=1) + 0.5*(m0 + M_u)*(phi_u - phi[rows,k-1])
+
+    # equal-area elastic-perfectly-plastic idealization
+    with np.errstate(invalid="ignore"):
+        Mp = EI_eff * (phi_u - np.sqrt(phi_u**2 - 2*area/EI_eff))
+    phi_y_ideal = Mp / EI_eff
+    ductility = phi_u / phi_y_ideal
+
+    # compile summary table
+    result_dict = dict()
+    result_dict["Axial"] = axial
+    result_dict["FirstYieldCurvature"] = phi_y
+    result_dict["FirstYieldMoment"] = M_y
+    result_dict["EI_eff"] = EI_eff
+    result_dict["PeakCurvature"] = phi_peak
+    result_dict["PeakMoment"] = M_peak
+    result_dict["UltimateCurvature"] = phi_u
+    result_dict["UltimateMoment"] = M_u
+    result_dict["IdealYieldCurvature"] = phi_y_ideal
+    result_dict["IdealPlasticMoment"] = Mp
+    result_dict["Ductility"] = ductility
+    return fkit.section.create_table(result_dict)
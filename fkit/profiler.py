@@ -0,0 +1,164 @@
+"""
+Opt-in instrumentation of analysis runs.
+
+Run an analysis with profile=True (e.g. section.run_moment_curvature(..., profile=True)) to collect an
+AnalysisStats object. It is stored in section.stats, attached to the result table (table.attrs["stats"]),
+and emitted on the "fkit.profiler" logger at INFO level when the analysis completes. The summary
+dictionary is attached to the log record as record.stats so handlers can consume structured data.
+
+Use profile="memory" to also trace peak memory with tracemalloc. Memory tracing slows down
+fiber-by-fiber analyses considerably, so timings collected this way are not representative.
+
+Example:
+    logging.getLogger("fkit.profiler").addHandler(logging.StreamHandler())
+    section.run_moment_curvature(phi_target=0.0005, profile=True)
+    section.stats.summary()
+"""
+import contextlib
+import logging
+import time
+import tracemalloc
+
+
+logger = logging.getLogger("fkit.profiler")
+
+
+class AnalysisStats:
+    """
+    Instrumentation data of one analysis run
+        analysis                name of the analysis
+        N_fiber                 number of fibers (patch + node)
+        mesh_time               time spent in the latest section.mesh() call (s)
+        total_time              wall time of the analysis (s)
+        stress_time             time spent evaluating fiber stress (s)
+                                    for fiber-by-fiber analyses (run_moment_curvature, run_PM_interaction) stress
+                                    evaluation and summation happen in the same loop and are both reported here
+        summation_time          time spent summing fiber forces and moments (s)
+        bookkeeping_time        time spent recording converged fiber states and re-meshing (s)
+        solver_time             remainder of total_time (root finding logic, overhead) (s)
+        residual_evaluations    number of residual (equilibrium) evaluations at each step
+        iterations              number of solver iterations at each step
+        peak_memory             peak memory traced during the analysis (bytes). None unless trace_memory = True
+    """
+    def __init__(self, analysis, section, trace_memory=False):
+        self.analysis = analysis
+        self.N_fiber = len(section.patch_fibers) + len(section.node_fibers)
+        self.mesh_time = section.mesh_time
+        self.total_time = 0
+        self.stress_time = 0
+        self.summation_time = 0
+        self.bookkeeping_time = 0
+        self.residual_evaluations = []
+        self.iterations = []
+        self.peak_memory = None
+        self.trace_memory = trace_memory
+        self._time_start = None
+        self._started_tracemalloc = False
+
+    @property
+    def solver_time(self):
+        return self.total_time - self.stress_time - self.summation_time - self.bookkeeping_time
+
+    def start(self):
+        """start timer and memory tracing"""
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+        self._time_start = time.perf_counter()
+
+    def stop(self):
+        """stop timer and memory tracing, then emit summary to the fkit.profiler logger"""
+        self.total_time = time.perf_counter() - self._time_start
+        if self.trace_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        logger.info("%s", self, extra={"stats": self.summary()})
+
+    @contextlib.contextmanager
+    def timer(self, category):
+        """accumulate elapsed time into stress, summation, or bookkeeping"""
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            name = category + "_time"
+            setattr(self, name, getattr(self, name) + time.perf_counter() - time_start)
+
+    def new_step(self):
+        self.residual_evaluations.append(0)
+        self.iterations.append(0)
+
+    def count_residual(self, n=1):
+        if len(self.residual_evaluations) == 0:
+            self.new_step()
+        self.residual_evaluations[-1] += n
+
+    def count_iteration(self, n=1):
+        if len(self.iterations) == 0:
+            self.new_step()
+        self.iterations[-1] += n
+
+    def summary(self):
+        """return a dictionary of scalar statistics"""
+        return {"analysis": self.analysis,
+                "N_fiber": self.N_fiber,
+                "N_step": len(self.residual_evaluations),
+                "mesh_time": self.mesh_time,
+                "total_time": self.total_time,
+                "stress_time": self.stress_time,
+                "summation_time": self.summation_time,
+                "bookkeeping_time": self.bookkeeping_time,
+                "solver_time": self.solver_time,
+                "residual_evaluations": sum(self.residual_evaluations),
+                "iterations": sum(self.iterations),
+                "peak_memory": self.peak_memory}
+
+    def __repr__(self):
+        s = self.summary()
+        text = ("{} stats: {} fibers, {} steps, {} residual evaluations, {} iterations. "
+                "Time (s): total {:.3f} = stress {:.3f} + summation {:.3f} + bookkeeping {:.3f} + solver {:.3f}. "
+                "Mesh time {:.3f} s.").format(
+                    s["analysis"], s["N_fiber"], s["N_step"], s["residual_evaluations"], s["iterations"],
+                    s["total_time"], s["stress_time"], s["summation_time"], s["bookkeeping_time"], s["solver_time"],
+                    s["mesh_time"])
+        if s["peak_memory"] is not None:
+            text += " Peak memory {:.1f} MB".format(s["peak_memory"]/1e6)
+        return text
+
+
+def create_stats(profile, analysis, section):
+    """
+    Return an AnalysisStats object for an analysis run, or None if profile is False.
+        profile     False, True (timings and counters), or "memory" (also trace peak memory)
+    """
+    if not profile:
+        return None
+    return AnalysisStats(analysis, section, trace_memory=(profile == "memory"))
+
+
+class NullStats:
+    """No-op stand-in for AnalysisStats used when profiling is disabled"""
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def timer(self, category):
+        return contextlib.nullcontext()
+
+    def new_step(self):
+        pass
+
+    def count_residual(self, n=1):
+        pass
+
+    def count_iteration(self, n=1):
+        pass
+
+
+NULL_STATS = NullStats()
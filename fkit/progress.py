@@ -0,0 +1,130 @@
+"""
+Progress reporting and log output of fkit.
+
+All messages (analysis status, warnings, export folders) are emitted through the standard logging
+module on the "fkit" logger hierarchy (e.g. "fkit.section"). Importing fkit only attaches a NullHandler,
+so records propagate to whatever logging configuration the application sets up (e.g. logging.basicConfig()).
+For interactive use, set_verbosity() or enable_console_output() opt in to printing messages to stdout.
+Analyses run with show_progress=True print their per-step status for the duration of the run (see progress_output()).
+
+Per-step progress is delivered to an optional callback. Wrap it with throttle() to limit how often
+it runs, e.g. when pushing updates to a GUI or a message queue.
+
+Example:
+    fkit.progress.set_verbosity()                       # print analysis status to the console
+    fkit.progress.set_verbosity(logging.WARNING)        # only show warnings
+    fkit.progress.set_verbosity(None)                   # silent
+    section.run_moment_curvature(phi_target, callback=fkit.progress.throttle(update_gui, interval=0.5))
+"""
+import contextlib
+import logging
+import sys
+import time
+
+
+logger = logging.getLogger("fkit")
+_handler = None
+
+
+def set_verbosity(level=logging.INFO):
+    """
+    Set level of fkit log output. If the application has not configured logging (no handlers on the root
+    logger), a console handler is attached so that messages are printed (see enable_console_output())
+        level       logging level (e.g. logging.INFO, logging.WARNING). None or False to silence fkit entirely
+                        OPTIONAL: default = logging.INFO
+    """
+    set_level(level)
+    if level is not None and level is not False and not logging.getLogger().handlers:
+        enable_console_output(level)
+
+
+def set_level(level):
+    """Set level of the fkit logger without attaching any handler. None or False to silence fkit entirely"""
+    if level is None or level is False:
+        logger.setLevel(logging.CRITICAL + 1)
+    else:
+        logger.setLevel(level)
+
+
+def enable_console_output(level=logging.INFO):
+    """
+    Attach a console handler printing bare messages to stdout. fkit messages then no longer propagate
+    to the root logger. Calling it repeatedly does not add more handlers.
+    """
+    global _handler
+    if _handler is None:
+        _handler = logging.StreamHandler(sys.stdout)
+        _handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_handler)
+        logger.propagate = False
+    set_level(level)
+
+
+def disable_console_output():
+    """Remove the console handler added by enable_console_output(). Messages propagate to the root logger again"""
+    global _handler
+    if _handler is not None:
+        logger.removeHandler(_handler)
+        _handler = None
+        logger.propagate = True
+
+
+@contextlib.contextmanager
+def verbosity(level):
+    """
+    Context manager to temporarily change the level of fkit log output (see set_level()). No handler is attached
+    
+    Example:
+        with fkit.progress.verbosity(None):
+            section.run_moment_curvature(phi_target)        # no output
+    """
+    level_previous = logger.level
+    set_level(level)
+    try:
+        yield
+    finally:
+        logger.setLevel(level_previous)
+
+
+@contextlib.contextmanager
+def progress_output(enabled=True):
+    """
+    Context manager used by analyses run with show_progress=True. fkit messages are logged at INFO level
+    for the duration of the run. If neither the application (handlers on the root logger) nor
+    enable_console_output() has set up any output, messages are printed to stdout until the run ends.
+        enabled     flag to show progress. Does nothing if False
+                        OPTIONAL: default = True
+    """
+    if not enabled:
+        yield
+        return
+    level_previous = logger.level
+    console = _handler is None and not logging.getLogger().handlers
+    if console:
+        enable_console_output(logging.INFO)
+    elif logger.getEffectiveLevel() > logging.INFO:
+        set_level(logging.INFO)
+    try:
+        yield
+    finally:
+        if console:
+            disable_console_output()
+        logger.setLevel(level_previous)
+
+
+def throttle(callback, interval=0.5):
+    """
+    Wrap a progress callback such that it is called at most once every interval seconds. Skipped calls
+    return None, so a throttled callback can only stop an analysis (by returning False) when it runs.
+        callback    function called with the progress data
+        interval    minimum time between calls in seconds
+                        OPTIONAL: default = 0.5
+    """
+    time_last = [-float("inf")]
+    def throttled(*args, **kwargs):
+        time_now = time.monotonic()
+        if time_now - time_last[0] < interval:
+            return None
+        time_last[0] = time_now
+        return callback(*args, **kwargs)
+    return throttled
@@ -1,11 +1,25 @@
 import numpy as np
-import pandas as pd
 import math
-import scipy.optimize as sp
 import itertools
 import os
 import copy
 import time
+import concurrent.futures
+import json
+import logging
+import pickle
+
+import fkit.compiled
+import fkit.kernels
+import fkit.progress
+import fkit.tabulation
+from fkit.profiler import create_stats, NULL_STATS
+
+
+logger = logging.getLogger(__name__)
+
+# result table formats of export_data()
+TABLE_FORMATS = ["csv", "parquet", "feather", "npz"]
 
 
 
@@ -15,14 +29,35 @@ class Section:
         patch_fibers                list of patch fiber objects in section (usually concrete fibers)
         node_fibers                 list of node fiber objects in section (usually rebar)
         N_bar                       number of node fibers in section
-        N_fiber                     number of patch fibers in section
+        N_fiber                     number of patch fibers generated by add_patch() (not reduced when fibers are removed, see N_patch)
         area                        total area of all patch fibers
         centroid                    geometric centroid of section
         ymax                        max y coordinate of any fiber (used to determine fiber depth)
         depth                       total depth of section (dimension in y)
+        materials                   list of unique fiber materials in section. Each fiber has a mat_id pointing to this list
+        material_sources            user-specified fiber objects from which materials were copied
+        
+    Fiber arrays (built by mesh() and used by the vectorized solvers. Patch fibers first, then node fibers)
+        N_patch                     number of patch fibers in the fiber arrays. Node fibers start at this index
+        fiber_area                  array of fiber areas
+        fiber_ecc                   array of fiber eccentricities [dx,dy] with respect to section centroid
+        fiber_depth                 array of fiber depths with respect to max(y)
+        vertex_ecc                  array of patch vertex eccentricities. Used to locate extreme compression fiber
+        material_groups             list of [material, fiber_indices]. Fibers sharing a material are evaluated together
+        block_depth                 sorted depths of patch fibers used for ACI stress block integration (see get_stress_block())
+        block_sums                  cumulative [area, area*dy, area*dx] of patch fibers in order of block_depth (leading row of zeros)
+        material_state              committed hysteretic state of each material group during cyclic analysis (None otherwise).
+                                    A dictionary of per-fiber arrays for hysteretic materials (see fkit.hysteresis)
+        kernel_data                 material model ids and parameters of each fiber used by the numba backend (see fkit.kernels)
+        material_tables             dictionary of material => TabulatedCurve. Tabulated materials are evaluated by interpolation
+                                    in the vectorized solvers (see tabulate_materials())
+        
+        mesh_time                   time spent in the latest mesh() call (seconds)
+        stats                       AnalysisStats of the latest analysis run with profile=True. None otherwise (see fkit.profiler)
         
         MK_solved                   boolean to see if moment curvature analysis has been conducted
         PM_solved                   boolean to see if PM interaction analysis has been conducted
+        MK_surface_solved           boolean to see if moment curvature surface analysis has been conducted
         folder_created              boolean to see if export folder has already been created
         output_dir                  path where export data will be stored   
         
@@ -31,15 +66,23 @@ class Section:
         neutral_axis                list of neutral axis depth
         momentx                     list of major-axis moment
         momenty                     list of minor-axis moment (should be 0 for symmetric section)
-        K_tangent                   list of moment-curvature tangent slope
+        neutral_axis_angle          list of neutral axis angle in degrees (biaxial moment curvature analysis only)
+        K_tangent                   list of moment-curvature tangent slope (finite difference of momentx)
+        K_section                   list of section tangent stiffness matrices at each converged step (see get_section_tangent())
         axial                       user-specified axial force for moment-curvature analysis
         
+    From moment curvature surface analysis (moment curvature over a grid of axial loads)
+        MK_surface                  dictionary of results. "P" and "Curvature" are the grid axes, other keys are 
+                                    2D arrays of shape (N_P, N_step): "Moment", "NeutralAxis", "MinorAxisMoment", "Converged"
+        MK_interpolator             linear interpolator of moment over (P, curvature) (see SurfaceInterpolator)
+        
     From interaction surface analysis
         PM_surface                  key = orientation (0 to 360) 
                                     value = [[P], [Mx], [NA_depth], [My], [resistance_factor], [phi_P], [phi_Mx], [phi_My]]
     Result tables
         table_MK                    dataframe containing all moment curvature analysis results
         table_PM                    dataframe containing all PM interaction analysis results
+        table_MK_surface            dataframe containing all moment curvature surface results
     """
     def __init__(self):
         self.patch_fibers = []
@@ -50,28 +93,66 @@ class Section:
         self.centroid = None
         self.ymax = None
         self.depth = None
+        self.materials = []
+        self.material_sources = []
+        
+        self.N_patch = 0
+        self.fiber_area = None
+        self.fiber_ecc = None
+        self.fiber_depth = None
+        self.vertex_ecc = None
+        self.material_groups = []
+        self.block_depth = None
+        self.block_sums = None
+        self.material_state = None
+        self.trial_state = None
+        self.kernel_data = None
+        self.material_tables = {}
+        self.mesh_time = 0
+        self.stats = None
         
         self.curvature = []
         self.neutral_axis = []
+        self.neutral_axis_angle = []
         self.momentx = []
         self.momenty = []
         self.K_tangent = []
+        self.K_section = []
         self.axial = 0
         self.PM_surface = {}
         self.table_MK = None
         self.table_PM = None
+        self.MK_surface = {}
+        self.MK_interpolator = None
+        self.table_MK_surface = None
         
         self.MK_solved = False
         self.PM_solved = False
+        self.MK_surface_solved = False
         self.folder_created = False
         self.output_dir = None
     
+    def add_material(self, fiber):
+        """
+        Register the material of a user-specified fiber. Fibers generated from the same
+        fiber object share one material and are evaluated together by the vectorized solvers.
+        Returns the material id.
+        """
+        for i, source in enumerate(self.material_sources):
+            if source is fiber:
+                return i
+        self.material_sources.append(fiber)
+        self.materials.append(copy.deepcopy(fiber))
+        return len(self.materials) - 1
+    
+    
     def add_bar(self, coord, area, fiber):
         """add a single rebar at specified location"""
         copied_fiber = copy.deepcopy(fiber)
         copied_fiber.coord = coord
         copied_fiber.area = area
         copied_fiber.tag = self.N_bar
+        copied_fiber.mat_id = self.add_material(fiber)
         self.node_fibers.append(copied_fiber)
         self.N_bar += 1
 
@@ -145,10 +226,12 @@ class Section:
                 patch_vertices.append([node1,node2,node3,node4,node1])
         
         # generate patch fibers
+        mat_id = self.add_material(fiber)
         for vertices in patch_vertices:
             copied_fiber = copy.deepcopy(fiber)
             copied_fiber.vertices = vertices
             copied_fiber.tag = self.N_fiber
+            copied_fiber.mat_id = mat_id
             copied_fiber.find_geometric_properties()
             self.patch_fibers.append(copied_fiber)
             self.N_fiber += 1
@@ -160,6 +243,8 @@ class Section:
             rotate      rotates the section by an angle counter clockwise (in degrees)
                             OPTIONAL: default = 0 degrees
         """
+        time_start = time.perf_counter()
+        
         # find centroid using first moment of area equation
         sumA=sum([a.area for a in self.patch_fibers])
         xA=sum([a.area*a.centroid[0] for a in self.patch_fibers])
@@ -197,9 +282,224 @@ class Section:
             f.update_location(self.centroid, self.ymax)
         for f in self.node_fibers:
             f.update_location(self.centroid, self.ymax)
+        
+        # collect fiber data into arrays for vectorized analysis
+        self.build_fiber_arrays()
+        self.mesh_time = time.perf_counter() - time_start
+    
+    
+    def build_fiber_arrays(self):
+        """
+        Collect fiber geometry and materials into numpy arrays. Called at the end of mesh().
+        Fiber index i refers to patch_fibers[i], followed by node_fibers.
+        """
+        fibers = self.patch_fibers + self.node_fibers
+        self.N_patch = len(self.patch_fibers)
+        self.fiber_area = np.array([f.area for f in fibers], dtype=float)
+        self.fiber_ecc = np.array([f.ecc for f in fibers], dtype=float).reshape(-1,2)
+        self.fiber_depth = np.array([f.depth for f in fibers], dtype=float)
+        
+        # vertices of patch fibers with respect to section centroid
+        vertices = np.array([v for f in self.patch_fibers for v in f.vertices], dtype=float).reshape(-1,2)
+        self.vertex_ecc = np.column_stack([vertices[:,0] - self.centroid[0], self.centroid[1] - vertices[:,1]])
+        
+        # group fibers by material
+        mat_ids = np.array([f.mat_id for f in fibers], dtype=int)
+        self.material_groups = []
+        self.kernel_data = None
+        for i, material in enumerate(self.materials):
+            indices = np.flatnonzero(mat_ids == i)
+            if len(indices) > 0:
+                self.material_groups.append([material, indices])
+        self.build_stress_block_index()
+    
+    
+    def build_stress_block_index(self):
+        """
+        Sort patch fibers by depth and accumulate their area and first moments of area. The resultant of a
+        uniform stress block of any depth is then a binary search into these sums (see get_stress_block())
+        """
+        depth = self.fiber_depth[:self.N_patch]
+        order = np.argsort(depth, kind="stable")
+        area = self.fiber_area[:self.N_patch]
+        ecc = self.fiber_ecc[:self.N_patch]
+        weights = np.column_stack([area, area*ecc[:,1], area*ecc[:,0]])[order]
+        self.block_depth = depth[order]
+        self.block_sums = np.vstack([np.zeros((1,3)), np.cumsum(weights, axis=0)])
+    
+    
+    def get_stress_block(self, block_depth, flip=False):
+        """
+        Area and first moments of area of all patch fibers within a block depth of the extreme compression fiber
+        (fiber depth <= block_depth). Independent of material, so one index serves any concrete strength
+            block_depth     array of stress block depths
+            flip            measure block depth from the bottom of the section (section rotated by 180 degrees)
+                                OPTIONAL: default = False
+        Returns:
+            sums            array of [area, sum(area*dy), sum(area*dx)]. Shape = (N_depth, 3)
+        """
+        block_depth = np.asarray(block_depth, dtype=float)
+        if not flip:
+            return self.block_sums[np.searchsorted(self.block_depth, block_depth, side="right")]
+        
+        # fibers with depth >= section depth - block depth. Eccentricities change sign when rotated
+        sums = self.block_sums[-1] - self.block_sums[np.searchsorted(self.block_depth, self.depth - block_depth, side="left")]
+        return sums * np.array([1, -1, -1])
+    
+    
+    def get_fiber_stress(self, strain):
+        """
+        Vectorized stress evaluation. strain is an array of fiber strains (last axis = fibers)
+        During cyclic analysis (material_state is not None), hysteretic materials are evaluated from the 
+        committed state and their trial state is stored in trial_state until commit_state() is called
+        """
+        stress = np.empty(np.shape(strain))
+        if self.material_state is None:
+            for material, indices in self.material_groups:
+                curve = self.material_tables.get(material, material)
+                stress[..., indices] = curve.stress_strain_array(strain[..., indices])
+            return stress
+        
+        self.trial_state = []
+        for (material, indices), state in zip(self.material_groups, self.material_state):
+            if state is None:
+                curve = self.material_tables.get(material, material)
+                stress[indices] = curve.stress_strain_array(strain[indices])
+                self.trial_state.append(None)
+            else:
+                stress[indices], trial = material.stress_strain_cyclic(strain[indices], state)
+                self.trial_state.append(trial)
+        return stress
+    
+    
+    def get_fiber_tangent(self, strain):
+        """
+        Vectorized tangent modulus (dstress/dstrain) of each fiber. During cyclic analysis, hysteretic materials
+        are differentiated numerically about the committed state
+        """
+        h = 1e-7
+        tangent = np.empty(np.shape(strain))
+        states = self.material_state if self.material_state is not None else [None]*len(self.material_groups)
+        for (material, indices), state in zip(self.material_groups, states):
+            if state is None:
+                curve = self.material_tables.get(material, material)
+                tangent[..., indices] = curve.tangent_array(strain[..., indices])
+            else:
+                stress_plus, _ = material.stress_strain_cyclic(strain[indices] + h, state)
+                stress_minus, _ = material.stress_strain_cyclic(strain[indices] - h, state)
+                tangent[indices] = (stress_plus - stress_minus) / (2*h)
+        return tangent
+    
+    
+    def get_section_tangent(self, strain):
+        """
+        Section tangent stiffness from fiber tangent moduli at a plane of strain. Relates increments of
+        axial force and moments to increments of centroidal strain and curvatures:
+            [dP ]   [EA   ESx   ESy ] [deps0]
+            [dMx] = [ESx  EIx   EIxy] [dkx  ]
+            [dMy]   [ESy  EIxy  EIy ] [dky  ]
+        where strain = eps0 + kx*dy + ky*dx (see evaluate_strain_plane())
+        Returns:
+            K               3x3 numpy array
+        """
+        EtA = self.get_fiber_tangent(strain) * self.fiber_area
+        B = np.column_stack([np.ones(len(EtA)), self.fiber_ecc[:,1], self.fiber_ecc[:,0]])
+        return B.T @ (EtA[:,None] * B)
+    
+    
+    def compile(self, chunk_size=2_000_000):
+        """
+        Return a CompiledSection for batch evaluation of strain planes, e.g. as the constitutive law of
+        an external frame element (see fkit.compiled)
+            chunk_size      maximum number of fiber strains (planes x fibers) evaluated at once
+                                OPTIONAL: default = 2,000,000
+        """
+        return fkit.compiled.CompiledSection(self, chunk_size=chunk_size)
+    
+    
+    def tabulate_materials(self, tol=1e-3, strain_limit=0.5, materials=None):
+        """
+        Sample the monotonic stress-strain curve of each material onto an adaptive strain grid. All monotonic
+        analyses then evaluate these materials by linear interpolation (see fkit.tabulation). Once any material
+        is tabulated, run_moment_curvature() evaluates all fibers at once instead of fiber by fiber
+            tol             interpolation tolerance relative to the largest stress of each material
+                                OPTIONAL: default = 1e-3
+            strain_limit    tables cover strains from -strain_limit to +strain_limit. Stress is constant beyond
+                                OPTIONAL: default = 0.5
+            materials       list of materials (from section.materials) to tabulate
+                                OPTIONAL: default = None (all materials)
+        Returns:
+            material_tables
+        """
+        materials = self.materials if materials is None else materials
+        for material in materials:
+            table = fkit.tabulation.tabulate(material, tol=tol, strain_limit=strain_limit)
+            self.material_tables[material] = table
+            logger.info("\t%s tabulated with %d points (max error = %.2e)", material.name, len(table), table.max_error)
+        self.kernel_data = None
+        return self.material_tables
+    
+    
+    def init_state(self):
+        """
+        Initialize hysteretic state of all material groups. Materials without a hysteretic rule
+        (no stress_strain_cyclic method) are evaluated with their monotonic stress-strain relationship
+        """
+        self.material_state = []
+        for material, indices in self.material_groups:
+            if hasattr(material, "stress_strain_cyclic"):
+                self.material_state.append(material.init_state(len(indices)))
+            else:
+                logger.warning("\tWarning: %s has no hysteretic rule. Monotonic stress-strain relationship is used", material.name)
+                self.material_state.append(None)
+        self.trial_state = None
+    
+    
+    def commit_state(self, eps0, curvaturex, curvaturey=0):
+        """
+        Evaluate the converged plane of strain and commit the resulting trial state
+        Returns:
+            sumF, sumMx, sumMy, strain, stress
+        """
+        result = self.evaluate_strain_plane(eps0, curvaturex, curvaturey)
+        self.material_state = self.trial_state
+        self.trial_state = None
+        return result
+    
+    
+    def evaluate_strain_plane(self, eps0, curvaturex, curvaturey=0):
+        """
+        Vectorized section response for an arbitrary plane of strain:
+            strain = eps0 + curvaturex * dy + curvaturey * dx
+        where [dx,dy] is the fiber eccentricity (see fiber.ecc) and eps0 is the strain at section centroid.
+        
+        Returns:
+            sumF, sumMx, sumMy, strain, stress
+        """
+        stats = self.stats or NULL_STATS
+        stats.count_residual()
+        if self.material_state is None and fkit.kernels.get_backend() == "numba":
+            with stats.timer("stress"):
+                return fkit.kernels.evaluate_strain_plane(self, eps0, curvaturex, curvaturey)
+        with stats.timer("stress"):
+            strain = eps0 + curvaturex * self.fiber_ecc[:,1] + curvaturey * self.fiber_ecc[:,0]
+            stress = self.get_fiber_stress(strain)
+        with stats.timer("summation"):
+            force = stress * self.fiber_area
+            sumF, sumMx, sumMy = force.sum(), force @ self.fiber_ecc[:,1], force @ self.fiber_ecc[:,0]
+        return sumF, sumMx, sumMy, strain, stress
     
     
-    def run_moment_curvature(self, phi_target, P=0, N_step=100, show_progress=False):
+    def record_fiber_state(self, strain, stress):
+        """append converged fiber strain and color to each fiber's history"""
+        with (self.stats or NULL_STATS).timer("bookkeeping"):
+            fibers = self.patch_fibers + self.node_fibers
+            for f, e, s in zip(fibers, strain.tolist(), stress.tolist()):
+                f.strain.append(e)
+                f.color_list.append(f.color_map(e, s))
+    
+    
+    def run_moment_curvature(self, phi_target, P=0, N_step=100, show_progress=False, callback=None, profile=False):
         """
         Start moment curvature analysis
         Arguments:
@@ -214,7 +514,13 @@ class Section:
                                 OPTIONAL: default = 0
             N_step          number of data points to reach phi_target. Size of curvature increment.
                                 OPTIONAL: default = 100
-            show_progress   flag to print out moment curvature run status
+            show_progress   flag to print moment curvature run status of every step (see fkit.progress.progress_output())
+                                OPTIONAL: default = False
+            callback        function called with each converged step (see iter_moment_curvature()).
+                                Analysis stops early if the callback returns False. See fkit.progress.throttle()
+                                OPTIONAL: default = None
+            profile         flag to collect solver and timing statistics in section.stats (see fkit.profiler)
+                                Use "memory" to also trace peak memory
                                 OPTIONAL: default = False
         Returns:
             df_results      a dataframe containing all MK analysis results
@@ -241,68 +547,114 @@ class Section:
             As curvature increases, some minor-axis moment must develop to maintain equilibrium and to keep the 
             neutral-axis in the same user-specified orientation.
         """
+        self.stats = create_stats(profile, "run_moment_curvature", self)
+        stats = self.stats or NULL_STATS
+        stats.start()
+        with fkit.progress.progress_output(show_progress):
+            time_start = time.time()
+            for result in self.iter_moment_curvature(phi_target, P=P, N_step=N_step):
+                if show_progress:
+                    logger.info("\tstep %d: N.A found at %.1f. curvature = %.1e, M = %.1f", result["Step"],result["NeutralAxis"],result["Curvature"],result["Moment"])
+                
+                self.curvature.append(result["Curvature"])
+                self.neutral_axis.append(result["NeutralAxis"])
+                self.momentx.append(result["Moment"])
+                self.momenty.append(result["MinorAxisMoment"])
+                self.K_section.append(result["SectionTangent"])
+                if len(self.curvature) == 1:
+                    self.K_tangent.append(0)
+                else:
+                    slope = (self.momentx[-1] - self.momentx[-2])/(self.curvature[-1] - self.curvature[-2])
+                    self.K_tangent.append(slope)
+                
+                if callback is not None and callback(result) is False:
+                    break
+                
+            time_end = time.time()
+            stats.stop()
+            self.MK_solved = True
+            logger.info("Moment-curvature analysis completed. Elapsed time: %.2f seconds", time_end - time_start)
+        
+        # compile result dictionary for return
+        result_dict = dict()
+        result_dict["Curvature"] = self.curvature
+        result_dict["Moment"] = self.momentx
+        result_dict["NeutralAxis"] = self.neutral_axis
+        result_dict["MinorAxisMoment"] = self.momenty
+        result_dict["Axial"] = self.axial
+        result_dict["Slope"] = self.K_tangent
+        result_dict.update(get_tangent_columns(self.K_section))
+        self.table_MK = create_table(result_dict)
+        if profile:
+            self.table_MK.attrs["stats"] = self.stats.summary()
+        return self.table_MK
+    
+    
+    def iter_moment_curvature(self, phi_target, P=0, N_step=100):
+        """
+        Generator version of run_moment_curvature(). Yields each converged step as soon as it is solved
+        so that results can be rendered progressively, fed to a queue, or the analysis stopped early
+        by breaking out of the loop. Results are not stored on the section object (fiber strain and
+        stress history is still recorded).
+        Arguments:
+            see run_moment_curvature()
+        Yields:
+            result          a dictionary with keys "Step", "Curvature", "Moment", "NeutralAxis", "MinorAxisMoment",
+                            "SectionTangent" (see get_section_tangent())
+        
+        Example:
+            for result in section.iter_moment_curvature(phi_target=0.0005):
+                print(result["Curvature"], result["Moment"])
+        """
+        import scipy.optimize as sp
+        
         # use root finding algorithm to find neutral axis depth
+        stats = self.stats or NULL_STATS
         self.axial = P
         phi_list = np.linspace(phi_target/10000, phi_target, num=N_step)
         step=0
         x0=self.depth/2
         
-        time_start = time.time()
         for curvature in phi_list:
             step +=1
             
-            root = sp.root_scalar(self.verify_equilibrium, args=curvature, method="secant", x0=0, x1=x0+0.1)
+            # fiber-by-fiber evaluation: stress and summation are timed together
+            stats.new_step()
+            with stats.timer("stress"):
+                root = sp.root_scalar(self.verify_equilibrium, args=curvature, method="secant", x0=0, x1=x0+0.1)
             correct_NA = root.root
-            # root = secant_method(self.verify_equilibrium, args=curvature, x0=x0, x1=x0+0.1)
-            # correct_NA = root
-            # if not root.converged:
-            #     print("\tstep {}: Could not converge...Ending moment curvature analysis at phi = {}".format(step,curvature))
-            #     print(root.flag)
-            #     self.curvature.append(curvature)
-            #     self.neutral_axis.append(0)
-            #     self.momentx.append(0)
-            #     self.momenty.append(0)
-            #     break
-            
-            sumMx = 0
-            sumMy = 0
-            for f in self.patch_fibers:
-                F,Mx,My = f.update(curvature,correct_NA,solution_found=True)
-                sumMx += Mx
-                sumMy += My
-            for f in self.node_fibers:
-                F,Mx,My = f.update(curvature,correct_NA,solution_found=True) 
-                sumMx += Mx
-                sumMy += My
+            stats.count_residual(root.function_calls)
+            stats.count_iteration(root.iterations)
             
-            x0 = correct_NA
-            if show_progress:
-                print("\tstep {}: N.A found at {:.1f}. curvature = {:.1e}, M = {:.1f}".format(step,correct_NA,curvature,sumMx))
-            
-            self.curvature.append(curvature)
-            self.neutral_axis.append(correct_NA)
-            self.momentx.append(sumMx)
-            self.momenty.append(sumMy)
-            if step == 1:
-                self.K_tangent.append(0)
+            if self.material_tables:
+                strain = curvature * (self.fiber_depth - correct_NA)
+                stress = self.get_fiber_stress(strain)
+                force = stress * self.fiber_area
+                sumMx, sumMy = force @ self.fiber_ecc[:,1], force @ self.fiber_ecc[:,0]
+                self.record_fiber_state(strain, stress)
             else:
-                slope = (self.momentx[-1] - self.momentx[-2])/(self.curvature[-1] - self.curvature[-2])
-                self.K_tangent.append(slope)
+                with stats.timer("bookkeeping"):
+                    sumMx = 0
+                    sumMy = 0
+                    for f in self.patch_fibers:
+                        F,Mx,My = f.update(curvature,correct_NA,solution_found=True)
+                        sumMx += Mx
+                        sumMy += My
+                    for f in self.node_fibers:
+                        F,Mx,My = f.update(curvature,correct_NA,solution_found=True) 
+                        sumMx += Mx
+                        sumMy += My
             
-        time_end = time.time()
-        self.MK_solved = True
-        print("Moment-curvature analysis completed. Elapsed time: {:.2f} seconds\n".format(time_end - time_start))
-        
-        # compile result dictionary for return
-        result_dict = dict()
-        result_dict["Curvature"] = self.curvature
-        result_dict["Moment"] = self.momentx
-        result_dict["NeutralAxis"] = self.neutral_axis
-        result_dict["MinorAxisMoment"] = self.momenty
-        result_dict["Axial"] = self.axial
-        result_dict["Slope"] = self.K_tangent
-        self.table_MK = pd.DataFrame.from_dict(result_dict)
-        return self.table_MK
+            with stats.timer("bookkeeping"):
+                K_section = self.get_section_tangent(curvature * (self.fiber_depth - correct_NA))
+            
+            x0 = correct_NA
+            yield {"Step": step,
+                   "Curvature": curvature,
+                   "Moment": sumMx,
+                   "NeutralAxis": correct_NA,
+                   "MinorAxisMoment": sumMy,
+                   "SectionTangent": K_section}
         
     
     def verify_equilibrium(self, NA, args):
@@ -312,6 +664,10 @@ class Section:
         """
         curvature = args
         P = self.axial
+        if self.material_tables:
+            # evaluate all fibers at once so that tabulated materials are interpolated (see tabulate_materials())
+            stress = self.get_fiber_stress(curvature * (self.fiber_depth - NA))
+            return np.sum(stress * self.fiber_area) - P
         sumF=0
         for f in self.patch_fibers:
             F,_,_ = f.update(curvature, NA, solution_found=False)
@@ -322,6 +678,476 @@ class Section:
         return sumF - P
     
     
+    def solve_strain_plane(self, curvature, P, x0, angle=None, moment_ratio=0, tol=1e-6, max_iteration=50):
+        """
+        Vectorized Newton-Raphson solver for the plane of strain at a given curvature:
+            strain = eps0 + curvature * (dy*cos(theta) + dx*sin(theta))
+        Arguments:
+            curvature       curvature magnitude
+            P               applied axial load (-ve is compression)
+            x0              initial guess [eps0, theta]
+            angle           neutral axis angle theta in radians (counter-clockwise, 0 = compression on top)
+                                OPTIONAL: default = None. If None, theta is solved such that My = moment_ratio * Mx
+            moment_ratio    target ratio of minor-axis to major-axis moment (My/Mx)
+                                OPTIONAL: default = 0
+        Returns:
+            x, converged, sumF, sumMx, sumMy, strain, stress
+        """
+        n_unknown = 2 if angle is None else 1
+        x = np.array([x0[0], x0[1] if angle is None else angle], dtype=float)
+        h = np.array([1e-9, 1e-7])
+        xtol = np.array([1e-12, 1e-10])
+        
+        def residual(x):
+            eps0, theta = x
+            sumF, sumMx, sumMy, strain, stress = self.evaluate_strain_plane(eps0, curvature*math.cos(theta), curvature*math.sin(theta))
+            R = np.array([sumF - P, sumMy - moment_ratio*sumMx])[:n_unknown]
+            return R, sumF, sumMx, sumMy, strain, stress
+        
+        state = residual(x)
+        converged = False
+        stats = self.stats or NULL_STATS
+        for i in range(max_iteration):
+            # normalize residuals by the magnitude of fiber forces
+            R, stress = state[0], state[5]
+            scale = np.sum(np.abs(stress * self.fiber_area)) + abs(P) + 1e-12
+            norm = np.array([1/scale, 1/(scale*self.depth)])[:n_unknown]
+            if np.all(np.abs(R*norm) < tol):
+                converged = True
+                break
+            
+            # jacobian with forward finite difference
+            stats.count_iteration()
+            J = np.zeros((n_unknown, n_unknown))
+            for j in range(n_unknown):
+                x_perturbed = x.copy()
+                x_perturbed[j] += h[j]
+                J[:,j] = (residual(x_perturbed)[0] - R) / h[j]
+            dx = np.zeros(2)
+            dx[:n_unknown] = np.linalg.lstsq(J*norm[:,None], -R*norm, rcond=None)[0]
+            
+            # a fiber dropping out (e.g. concrete beyond emax) makes the residual discontinuous. 
+            # Consider the solution converged once the correction becomes negligible
+            if abs(dx[0]) < xtol[0] and abs(dx[1]) < xtol[1]:
+                converged = True
+                break
+            
+            # limit rotation of neutral axis per iteration
+            if abs(dx[1]) > 0.1:
+                dx = dx * 0.1 / abs(dx[1])
+            
+            # backtrack until step reduces residual
+            alpha = 1.0
+            trial = None
+            while alpha > 1e-3:
+                candidate = residual(x + alpha*dx)
+                if np.linalg.norm(candidate[0]*norm) < np.linalg.norm(R*norm):
+                    trial = candidate
+                    break
+                alpha = alpha/2
+            if trial is None:
+                break
+            x = x + alpha*dx
+            x[1] = math.remainder(x[1], 2*math.pi)
+            state = trial
+        
+        R, sumF, sumMx, sumMy, strain, stress = state
+        return x, converged, sumF, sumMx, sumMy, strain, stress
+
+
+    def solve_strain_limit(self, strain_limit, P=0, fiber="compression", angle=0, tol=1e-6, max_iteration=50):
+        """
+        Solve the section capacity when a governing fiber reaches a target strain, e.g. extreme concrete
+        fiber at -0.003 or extreme tension bar at 0.05. Faster than interpolating a moment curvature run as
+        only one plane of strain is solved
+        Arguments:
+            strain_limit    target strain of the governing fiber (-ve is compression)
+            P               applied axial load (-ve is compression)
+                                OPTIONAL: default = 0
+            fiber           governing fiber. "compression" = extreme compression vertex of patch fibers,
+                            "tension" = extreme tension node fiber, or an integer index into the fiber arrays
+                            (patch fibers first, node fibers start at N_patch)
+                                OPTIONAL: default = "compression"
+            angle           neutral axis angle in degrees (counter-clockwise, 0 = compression on top)
+                                OPTIONAL: default = 0
+            tol             equilibrium tolerance relative to the magnitude of fiber forces
+                                OPTIONAL: default = 1e-6
+            max_iteration   maximum number of Newton iterations
+                                OPTIONAL: default = 50
+        Returns:
+            result          a dictionary with keys "Curvature", "Moment", "NeutralAxis", "MinorAxisMoment",
+                            "Axial", "Strain", "Converged", "Iterations", "SectionTangent"
+
+        Algorithm:
+            0.) the plane of strain at a fixed neutral axis angle theta has two unknowns (eps0, curvature):
+                    strain = eps0 + curvature * r      r = dy*cos(theta) + dx*sin(theta)
+            1.) the strain condition at the governing fiber (r = rg) eliminates eps0:
+                    eps0 = strain_limit - curvature * rg
+            2.) solve axial equilibrium sum(fiber_force) = P for curvature with Newton-Raphson. Derivative is
+                taken from the section tangent stiffness (see get_section_tangent()). Steps that leave a known
+                sign change bracket or exceed the curvature cap are replaced with bisection
+        """
+        if self.fiber_area is None:
+            raise RuntimeError("Section has not been meshed. Please call section.mesh() first")
+        theta = math.radians(angle)
+        direction = np.array([math.cos(theta), math.sin(theta)])
+        fiber_r = self.fiber_ecc[:,1]*direction[0] + self.fiber_ecc[:,0]*direction[1]
+        vertex_r = self.vertex_ecc[:,1]*direction[0] + self.vertex_ecc[:,0]*direction[1]
+        if fiber == "compression":
+            rg = vertex_r.min()
+        elif fiber == "tension":
+            if self.N_patch == len(fiber_r):
+                raise ValueError("Section has no node fibers. Please specify the governing fiber index")
+            rg = fiber_r[self.N_patch:].max()
+        elif isinstance(fiber, (int, np.integer)):
+            rg = fiber_r[fiber]
+        else:
+            raise ValueError("fiber can be compression, tension, or a fiber index")
+
+        def residual(curvature):
+            eps0 = strain_limit - curvature*rg
+            sumF, sumMx, sumMy, strain, stress = self.evaluate_strain_plane(eps0, curvature*direction[0], curvature*direction[1])
+            return sumF - P, sumF, sumMx, sumMy, strain, stress
+
+        # initial guess: neutral axis at section centroid. Curvature is capped at a strain difference of 1.0 across the section
+        stats = self.stats or NULL_STATS
+        curvature = abs(strain_limit) / max(abs(rg), 0.5*self.depth)
+        state = residual(curvature)
+        lower, upper = 0.0, np.inf
+        curvature_max = 1 / (vertex_r.max() - vertex_r.min())
+        converged = False
+        for i in range(max_iteration):
+            R, stress = state[0], state[5]
+            scale = np.sum(np.abs(stress * self.fiber_area)) + abs(P) + 1e-12
+            if abs(R) < tol*scale:
+                converged = True
+                break
+
+            # fibers on the far side of the governing fiber stretch as curvature increases. Axial force
+            # increases with curvature if the governing fiber is on the compression side of the centroid
+            if (R < 0) == (rg < 0):
+                lower = curvature
+            else:
+                upper = curvature
+            if upper - lower < 1e-12*curvature:
+                converged = True
+                break
+
+            stats.count_iteration()
+            K = self.get_section_tangent(state[4])
+            dR = K[0] @ np.array([-rg, direction[0], direction[1]])
+            candidate = curvature - R/dR if dR != 0 else np.nan
+            if not lower < candidate < min(upper, curvature_max*(1 + 1e-12)):
+                if upper == np.inf and lower >= curvature_max:
+                    break
+                candidate = 0.5*(lower + upper) if upper < np.inf else min(2*lower, curvature_max)
+            curvature = candidate
+            state = residual(curvature)
+
+        if not converged:
+            logger.warning("\tWarning: strain limit %.4f could not be reached at P = %.1f", strain_limit, P)
+
+        R, sumF, sumMx, sumMy, strain, stress = state
+        eps0 = strain_limit - curvature*rg
+        return {"Curvature": curvature,
+                "Moment": sumMx,
+                "NeutralAxis": -eps0/curvature - vertex_r.min(),
+                "MinorAxisMoment": sumMy,
+                "Axial": sumF,
+                "Strain": strain_limit,
+                "Converged": converged,
+                "Iterations": i,
+                "SectionTangent": self.get_section_tangent(strain)}
+
+
+    def run_biaxial_moment_curvature(self, phi_target, P=0, N_step=100, moment_ratio=0, show_progress=False, callback=None, profile=False):
+        """
+        Start biaxial moment curvature analysis. Unlike run_moment_curvature(), the neutral axis is 
+        free to rotate. Neutral axis depth and angle are solved simultaneously such that:
+            sum(fiber_force) + P = 0
+            My = moment_ratio * Mx
+        
+        Arguments:
+            phi_target      analysis will attempt to reach this target curvature (see run_moment_curvature)
+            P               applied axial load (-ve is compression)
+                                OPTIONAL: default = 0
+            N_step          number of data points to reach phi_target. Size of curvature increment.
+                                OPTIONAL: default = 100
+            moment_ratio    target ratio of minor-axis to major-axis moment (My/Mx)
+                                OPTIONAL: default = 0 (no minor-axis moment)
+            show_progress   flag to print moment curvature run status of every step (see fkit.progress.progress_output())
+                                OPTIONAL: default = False
+            callback        function called with each converged step (a dictionary with keys "Step", "Curvature", 
+                                "Moment", "NeutralAxis", "NeutralAxisAngle", "MinorAxisMoment"). 
+                                Analysis stops early if the callback returns False. See fkit.progress.throttle()
+                                OPTIONAL: default = None
+            profile         flag to collect solver and timing statistics in section.stats (see fkit.profiler)
+                                Use "memory" to also trace peak memory
+                                OPTIONAL: default = False
+        Returns:
+            df_results      a dataframe containing all MK analysis results
+            
+        Algorithm:
+            0.) slowly increment curvature from 0 to an user-specified limit
+            1.) the plane of strain at any curvature is defined by two unknowns:
+                    eps0 = strain at section centroid
+                    theta = counter-clockwise rotation of neutral axis (0 = parallel to x-axis, compression on top)
+                    strain = eps0 + curvature * (dy*cos(theta) + dx*sin(theta))
+            2.) solve both unknowns with Newton-Raphson (see solve_strain_plane). All fibers are evaluated at once 
+                using the fiber arrays. Jacobian is estimated with forward finite difference. Previous step is used 
+                as initial guess
+            3.) neutral axis depth is measured from the extreme compression fiber perpendicular to the neutral axis
+        """
+        self.axial = P
+        phi_list = np.linspace(phi_target/10000, phi_target, num=N_step)
+        
+        # initial guess (zero strain at centroid, no rotation)
+        x = np.array([0.0, 0.0])
+        step = 0
+        
+        self.stats = create_stats(profile, "run_biaxial_moment_curvature", self)
+        stats = self.stats or NULL_STATS
+        stats.start()
+        with fkit.progress.progress_output(show_progress):
+            time_start = time.time()
+            for curvature in phi_list:
+                step += 1
+                stats.new_step()
+                
+                x_previous = x
+                x, converged, sumF, sumMx, sumMy, strain, stress = self.solve_strain_plane(curvature, P, x, moment_ratio=moment_ratio)
+                if not converged:
+                    # My = moment_ratio * Mx may not be attainable (e.g. asymmetric section at very small curvature)
+                    # keep neutral axis angle from previous step and satisfy axial equilibrium only
+                    x, converged, sumF, sumMx, sumMy, strain, stress = self.solve_strain_plane(curvature, P, x_previous, angle=x_previous[1])
+                    logger.warning("\tWarning: step %d: could not converge. My = %.2f, Mx = %.2f", step, sumMy, sumMx)
+                
+                # neutral axis depth measured from extreme compression fiber
+                eps0, theta = x
+                vertex_depth = self.vertex_ecc[:,1]*math.cos(theta) + self.vertex_ecc[:,0]*math.sin(theta)
+                correct_NA = -eps0/curvature - vertex_depth.min()
+                self.record_fiber_state(strain, stress)
+                self.K_section.append(self.get_section_tangent(strain))
+                
+                if show_progress:
+                    logger.info("\tstep %d: N.A found at %.1f (%.1f deg). curvature = %.1e, M = %.1f", step,correct_NA,math.degrees(theta),curvature,sumMx)
+                
+                self.curvature.append(curvature)
+                self.neutral_axis.append(correct_NA)
+                self.neutral_axis_angle.append(math.degrees(theta))
+                self.momentx.append(sumMx)
+                self.momenty.append(sumMy)
+                if step == 1:
+                    self.K_tangent.append(0)
+                else:
+                    slope = (self.momentx[-1] - self.momentx[-2])/(self.curvature[-1] - self.curvature[-2])
+                    self.K_tangent.append(slope)
+                
+                if callback is not None:
+                    result = {"Step": step,
+                              "Curvature": curvature,
+                              "Moment": sumMx,
+                              "NeutralAxis": correct_NA,
+                              "NeutralAxisAngle": math.degrees(theta),
+                              "MinorAxisMoment": sumMy}
+                    if callback(result) is False:
+                        break
+            
+            time_end = time.time()
+            stats.stop()
+            self.MK_solved = True
+            logger.info("Biaxial moment-curvature analysis completed. Elapsed time: %.2f seconds", time_end - time_start)
+        
+        # compile result dictionary for return
+        result_dict = dict()
+        result_dict["Curvature"] = self.curvature
+        result_dict["Moment"] = self.momentx
+        result_dict["NeutralAxis"] = self.neutral_axis
+        result_dict["NeutralAxisAngle"] = self.neutral_axis_angle
+        result_dict["MinorAxisMoment"] = self.momenty
+        result_dict["Axial"] = self.axial
+        result_dict["Slope"] = self.K_tangent
+        result_dict.update(get_tangent_columns(self.K_section))
+        self.table_MK = create_table(result_dict)
+        if profile:
+            self.table_MK.attrs["stats"] = self.stats.summary()
+        return self.table_MK
+    
+    
+    def run_cyclic_moment_curvature(self, protocol, P=0, d_curvature=None, show_progress=False, callback=None, profile=False):
+        """
+        Start cyclic moment curvature analysis. Curvature follows a user-specified protocol and fibers 
+        with hysteretic materials (e.g. nodefiber.MenegottoPintoHysteretic, patchfiber.ManderHysteretic) 
+        unload and reload along their hysteretic rules. Other materials follow their monotonic 
+        stress-strain relationship.
+        
+        Arguments:
+            protocol        list of target curvatures visited in order, starting from zero curvature
+                                example: [2e-4, -2e-4, 4e-4, -4e-4, 0] = two cycles of increasing amplitude
+            P               applied axial load (-ve is compression)
+                                OPTIONAL: default = 0
+            d_curvature     maximum curvature increment between analysis steps. Each segment of the protocol is
+                                divided into equal increments no larger than d_curvature
+                                OPTIONAL: default = max(abs(protocol)) / 50
+            show_progress   flag to print moment curvature run status of every step (see fkit.progress.progress_output())
+                                OPTIONAL: default = False
+            callback        function called with each converged step (a dictionary with keys "Step", "Curvature", 
+                                "Moment", "NeutralAxis", "MinorAxisMoment"). 
+                                Analysis stops early if the callback returns False. See fkit.progress.throttle()
+                                OPTIONAL: default = None
+            profile         flag to collect solver and timing statistics in section.stats (see fkit.profiler)
+                                Use "memory" to also trace peak memory
+                                OPTIONAL: default = False
+        Returns:
+            df_results      a dataframe containing all MK analysis results
+            
+        Algorithm:
+            0.) hysteretic state of every fiber (reversal points, maximum strains, etc.) is stored in arrays 
+                per material group (see fkit.hysteresis)
+            1.) at each curvature, solve strain at section centroid such that sum(fiber_force) + P = 0 
+                (neutral axis parallel to x-axis) with the vectorized Newton-Raphson solver. Every trial strain
+                is evaluated from the state committed at the previous step
+            2.) once converged, the trial state of the converged strain is committed
+            3.) neutral axis depth is measured from the top of the section. It is undefined at zero curvature
+        """
+        self.axial = P
+        curvature_history = get_curvature_history(protocol, d_curvature)
+        
+        self.stats = create_stats(profile, "run_cyclic_moment_curvature", self)
+        stats = self.stats or NULL_STATS
+        stats.start()
+        with fkit.progress.progress_output(show_progress):
+            time_start = time.time()
+            self.init_state()
+            x = np.array([0.0, 0.0])
+            step = 0
+            try:
+                for curvature in curvature_history:
+                    step += 1
+                    stats.new_step()
+                    
+                    x, converged, sumF, sumMx, sumMy, strain, stress = self.solve_strain_plane(curvature, P, x, angle=0)
+                    if not converged:
+                        logger.warning("\tWarning: step %d: could not converge. sumF - P = %.2e", step, sumF - P)
+                    self.K_section.append(self.get_section_tangent(strain))
+                    sumF, sumMx, sumMy, strain, stress = self.commit_state(x[0], curvature)
+                    
+                    # neutral axis depth measured from top of section
+                    correct_NA = -x[0]/curvature - self.vertex_ecc[:,1].min() if curvature != 0 else math.nan
+                    self.record_fiber_state(strain, stress)
+                    
+                    if show_progress:
+                        logger.info("\tstep %d: N.A found at %.1f. curvature = %.1e, M = %.1f", step,correct_NA,curvature,sumMx)
+                    
+                    self.curvature.append(curvature)
+                    self.neutral_axis.append(correct_NA)
+                    self.momentx.append(sumMx)
+                    self.momenty.append(sumMy)
+                    if step == 1:
+                        self.K_tangent.append(0)
+                    else:
+                        slope = (self.momentx[-1] - self.momentx[-2])/(self.curvature[-1] - self.curvature[-2])
+                        self.K_tangent.append(slope)
+                    
+                    if callback is not None:
+                        result = {"Step": step,
+                                  "Curvature": curvature,
+                                  "Moment": sumMx,
+                                  "NeutralAxis": correct_NA,
+                                  "MinorAxisMoment": sumMy}
+                        if callback(result) is False:
+                            break
+            finally:
+                # later analyses are monotonic
+                self.material_state = None
+                self.trial_state = None
+            
+            time_end = time.time()
+            stats.stop()
+            self.MK_solved = True
+            logger.info("Cyclic moment-curvature analysis completed. Elapsed time: %.2f seconds", time_end - time_start)
+        
+        # compile result dictionary for return
+        result_dict = dict()
+        result_dict["Curvature"] = self.curvature
+        result_dict["Moment"] = self.momentx
+        result_dict["NeutralAxis"] = self.neutral_axis
+        result_dict["MinorAxisMoment"] = self.momenty
+        result_dict["Axial"] = self.axial
+        result_dict["Slope"] = self.K_tangent
+        result_dict.update(get_tangent_columns(self.K_section))
+        self.table_MK = create_table(result_dict)
+        if profile:
+            self.table_MK.attrs["stats"] = self.stats.summary()
+        return self.table_MK
+    
+    
+    def run_MK_surface(self, phi_target, P_list, N_step=100, n_workers=1):
+        """
+        Moment curvature analysis over a grid of axial loads. Equivalent to calling run_moment_curvature() 
+        for every P in P_list, but the neutral axis solution of neighbouring P levels is used as initial guess,
+        and the work can be split across multiple processes.
+        
+        Arguments:
+            phi_target      analysis will attempt to reach this target curvature (see run_moment_curvature)
+            P_list          list of applied axial loads (-ve is compression)
+            N_step          number of data points to reach phi_target. Size of curvature increment.
+                                OPTIONAL: default = 100
+            n_workers       number of worker processes. P_list is split into contiguous chunks, one per worker
+                                OPTIONAL: default = 1 (run in current process)
+                                Note: on Windows, scripts using n_workers > 1 need an if __name__ == "__main__" guard
+        Returns:
+            df_results      a dataframe containing all results (one row per P and curvature)
+            
+        Results are also stored in section.MK_surface as dense 2D arrays (N_P x N_step) and 
+        section.MK_interpolator which returns moment at any (P, curvature). Points that did not 
+        converge (e.g. P exceeds axial capacity) are reported as NaN.
+        """
+        P_list = np.unique(np.asarray(P_list, dtype=float))
+        phi_list = np.linspace(phi_target/10000, phi_target, num=N_step)
+        n_workers = max(1, min(n_workers, len(P_list)))
+        chunks = np.array_split(P_list, n_workers)
+        
+        time_start = time.time()
+        if n_workers == 1:
+            results = [solve_MK_chunk(self, P_list, phi_list)]
+        else:
+            # fiber objects are not needed by the vectorized solver. Send a lean copy to worker processes
+            lean_section = copy.copy(self)
+            lean_section.patch_fibers = []
+            lean_section.node_fibers = []
+            lean_section.material_sources = []
+            with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(solve_MK_chunk, [lean_section]*n_workers, chunks, [phi_list]*n_workers))
+        time_end = time.time()
+        
+        # assemble dense arrays
+        self.MK_surface = {"P": P_list, "Curvature": phi_list}
+        for key in ["Moment", "NeutralAxis", "MinorAxisMoment", "Converged"]:
+            self.MK_surface[key] = np.vstack([r[key] for r in results])
+        for key in ["Moment", "NeutralAxis", "MinorAxisMoment"]:
+            self.MK_surface[key][~self.MK_surface["Converged"]] = np.nan
+        N_failed = np.sum(~self.MK_surface["Converged"])
+        if N_failed > 0:
+            logger.warning("\tWarning: %d of %d points did not converge", N_failed, self.MK_surface["Converged"].size)
+        
+        # interpolator over (P, curvature)
+        if len(P_list) > 1:
+            self.MK_interpolator = SurfaceInterpolator(P_list, phi_list, self.MK_surface["Moment"])
+        self.MK_surface_solved = True
+        logger.info("Moment-curvature surface analysis completed. Elapsed time: %.2f seconds", time_end - time_start)
+        
+        # compile result dictionary for return
+        result_dict = dict()
+        result_dict["Axial"] = np.repeat(P_list, N_step)
+        result_dict["Curvature"] = np.tile(phi_list, len(P_list))
+        result_dict["Moment"] = self.MK_surface["Moment"].ravel()
+        result_dict["NeutralAxis"] = self.MK_surface["NeutralAxis"].ravel()
+        result_dict["MinorAxisMoment"] = self.MK_surface["MinorAxisMoment"].ravel()
+        self.table_MK_surface = create_table(result_dict)
+        return self.table_MK_surface
+    
+    
     def get_node_fiber_data(self, tag):
         """
         Get node fiber data from moment curvature anlysis
@@ -431,7 +1257,7 @@ class Section:
         return data_dict
     
 
-    def run_PM_interaction(self, fpc, fy, Es):
+    def run_PM_interaction(self, fpc, fy, Es, callback=None, profile=False):
         """
         Start PM interaction analysis per ACI-318. Solution is independent
         of user-specified fibers.
@@ -443,6 +1269,14 @@ class Section:
                             if fpc <= 15, assume unit is ksi and Ec = 57000 * sqrt(fpc*1000) / 1000 
             fy      rebar yield strength (ksi or MPa)
             Es      elastic modulus of rebar (ksi or MPa)
+            callback
+                    function called after each orientation is solved (a dictionary with keys "Rotation", "P", "Mx").
+                        Analysis stops early if the callback returns False, in which case PM_solved remains False
+                        and only the solved orientations are returned
+                        OPTIONAL: default = None
+            profile flag to collect timing statistics in section.stats (see fkit.profiler)
+                        Use "memory" to also trace peak memory
+                        OPTIONAL: default = False
             
         Returns:
             df_result   a dataframe containing MK analysis results
@@ -494,37 +1328,159 @@ class Section:
         # calculate rebar yield strain
         ey = fy / Es
         
+        # one step per orientation (searching for pure bending, 0 degree, 180 degree)
+        self.stats = create_stats(profile, "run_PM_interaction", self)
+        stats = self.stats or NULL_STATS
+        stats.start()
+        
         # generate a good distribution of neutral axis depths
+        stats.new_step()
         NA_depth = self.get_appropriate_NA(fy, fpc, Es, beta, alpha)
         
         # start PM interaction analysis        
         time_start = time.time()
-        self.PM_surface[0] = self.get_PM_data(NA_depth, fpc, fy, Es, ey, alpha, beta)
-        self.mesh(rotate=180)
-        self.PM_surface[180] = self.get_PM_data(NA_depth, fpc, fy, Es, ey, alpha, beta)
-        
-        # restore to original position
-        self.mesh(rotate=180) 
-        self.PM_solved = True
+        self.PM_solved = False
+        self.PM_surface = {}
+        for rotation in [0, 180]:
+            stats.new_step()
+            self.PM_surface[rotation] = self.get_PM_data(NA_depth, fpc, fy, Es, ey, alpha, beta, flip=rotation == 180)
+            if callback is not None:
+                result = {"Rotation": rotation,
+                          "P": self.PM_surface[rotation][0],
+                          "Mx": self.PM_surface[rotation][1]}
+                if callback(result) is False:
+                    break
+        else:
+            self.PM_solved = True
         time_end = time.time()
-        print("PM interaction analysis per ACI 318 completed. Elapsed time: {:.2f} seconds\n".format(time_end - time_start))
+        stats.stop()
+        logger.info("PM interaction analysis per ACI 318 completed. Elapsed time: %.2f seconds", time_end - time_start)
         
         # compile a result_dict to return
         result_dict = dict()
-        result_dict["Rotation"] = [0 for a in self.PM_surface[0][0]] + [180 for a in self.PM_surface[0][0]]
-        result_dict["P"] = self.PM_surface[0][0] + self.PM_surface[180][0]
-        result_dict["Mx"] = self.PM_surface[0][1] + self.PM_surface[180][1]
-        result_dict["My"] = self.PM_surface[0][3] + self.PM_surface[180][3]
-        result_dict["NeutralAxis"] = self.PM_surface[0][2] + self.PM_surface[180][2]
-        result_dict["ResistanceFactor"] = self.PM_surface[0][4] + self.PM_surface[180][4]
-        result_dict["P_factored"] = self.PM_surface[0][5] + self.PM_surface[180][5]
-        result_dict["Mx_factored"] = self.PM_surface[0][6] + self.PM_surface[180][6]
-        result_dict["My_factored"] = self.PM_surface[0][7] + self.PM_surface[180][7]
-        self.table_PM = pd.DataFrame.from_dict(result_dict)
+        result_dict["Rotation"] = [rotation for rotation, data in self.PM_surface.items() for a in data[0]]
+        for column, i in [("P", 0), ("Mx", 1), ("My", 3), ("NeutralAxis", 2), ("ResistanceFactor", 4),
+                          ("P_factored", 5), ("Mx_factored", 6), ("My_factored", 7)]:
+            result_dict[column] = [x for data in self.PM_surface.values() for x in data[i]]
+        self.table_PM = create_table(result_dict)
+        if profile:
+            self.table_PM.attrs["stats"] = self.stats.summary()
         
         return self.table_PM
-        
-           
+
+
+    def run_fiber_PM_interaction(self, ecu=-0.003, esu=0.05, rotation=(0, 180), N_profile=50, profile=False):
+        """
+        Start PM interaction analysis using the section's fiber materials. Unlike run_PM_interaction(),
+        stresses follow the user-specified stress-strain relationships (e.g. confined Mander core, Multilinear steel)
+        at limiting strain profiles.
+
+        Arguments:
+            ecu             limiting strain of the extreme compression fiber (-ve is compression)
+                                OPTIONAL: default = -0.003
+            esu             limiting strain of the extreme tension node fiber
+                                OPTIONAL: default = 0.05
+            rotation        list of section rotations in degrees (counter clockwise, see mesh()). Compression is
+                            on top of the rotated section. Moments are reported about the rotated axes
+                                OPTIONAL: default = (0, 180)
+            N_profile       number of strain profiles in each of the two pivot regions
+                                OPTIONAL: default = 50
+            profile         flag to collect timing statistics in section.stats (see fkit.profiler)
+                                Use "memory" to also trace peak memory
+                                OPTIONAL: default = False
+
+        Returns:
+            df_result       a dataframe containing all PM interaction analysis results. No resistance factor
+                            is applied (ResistanceFactor = 1.0)
+
+        Algorithm:
+            0.) strain profiles are planes through a pivot at each rotation:
+                    steel pivot: extreme tension node fiber at esu, extreme compression fiber from esu to ecu
+                                 (uniform tension to balanced failure)
+                    concrete pivot: extreme compression fiber at ecu, extreme tension vertex from balanced
+                                 failure to ecu (uniform compression)
+            1.) each profile is converted to a section deformation [eps0, kx, ky] (see evaluate_strain_plane())
+            2.) all profiles of all rotations are evaluated at once (see fkit.compiled). Fiber strains form a
+                (profiles x fibers) matrix, each material evaluates all of its columns in one call, and P, Mx, My
+                are reduced with matrix products
+
+        Please Note:
+            Sign convention is +P = tension, -P = compression (see run_PM_interaction())
+            Materials listed in material_tables are evaluated through their tables (see tabulate_materials())
+        """
+        self.stats = create_stats(profile, "run_fiber_PM_interaction", self)
+        stats = self.stats or NULL_STATS
+        stats.start()
+        time_start = time.time()
+
+        # limiting strain profiles: strain at depth d below the extreme compression fiber = e_top + k*d
+        deformation = []
+        geometry = []
+        for angle in rotation:
+            stats.new_step()
+            with stats.timer("bookkeeping"):
+                rad = math.radians(angle)
+                fiber_r = self.fiber_ecc[:,1]*math.cos(rad) - self.fiber_ecc[:,0]*math.sin(rad)
+                vertex_r = self.vertex_ecc[:,1]*math.cos(rad) - self.vertex_ecc[:,0]*math.sin(rad)
+                r_top = vertex_r.min()
+                h = vertex_r.max() - r_top
+                d_steel = fiber_r[self.N_patch:].max() - r_top if self.N_patch < len(fiber_r) else h
+
+                e_top = np.linspace(esu, ecu, N_profile + 1)[:-1]
+                k_steel = (esu - e_top) / d_steel
+                e_bottom = np.linspace(ecu + (esu - ecu)*h/d_steel, ecu, N_profile)
+                k_concrete = (e_bottom - ecu) / h
+                e_top = np.concatenate([e_top, np.full(N_profile, ecu)])
+                k = np.concatenate([k_steel, k_concrete])
+
+                deformation.append(np.column_stack([e_top - k*r_top, k*math.cos(rad), -k*math.sin(rad)]))
+                geometry.append([angle, rad, e_top, k, d_steel])
+
+        deformation = np.concatenate(deformation)
+        stats.count_residual(len(deformation))
+        with stats.timer("stress"):
+            forces = self.compile().evaluate(deformation)
+
+        # moments about the rotated axes
+        self.PM_surface = {}
+        start = 0
+        for angle, rad, e_top, k, d_steel in geometry:
+            N, Mx, My = forces[start:start + len(k)].T
+            start += len(k)
+            Mx_rotated = Mx*math.cos(rad) - My*math.sin(rad)
+            My_rotated = My*math.cos(rad) + Mx*math.sin(rad)
+            with np.errstate(divide="ignore"):
+                NA_depth = np.where(k > 0, -e_top/k, -np.inf*np.sign(e_top))
+            resistance_factor = np.ones(len(k))
+            self.PM_surface[angle] = [N.tolist(), Mx_rotated.tolist(), NA_depth.tolist(), My_rotated.tolist(),
+                                      resistance_factor.tolist(), N.tolist(), Mx_rotated.tolist(), My_rotated.tolist()]
+
+        self.PM_solved = True
+        time_end = time.time()
+        stats.stop()
+        logger.info("Fiber PM interaction analysis completed. Elapsed time: %.2f seconds", time_end - time_start)
+
+        # compile a result_dict to return
+        result_dict = dict()
+        result_dict["Rotation"] = [angle for angle in rotation for a in self.PM_surface[angle][0]]
+        result_dict["P"] = [a for angle in rotation for a in self.PM_surface[angle][0]]
+        result_dict["Mx"] = [a for angle in rotation for a in self.PM_surface[angle][1]]
+        result_dict["My"] = [a for angle in rotation for a in self.PM_surface[angle][3]]
+        result_dict["NeutralAxis"] = [a for angle in rotation for a in self.PM_surface[angle][2]]
+        result_dict["ResistanceFactor"] = [a for angle in rotation for a in self.PM_surface[angle][4]]
+        result_dict["P_factored"] = result_dict["P"]
+        result_dict["Mx_factored"] = result_dict["Mx"]
+        result_dict["My_factored"] = result_dict["My"]
+        result_dict["Curvature"] = [a for g in geometry for a in g[3]]
+        result_dict["StrainTop"] = [a for g in geometry for a in g[2]]
+        result_dict["StrainSteel"] = [a for g in geometry for a in g[2] + g[3]*g[4]]
+        self.table_PM = create_table(result_dict)
+        if profile:
+            self.table_PM.attrs["stats"] = self.stats.summary()
+
+        return self.table_PM
+
+
     def get_appropriate_NA(self, fy, fpc, Es, beta, alpha):
         """
         generate neutral axis depths in 4 distinct regions
@@ -534,10 +1490,7 @@ class Section:
             4. fs=0 to pure compression
         """
         # find rebar with largest depth
-        greatest_depth = 0
-        for f in self.node_fibers:
-            if f.depth > greatest_depth:
-                greatest_depth = f.depth
+        greatest_depth = self.fiber_depth[self.N_patch:].max(initial=0)
         
         # c where fs = fy
         ey = fy / Es
@@ -548,31 +1501,16 @@ class Section:
         
         # c where section in pure bending
         # root finding usually can't get exactly 0 due to fineness of mesh
-        # instead, let's interpolate linearly P and NA
-        def root_func(c_guess):
-            sumF=0
-            for f in self.patch_fibers:
-                F,_,_ = f.interaction_ACI(beta*c_guess, alpha*fpc) 
-                sumF += F
-            for f in self.node_fibers:
-                F,_,_ = f.interaction_ACI(c_guess, fy, fpc, Es) 
-                sumF += F
-            return sumF
-        
+        # instead, let's march c in increments of depth/100 and interpolate linearly P and NA
         increment = self.depth/100
-        is_net_tension = True
-        c_list = []
-        P_list = []
-        c_current = increment
-        while is_net_tension:
-            P = root_func(c_current)
-            P_list.append(P)
-            c_list.append(c_current)
-            c_current += increment
-            if P < 0:
-                is_net_tension = False
-        
-        c_pure_bending = c_list[-2] + (c_list[-1] - c_list[-2])/(P_list[-2] - P_list[-1]) * P_list[-2]
+        c_list = increment * np.arange(1, 101)
+        P_list = self.get_ACI_resultant(c_list, fpc, fy, Es, alpha, beta)[:,0]
+        while not (P_list < 0).any():
+            c_list = increment * np.arange(1, len(c_list) + 101)
+            P_list = self.get_ACI_resultant(c_list, fpc, fy, Es, alpha, beta)[:,0]
+        i = max(np.argmax(P_list < 0), 1)
+        
+        c_pure_bending = c_list[i-1] + (c_list[i] - c_list[i-1])/(P_list[i-1] - P_list[i]) * P_list[i-1]
         
         # create NA points
         NA_depths1 = list(np.linspace(0.01, c_pure_bending, 10))
@@ -583,53 +1521,52 @@ class Section:
         return NA_depth
     
     
-    def get_PM_data(self, NA_depth, fpc, fy, Es, ey, alpha, beta):
+    def get_ACI_resultant(self, NA_depth, fpc, fy, Es, alpha, beta, flip=False):
+        """
+        Section resultants per ACI 318 assumptions at an array of neutral axis depths
+            concrete        uniform stress alpha*fpc over a block of depth beta*c (see get_stress_block())
+            rebar           elastic-perfectly-plastic. Bars in compression displace concrete (see nodefiber.interaction_ACI)
+            flip            evaluate the section rotated by 180 degrees (compression at the bottom).
+                            Fiber depths become depth - fiber_depth and eccentricities change sign
+                                OPTIONAL: default = False
+        Returns:
+            forces          array of [P, Mx, My]. Shape = (N_depth, 3)
+        """
+        stats = self.stats or NULL_STATS
+        stats.count_residual(len(NA_depth))
+        c = np.asarray(NA_depth, dtype=float)[:,None]
+        depth = self.fiber_depth[self.N_patch:]
+        ecc = self.fiber_ecc[self.N_patch:]
+        if flip:
+            depth, ecc = self.depth - depth, -ecc
+        with stats.timer("stress"):
+            concrete = -alpha*fpc * self.get_stress_block(beta*c[:,0], flip=flip)
+            strain = 0.003*(depth - c)/c
+            stress = np.clip(strain*Es, -fy, fy) + np.where(strain > 0, 0.0, 0.85*fpc)
+        with stats.timer("summation"):
+            force = stress * self.fiber_area[self.N_patch:]
+            rebar = np.column_stack([force.sum(axis=1), force @ ecc[:,1], force @ ecc[:,0]])
+        return concrete + rebar
+    
+    
+    def get_PM_data(self, NA_depth, fpc, fy, Es, ey, alpha, beta, flip=False):
         """
         Internal method used by run_interaction for getting P,Mx,My points at various
-        neutral axis depths
-        """
-        P = []
-        Mx = []
-        My = []
-        resistance_factor = []
-        for c in NA_depth:
-            sumF = 0
-            sumMx = 0
-            sumMy = 0
-            greatest_depth = 0
-            for f in self.patch_fibers:
-                F,Mxi,Myi = f.interaction_ACI(beta*c, alpha*fpc) 
-                sumF += F
-                sumMx += Mxi
-                sumMy += Myi
-            for f in self.node_fibers:
-                F,Mxi,Myi = f.interaction_ACI(c, fy, fpc, Es) 
-                sumF += F
-                sumMx += Mxi
-                sumMy += Myi
-                if f.depth > greatest_depth:
-                    greatest_depth = f.depth
-            
-            # calculate phi factor per ACI
-            et = 0.003*(greatest_depth - c)/c
-            
-            if et>=ey+0.003:
-                phi = 0.9
-            elif et>=ey and et<ey+0.003:
-                phi = 0.75 + 0.15*(et-ey)/((ey+0.003)-ey)
-            elif et<ey:
-                phi = 0.65
-                
-            P.append(sumF)
-            Mx.append(sumMx)
-            My.append(sumMy)
-            resistance_factor.append(phi)
-            
-        phi_P = [a*b for a,b in zip(resistance_factor,P)]
-        phi_Mx = [a*b for a,b in zip(resistance_factor,Mx)]
-        phi_My = [a*b for a,b in zip(resistance_factor,My)]
+        neutral axis depths. All depths are evaluated at once (see get_ACI_resultant())
+            flip        evaluate the section rotated by 180 degrees (compression at the bottom)
+                            OPTIONAL: default = False
+        """
+        P, Mx, My = self.get_ACI_resultant(NA_depth, fpc, fy, Es, alpha, beta, flip=flip).T
+        
+        # calculate phi factor per ACI
+        depth = self.fiber_depth[self.N_patch:]
+        greatest_depth = (self.depth - depth if flip else depth).max(initial=0)
+        c = np.asarray(NA_depth, dtype=float)
+        et = 0.003*(greatest_depth - c)/c
+        resistance_factor = np.where(et >= ey+0.003, 0.9, np.where(et >= ey, 0.75 + 0.15*(et-ey)/((ey+0.003)-ey), 0.65))
         
-        return [P,Mx,NA_depth,My,resistance_factor, phi_P, phi_Mx, phi_My]
+        return [P.tolist(), Mx.tolist(), list(NA_depth), My.tolist(), resistance_factor.tolist(),
+                (resistance_factor*P).tolist(), (resistance_factor*Mx).tolist(), (resistance_factor*My).tolist()]
         
         
     
@@ -646,33 +1583,427 @@ class Section:
                 j=j+1
             output_dir = os.path.join(parent_dir,result_folder)
             os.makedirs(output_dir)
-            print("Results to be exported to folder: {}".format(output_dir))
+            logger.info("Results to be exported to folder: %s", output_dir)
         else:
             output_dir = os.path.join(parent_dir,result_folder)
             os.makedirs(output_dir)
-            print("Results to be exported to folder: {}".format(output_dir))
+            logger.info("Results to be exported to folder: %s", output_dir)
         
         self.folder_created = True
         self.output_dir = output_dir
         
     
-    def export_data(self):
+    def export_data(self, file_format="csv", compression=None):
         """
-        Export results to csv files.
+        Export results to files.
+        Arguments:
+            file_format     "csv", "parquet", "feather", or "npz"
+                                OPTIONAL: default = "csv"
+            compression     compression of binary formats. e.g. "snappy" or "zstd" for parquet, "lz4" or "zstd" for feather.
+                                Any truthy value for npz.
+                                OPTIONAL: default = None
+        
+        Binary formats also export the full fiber strain history (see load_data()):
+            fiber_strain_history.npy    float32 array of shape (N_fiber, N_step). Patch fibers first, then node fibers
+                                            stored as fiber_strain_history.npz if compression is specified (cannot be memory-mapped)
+            fiber_geometry.npz          fiber_area, fiber_ecc, and N_patch_fiber to identify fibers
         """
+        if file_format not in TABLE_FORMATS:
+            raise ValueError("Unknown file format: {}. Use csv, parquet, feather, or npz".format(file_format))
+        
         # create folder
         if not self.folder_created:
             self.create_output_folder()
         
-        # export data to csv
-        if self.MK_solved:
-            filename = os.path.join(self.output_dir, "moment_curvature.csv")
-            self.table_MK.to_csv(filename)
-            
-        if self.PM_solved:
-            filename = os.path.join(self.output_dir, "interaction.csv")
-            self.table_PM.to_csv(filename)
-                
+        # export tables
+        tables = {"moment_curvature": self.table_MK if self.MK_solved else None,
+                  "interaction": self.table_PM if self.PM_solved else None,
+                  "moment_curvature_surface": self.table_MK_surface if self.MK_surface_solved else None}
+        for name, table in tables.items():
+            if table is None:
+                continue
+            remove_files(os.path.join(self.output_dir, name), TABLE_FORMATS)
+            filename = os.path.join(self.output_dir, name + "." + file_format)
+            if file_format == "csv":
+                table.to_csv(filename)
+            elif file_format == "parquet":
+                table.to_parquet(filename, compression=compression)
+            elif file_format == "feather":
+                table.to_feather(filename, compression=compression)
+            else:
+                savez = np.savez_compressed if compression else np.savez
+                savez(filename, **{column: table[column].to_numpy() for column in table.columns})
+        
+        # export fiber strain history. A history left from an earlier export would not match the new results
+        remove_files(os.path.join(self.output_dir, "fiber_strain_history"), ["npy", "npz"])
+        remove_files(os.path.join(self.output_dir, "fiber_geometry"), ["npz"])
+        fibers = self.patch_fibers + self.node_fibers
+        if file_format != "csv" and len(fibers) > 0 and len(fibers[0].strain) > 0:
+            strain_history = np.array([f.strain for f in fibers], dtype=np.float32)
+            if compression:
+                np.savez_compressed(os.path.join(self.output_dir, "fiber_strain_history.npz"), strain=strain_history)
+            else:
+                np.save(os.path.join(self.output_dir, "fiber_strain_history.npy"), strain_history)
+            np.savez(os.path.join(self.output_dir, "fiber_geometry.npz"),
+                     fiber_area=self.fiber_area, 
+                     fiber_ecc=self.fiber_ecc, 
+                     N_patch_fiber=len(self.patch_fibers))
+    
+    
+    def save(self, path, include_results=False):
+        """
+        Save a meshed section to a folder in a compact array-based format that can be reloaded
+        with Section.load() without re-meshing.
+        Arguments:
+            path                folder to save to. Created if it does not exist
+            include_results     flag to also save analysis results and fiber strain history
+                                    OPTIONAL: default = False
+        
+        Files:
+            section.json        section properties
+            materials.pkl       pickled material objects
+            *.npy               fiber geometry, tags, and material ids
+            results_*           analysis results (if include_results = True)
+        
+        Note:
+            Materials are unpickled when loading, so user-defined fiber classes must be importable
+            and saved folders should only be loaded from trusted sources.
+        """
+        os.makedirs(path, exist_ok=True)
+        
+        # section properties and materials
+        header = {"N_bar": self.N_bar,
+                  "N_fiber": self.N_fiber,
+                  "area": self.area,
+                  "centroid": list(self.centroid),
+                  "ymax": self.ymax,
+                  "depth": self.depth}
+        materials = [copy.copy(material) for material in self.materials]
+        for material in materials:
+            material.strain = []
+            material.color_list = []
+        with open(os.path.join(path, "materials.pkl"), "wb") as f:
+            pickle.dump(materials, f)
+        
+        # fiber geometry
+        arrays = {"patch_vertices": np.array([f.vertices for f in self.patch_fibers], dtype=float).reshape(-1,5,2),
+                  "patch_centroid": np.array([f.centroid for f in self.patch_fibers], dtype=float).reshape(-1,2),
+                  "node_coord": np.array([f.coord for f in self.node_fibers], dtype=float).reshape(-1,2),
+                  "tag": np.array([f.tag for f in self.patch_fibers + self.node_fibers], dtype=int),
+                  "mat_id": np.array([f.mat_id for f in self.patch_fibers + self.node_fibers], dtype=int),
+                  "fiber_area": self.fiber_area,
+                  "fiber_ecc": self.fiber_ecc,
+                  "fiber_depth": self.fiber_depth,
+                  "vertex_ecc": self.vertex_ecc}
+        
+        # analysis results
+        if include_results:
+            header["axial"] = self.axial
+            header["PM_surface"] = self.PM_surface
+            header["MK_solved"] = self.MK_solved
+            header["PM_solved"] = self.PM_solved
+            header["MK_surface_solved"] = self.MK_surface_solved
+            tables = {"results_MK": self.table_MK, "results_PM": self.table_PM, "results_MK_surface": self.table_MK_surface}
+            for name, table in tables.items():
+                if table is not None:
+                    np.savez(os.path.join(path, name + ".npz"), **{column: table[column].to_numpy() for column in table.columns})
+            if self.MK_surface_solved:
+                np.savez(os.path.join(path, "results_MK_surface_arrays.npz"), **self.MK_surface)
+            fibers = self.patch_fibers + self.node_fibers
+            if len(fibers) > 0 and len(fibers[0].strain) > 0:
+                arrays["strain_history"] = np.array([f.strain for f in fibers], dtype=float)
+        
+        with open(os.path.join(path, "section.json"), "w") as f:
+            json.dump(header, f, indent=4, default=json_default)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), array)
+    
+    
+    @classmethod
+    def load(cls, path, build_fibers=True, mmap=True):
+        """
+        Load a section saved with Section.save(). Fiber arrays are memory-mapped so that worker
+        processes can share a large mesh without re-meshing or pickling fiber objects.
+        Arguments:
+            path                folder saved by Section.save()
+            build_fibers        flag to re-create patch and node fiber objects. Fiber objects are required by 
+                                    run_moment_curvature() and plotting. The vectorized solvers (run_biaxial_moment_curvature,
+                                    run_MK_surface, evaluate_strain_plane, PM interaction) only need fiber arrays and can
+                                    run with build_fibers=False
+                                    OPTIONAL: default = True
+            mmap                flag to memory-map arrays (read-only) rather than reading them into memory
+                                    OPTIONAL: default = True
+        Returns:
+            section             a meshed section object
+        """
+        with open(os.path.join(path, "section.json")) as f:
+            header = json.load(f)
+        def load_array(name):
+            return np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if mmap else None)
+        
+        section = cls()
+        section.N_bar = header["N_bar"]
+        section.N_fiber = header["N_fiber"]
+        section.area = header["area"]
+        section.centroid = header["centroid"]
+        section.ymax = header["ymax"]
+        section.depth = header["depth"]
+        
+        # restore materials
+        with open(os.path.join(path, "materials.pkl"), "rb") as f:
+            section.materials = pickle.load(f)
+        
+        # restore fiber arrays
+        section.fiber_area = load_array("fiber_area")
+        section.fiber_ecc = load_array("fiber_ecc")
+        section.fiber_depth = load_array("fiber_depth")
+        section.vertex_ecc = load_array("vertex_ecc")
+        section.N_patch = len(load_array("patch_vertices"))
+        mat_id = load_array("mat_id")
+        for i, material in enumerate(section.materials):
+            indices = np.flatnonzero(mat_id == i)
+            if len(indices) > 0:
+                section.material_groups.append([material, indices])
+        section.build_stress_block_index()
+        
+        # restore fiber objects
+        if build_fibers:
+            tag = load_array("tag")
+            patch_vertices = load_array("patch_vertices")
+            patch_centroid = load_array("patch_centroid")
+            node_coord = load_array("node_coord")
+            N_patch = len(patch_vertices)
+            for i in range(len(mat_id)):
+                fiber = copy.copy(section.materials[mat_id[i]])
+                fiber.mat_id = int(mat_id[i])
+                fiber.tag = int(tag[i])
+                fiber.area = float(section.fiber_area[i])
+                fiber.ecc = section.fiber_ecc[i].tolist()
+                fiber.depth = float(section.fiber_depth[i])
+                fiber.strain = []
+                fiber.color_list = []
+                if i < N_patch:
+                    fiber.vertices = list(np.array(patch_vertices[i]))
+                    fiber.centroid = np.array(patch_centroid[i])
+                    section.patch_fibers.append(fiber)
+                else:
+                    fiber.coord = np.array(node_coord[i-N_patch])
+                    section.node_fibers.append(fiber)
+        
+        # restore results
+        if "axial" in header:
+            section.axial = header["axial"]
+            section.PM_surface = {int(k): v for k, v in header["PM_surface"].items()}
+            section.MK_solved = header["MK_solved"]
+            section.PM_solved = header["PM_solved"]
+            section.MK_surface_solved = header["MK_surface_solved"]
+            tables = dict()
+            for name in ["results_MK", "results_PM", "results_MK_surface"]:
+                filename = os.path.join(path, name + ".npz")
+                if os.path.isfile(filename):
+                    with np.load(filename) as npz:
+                        tables[name] = create_table({column: npz[column] for column in npz.files})
+            section.table_MK = tables.get("results_MK")
+            section.table_PM = tables.get("results_PM")
+            section.table_MK_surface = tables.get("results_MK_surface")
+            if section.table_MK is not None:
+                section.curvature = section.table_MK["Curvature"].tolist()
+                section.momentx = section.table_MK["Moment"].tolist()
+                section.neutral_axis = section.table_MK["NeutralAxis"].tolist()
+                section.momenty = section.table_MK["MinorAxisMoment"].tolist()
+                section.K_tangent = section.table_MK["Slope"].tolist()
+                if "EA" in section.table_MK:
+                    K = section.table_MK[["EA","ESx","ESy","ESx","EIx","EIxy","ESy","EIxy","EIy"]].to_numpy()
+                    section.K_section = list(K.reshape(-1,3,3))
+                if "NeutralAxisAngle" in section.table_MK:
+                    section.neutral_axis_angle = section.table_MK["NeutralAxisAngle"].tolist()
+            if section.MK_surface_solved:
+                with np.load(os.path.join(path, "results_MK_surface_arrays.npz")) as npz:
+                    section.MK_surface = {k: npz[k] for k in npz.files}
+                if len(section.MK_surface["P"]) > 1:
+                    section.MK_interpolator = SurfaceInterpolator(section.MK_surface["P"], section.MK_surface["Curvature"], section.MK_surface["Moment"])
+            if build_fibers and os.path.isfile(os.path.join(path, "strain_history.npy")):
+                strain_history = load_array("strain_history")
+                stress_history = section.get_fiber_stress(np.asarray(strain_history).T).T
+                for f, strain, stress in zip(section.patch_fibers + section.node_fibers, strain_history.tolist(), stress_history.tolist()):
+                    f.strain = strain
+                    f.color_list = [f.color_map(e, s) for e, s in zip(strain, stress)]
+        return section
+
+
+
+
+
+def load_data(folder):
+    """
+    Load results exported by Section.export_data().
+    Arguments:
+        folder          export folder
+    Returns:
+        data            a dictionary containing:
+                            "moment_curvature", "interaction", "moment_curvature_surface": result tables (if exported)
+                            "fiber_strain_history": array of shape (N_fiber, N_step). Memory-mapped (read-only) unless
+                                exported with compression, such that selective reads (e.g. data["fiber_strain_history"][[3,10]])
+                                do not load the full history into memory
+                            "fiber_area", "fiber_ecc", "N_patch_fiber": fiber geometry
+    """
+    import pandas as pd
+    data = dict()
+    for name in ["moment_curvature", "interaction", "moment_curvature_surface"]:
+        filename = get_latest_file(os.path.join(folder, name), TABLE_FORMATS)
+        if filename is None:
+            continue
+        if filename.endswith(".parquet"):
+            data[name] = pd.read_parquet(filename)
+        elif filename.endswith(".feather"):
+            data[name] = pd.read_feather(filename)
+        elif filename.endswith(".npz"):
+            with np.load(filename) as npz:
+                data[name] = create_table({column: npz[column] for column in npz.files})
+        else:
+            data[name] = pd.read_csv(filename, index_col=0)
+    
+    filename = get_latest_file(os.path.join(folder, "fiber_strain_history"), ["npy", "npz"])
+    if filename is not None and filename.endswith(".npy"):
+        data["fiber_strain_history"] = np.load(filename, mmap_mode="r")
+    elif filename is not None:
+        with np.load(filename) as npz:
+            data["fiber_strain_history"] = npz["strain"]
+    
+    filename = os.path.join(folder, "fiber_geometry.npz")
+    if os.path.isfile(filename):
+        with np.load(filename) as npz:
+            data["fiber_area"] = npz["fiber_area"]
+            data["fiber_ecc"] = npz["fiber_ecc"]
+            data["N_patch_fiber"] = int(npz["N_patch_fiber"])
+    return data
+
+
+
+
+
+def get_latest_file(filename, extensions):
+    """most recently written of filename.<extension> for the given extensions. None if none exist"""
+    candidates = [filename + "." + extension for extension in extensions if os.path.isfile(filename + "." + extension)]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def remove_files(filename, extensions):
+    """delete filename.<extension> for the given extensions, e.g. results of an earlier export in another format"""
+    for extension in extensions:
+        if os.path.isfile(filename + "." + extension):
+            os.remove(filename + "." + extension)
+
+
+def json_default(value):
+    """convert numpy values for json.dump(). Other types are not serializable"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+def create_table(result_dict):
+    """
+    Create a result dataframe. pandas is imported on first use to keep fkit import time low.
+    """
+    import pandas as pd
+    return pd.DataFrame.from_dict(result_dict)
+
+
+
+
+def get_tangent_columns(K_section):
+    """
+    Result table columns of a list of section tangent matrices (see Section.get_section_tangent()):
+        EA, ESx, ESy, EIx, EIy, EIxy
+    """
+    K = np.asarray(K_section, dtype=float).reshape(-1,3,3)
+    return {"EA": K[:,0,0],
+            "ESx": K[:,0,1],
+            "ESy": K[:,0,2],
+            "EIx": K[:,1,1],
+            "EIy": K[:,2,2],
+            "EIxy": K[:,1,2]}
+
+
+def get_curvature_history(protocol, d_curvature=None):
+    """
+    Curvature at every step of a cyclic protocol. The path starts from zero and visits each target
+    curvature in order. Each segment is divided into equal increments no larger than d_curvature
+    (default = max(abs(protocol)) / 50)
+    """
+    targets = np.asarray(protocol, dtype=float).ravel()
+    if len(targets) == 0 or np.all(targets == 0):
+        raise ValueError("Cyclic protocol must contain at least one non-zero curvature")
+    if d_curvature is None:
+        d_curvature = np.abs(targets).max() / 50
+    
+    history = []
+    previous = 0.0
+    for target in targets:
+        N_increment = math.ceil(abs(target - previous) / d_curvature)
+        if N_increment > 0:
+            history.append(np.linspace(previous, target, N_increment + 1)[1:])
+        previous = target
+    return np.concatenate(history)
+
+
+def solve_MK_chunk(section, P_list, phi_list):
+    """
+    Uniaxial moment curvature analysis for a list of axial loads. Used by Section.run_MK_surface()
+    and kept at module level so it can be sent to worker processes.
+    
+    Each P level marches up the curvature list using the previous step as initial guess. For all but 
+    the first P level, the guess is corrected by the strain increment found at the neighbouring P level.
+    
+    Returns:
+        dictionary of 2D arrays (len(P_list) x len(phi_list)): "Moment", "NeutralAxis", "MinorAxisMoment", "Converged"
+    """
+    shape = (len(P_list), len(phi_list))
+    results = {"Moment": np.zeros(shape), "NeutralAxis": np.zeros(shape), 
+               "MinorAxisMoment": np.zeros(shape), "Converged": np.zeros(shape, dtype=bool)}
+    eps0 = np.zeros(shape)
+    top = section.vertex_ecc[:,1].min()
+    
+    for i, P in enumerate(P_list):
+        for j, curvature in enumerate(phi_list):
+            if i > 0 and j > 0:
+                # previous step plus the increment found at neighbouring P level
+                x0 = [eps0[i,j-1] + eps0[i-1,j] - eps0[i-1,j-1], 0]
+            elif i > 0:
+                x0 = [eps0[i-1,j], 0]
+            elif j > 0:
+                x0 = [eps0[i,j-1], 0]
+            else:
+                x0 = [0, 0]
+            x, converged, sumF, sumMx, sumMy, strain, stress = section.solve_strain_plane(curvature, P, x0, angle=0)
+            eps0[i,j] = x[0]
+            results["Moment"][i,j] = sumMx
+            results["MinorAxisMoment"][i,j] = sumMy
+            results["NeutralAxis"][i,j] = -x[0]/curvature - top
+            results["Converged"][i,j] = converged
+    return results
+
+
+
+
+class SurfaceInterpolator:
+    """
+    Linear interpolation of moment over the (P, curvature) grid of a moment curvature surface analysis.
+    Unlike a plain scipy RegularGridInterpolator, a grid point that did not converge (NaN) only turns queries 
+    inside its neighbouring cells to NaN. Solved grid points and cells between solved points are always returned.
+    Queries outside the grid return NaN.
+    """
+    def __init__(self, P_list, phi_list, moment):
+        import scipy.interpolate
+        solved = ~np.isnan(moment)
+        self.moment = scipy.interpolate.RegularGridInterpolator((P_list, phi_list), np.where(solved, moment, 0.0), bounds_error=False)
+        self.solved = scipy.interpolate.RegularGridInterpolator((P_list, phi_list), solved.astype(float), bounds_error=False)
+    
+    def __call__(self, xi):
+        """moment at each point of xi = [P, curvature]. Shape = (N_point, 2)"""
+        # weight of solved neighbours sums to 1.0 if no failed neighbour contributes
+        return np.where(self.solved(xi) > 1 - 1e-9, self.moment(xi), np.nan)
 
 
 
@@ -694,11 +2025,10 @@ def secant_method(func, args, x0, x1, tol=1e-4, max_iteration = 100):
         try:
             x_next = x1 - fx1 * (x1 - x0) / (fx1 - fx0)
         except ZeroDivisionError:
-            print("\tError: Division by zero occurred. The method failed.")
+            logger.error("\tError: Division by zero occurred. The method failed.")
             return None
 
         x0, x1 = x1, x_next
 
-    print("\tWarning: Maximum number of iterations reached. The method may not have converged.")
-    print("\tsumF = {:.2f}".format(func(x1,args)))
+    logger.warning("\tWarning: Maximum number of iterations reached. The method may not have converged. sumF = %.2f", func(x1,args))
     return x1
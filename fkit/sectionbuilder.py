@@ -6,8 +6,8 @@ functions to parametrically define commonly used sections
 import fkit.section
 import math
 import numpy as np
-import pandas as pd
 import os
+import csv
 
 
 
@@ -557,14 +557,11 @@ def W_AISC(shape, steel_fiber, mesh_nx=0.5, mesh_ny=0.5):
         mesh_ny         mesh density in the y direction (0 being least dense, 1 being most dense)
                             OPTIONAL: default = 0.5
     """
-    aisc_file = os.path.join(os.path.dirname(__file__), "AISC.csv")
-    df_AISC = pd.read_csv(aisc_file)
-    df_AISC = df_AISC.set_index("section")
-    
-    bf = df_AISC.loc[shape]["bf"]
-    d = df_AISC.loc[shape]["d"]
-    tw = df_AISC.loc[shape]["tw"]
-    tf = df_AISC.loc[shape]["tf"]
+    row = get_AISC_shape(shape)
+    bf = row["bf"]
+    d = row["d"]
+    tw = row["tw"]
+    tf = row["tf"]
     
     return wide_flange(bf, d, tw, tf, steel_fiber, mesh_nx, mesh_ny)
 
@@ -594,14 +591,11 @@ def W_AISC_composite(shape, slab_thickness, slab_width, slab_gap, slab_bar, cove
                                 OPTIONAL: default = 0.5
     """
     # create W fibers
-    aisc_file = os.path.join(os.path.dirname(__file__), "AISC.csv")
-    df_AISC = pd.read_csv(aisc_file)
-    df_AISC = df_AISC.set_index("section")
-    
-    bf = df_AISC.loc[shape]["bf"]
-    d = df_AISC.loc[shape]["d"]
-    tw = df_AISC.loc[shape]["tw"]
-    tf = df_AISC.loc[shape]["tf"]
+    row = get_AISC_shape(shape)
+    bf = row["bf"]
+    d = row["d"]
+    tw = row["tw"]
+    tf = row["tf"]
     sec = wide_flange(bf, d, tw, tf, steel_fiber, mesh_nx, mesh_ny)
     
     # mesh density
@@ -630,10 +624,81 @@ def W_AISC_composite(shape, slab_thickness, slab_width, slab_gap, slab_bar, cove
 
 
 
+# AISC shape registry. Loaded once on first use.
+AISC_FILE = os.path.join(os.path.dirname(__file__), "AISC.csv")
+_AISC_SHAPES = None
+_AISC_INDEX = None
 
 
+def get_AISC_shapes():
+    """
+    Return the AISC wide flange database as a numpy structured array (one record per shape).
+    The csv is parsed once and cached for subsequent calls. Columns with fractional
+    dimension strings (e.g. T, WGi) are kept as strings, all others are floats.
+    
+    Example:
+        shapes = get_AISC_shapes()
+        shapes[shapes["d"] < 24]["section"]
+    """
+    global _AISC_SHAPES, _AISC_INDEX
+    if _AISC_SHAPES is None:
+        with open(AISC_FILE, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        header, rows = rows[0], rows[1:]
+        columns = list(zip(*rows))
+        
+        dtype = []
+        for name, values in zip(header, columns):
+            try:
+                [float(v) for v in values]
+                dtype.append((name, float))
+            except ValueError:
+                dtype.append((name, "U{}".format(max(len(v) for v in values))))
+        
+        _AISC_SHAPES = np.array([tuple(r) for r in rows], dtype=dtype)
+        _AISC_INDEX = {shape: i for i, shape in enumerate(_AISC_SHAPES["section"])}
+    return _AISC_SHAPES
 
 
 
 
+def get_AISC_shape(shape):
+    """
+    Return the database record of an AISC shape (e.g. W14X53). Raises KeyError if shape is not found.
+    Fields are accessed by column name (e.g. record["d"]).
+    """
+    shapes = get_AISC_shapes()
+    return shapes[_AISC_INDEX[shape]]
 
+
+
+
+def filter_AISC_shapes(sort_by="W", **limits):
+    """
+    Vectorized filtering of the AISC shape database.
+        sort_by         column to sort results by (ascending). Set to None to keep database order
+                            OPTIONAL: default = "W" (lightest first)
+        **limits        bounds on any numeric column using suffix _min or _max (inclusive)
+                            example: d_max=24, Zx_min=100
+    Returns:
+        structured array of matching shapes
+    
+    Example:
+        # lightest shape no deeper than 24 in with Zx of at least 200 in^3
+        filter_AISC_shapes(d_max=24, Zx_min=200)[0]["section"]
+    """
+    shapes = get_AISC_shapes()
+    mask = np.ones(len(shapes), dtype=bool)
+    for key, value in limits.items():
+        column, bound = key.rsplit("_", 1)
+        if bound == "min":
+            mask &= shapes[column] >= value
+        elif bound == "max":
+            mask &= shapes[column] <= value
+        else:
+            raise ValueError("Unknown limit: {}. Use suffix _min or _max".format(key))
+    
+    result = shapes[mask]
+    if sort_by is not None:
+        result = result[np.argsort(result[sort_by], kind="stable")]
+    return result
@@ -0,0 +1,115 @@
+"""
+Tabulated stress-strain curves.
+
+Some stress-strain relationships are expensive to evaluate: RambergOsgood solves a Newton problem for
+every fiber, Mander and MenegottoPinto evaluate fractional powers, and user-defined materials without
+a stress_strain_array() override loop over stress_strain() one fiber at a time. tabulate() samples the
+monotonic curve of any material once onto an adaptive strain grid. Evaluation afterwards is a linear
+interpolation (np.interp) whose cost does not depend on the material model.
+
+The grid is refined until linear interpolation is within tol * max(|stress|) of the material curve at
+the quarter points of every interval. Discontinuities (e.g. fracture at emax, concrete cracking) cannot
+be interpolated and are instead bracketed by an interval narrower than min_width.
+
+Use section.tabulate_materials() to evaluate a section's materials through their tables in all monotonic
+analyses (run_moment_curvature, run_biaxial_moment_curvature, solve_strain_plane, etc.). Cyclic analyses
+evaluate hysteretic materials from their own rules.
+
+Example:
+    section.tabulate_materials(tol=1e-4)
+    section.run_moment_curvature(phi_target=0.0005)
+"""
+import numpy as np
+
+
+class TabulatedCurve:
+    """
+    Piecewise linear stress-strain curve sampled from a material
+        name            name of the tabulated material
+        strain          array of strain grid points (increasing)
+        stress          array of stress at each strain grid point
+        tol             requested relative tolerance
+        max_error       largest interpolation error found at the check points of the final grid. Exceeds
+                        tol * max(|stress|) if max_refine passes were not enough
+    Strains outside the grid are evaluated at the closest end of the grid (constant extrapolation)
+    """
+    def __init__(self, name, strain, stress, tol, max_error):
+        self.name = name
+        self.strain = strain
+        self.stress = stress
+        self.tol = tol
+        self.max_error = max_error
+        self.slope = np.diff(stress) / np.diff(strain)
+
+    def stress_strain(self, strain):
+        return float(np.interp(strain, self.strain, self.stress))
+
+    def stress_strain_array(self, strain):
+        return np.interp(strain, self.strain, self.stress)
+
+    def tangent_array(self, strain):
+        """slope of the grid interval containing each strain. Zero outside the grid"""
+        strain = np.asarray(strain, dtype=float)
+        i = np.clip(np.searchsorted(self.strain, strain, side="right") - 1, 0, len(self.slope) - 1)
+        inside = (strain >= self.strain[0]) & (strain <= self.strain[-1])
+        return np.where(inside, self.slope[i], 0.0)
+
+    def __len__(self):
+        return len(self.strain)
+
+    def __repr__(self):
+        return "TabulatedCurve({}: {} points, max error = {:.2e})".format(self.name, len(self), self.max_error)
+
+
+def tabulate(material, tol=1e-3, strain_limit=0.5, N_initial=64, min_width=1e-9, max_refine=60):
+    """
+    Sample the monotonic stress-strain curve of a material onto an adaptive strain grid.
+    Arguments:
+        material        any patch or node fiber material (uses material.stress_strain_array)
+        tol             interpolation tolerance relative to the largest stress on the grid
+                            OPTIONAL: default = 1e-3
+        strain_limit    grid covers strains from -strain_limit to +strain_limit
+                            OPTIONAL: default = 0.5
+        N_initial       number of initial grid points on each side of zero. Spaced geometrically
+                        from 1e-6 to strain_limit so that small strains start with a finer grid
+                            OPTIONAL: default = 64
+        min_width       intervals narrower than this are not refined further (discontinuities)
+                            OPTIONAL: default = 1e-9
+        max_refine      maximum number of refinement passes
+                            OPTIONAL: default = 60
+    Returns:
+        TabulatedCurve
+
+    Algorithm:
+        0.) initial grid: 0 and +/- geometrically spaced strains
+        1.) evaluate the material and the linear interpolation of the grid at the 1/4, 1/2, and 3/4
+            points of every interval
+        2.) intervals where any error exceeds tol * max(|stress|) are split at their midpoint
+        3.) repeat until every interval is within tolerance or narrower than min_width
+    """
+    positive = np.geomspace(1e-6, strain_limit, N_initial)
+    strain = np.concatenate([-positive[::-1], [0.0], positive])
+    stress = np.asarray(material.stress_strain_array(strain), dtype=float)
+
+    t = np.array([0.25, 0.5, 0.75])[:,None]
+    for n in range(max_refine + 1):
+        a, b = strain[:-1], strain[1:]
+        check = a + (b - a) * t
+        exact = np.asarray(material.stress_strain_array(check), dtype=float)
+        error = np.abs(exact - np.interp(check, strain, stress))
+        scale = max(np.abs(stress).max(), np.abs(exact).max(), 1e-12)
+        refine = (error > tol*scale).any(axis=0) & (b - a > min_width)
+        # the last pass only measures the error of the final grid
+        if not refine.any() or n == max_refine:
+            break
+
+        # split intervals at their midpoint. Stress at the midpoint is already known
+        strain = np.concatenate([strain, check[1, refine]])
+        stress = np.concatenate([stress, exact[1, refine]])
+        order = np.argsort(strain, kind="stable")
+        strain, stress = strain[order], stress[order]
+
+    # error of the final grid, excluding unresolvable discontinuities
+    wide = (b - a > min_width)
+    max_error = error[:, wide].max() if wide.any() else 0.0
+    return TabulatedCurve(getattr(material, "name", type(material).__name__), strain, stress, tol, max_error)
@@ -1,5 +1,8 @@
 import fkit
 
+# print analysis status to the console
+fkit.progress.set_verbosity()
+
 """
 #########################################
 Step 1: Define fiber material properties
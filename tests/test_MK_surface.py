@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture(scope="module")
+def section():
+    fkit.progress.set_verbosity(None)
+    section = fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],
+                                              fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+    section.run_MK_surface(phi_target=0.003, P_list=[-200, 0, -100, 50], N_step=30)
+    return section
+
+
+def test_interpolator_reproduces_solved_points(section):
+    surface = section.MK_surface
+    np.testing.assert_allclose(surface["P"], [-200, -100, 0, 50])
+    P, curvature = np.meshgrid(surface["P"], surface["Curvature"], indexing="ij")
+    moment = section.MK_interpolator(np.column_stack([P.ravel(), curvature.ravel()])).reshape(P.shape)
+    np.testing.assert_allclose(moment, surface["Moment"], rtol=1e-12)
+    assert np.array_equal(np.isnan(moment), ~surface["Converged"])
+    assert surface["Converged"].sum() > 0.8 * surface["Converged"].size
+
+    # linear in P between neighbouring levels
+    midpoint = section.MK_interpolator(np.column_stack([np.full(30, -50.0), surface["Curvature"]]))
+    np.testing.assert_allclose(midpoint, 0.5*(surface["Moment"][1] + surface["Moment"][2]), rtol=1e-12)
+
+
+def test_solved_points_are_in_equilibrium(section):
+    surface = section.MK_surface
+    top = section.vertex_ecc[:,1].min()
+    for i, j in zip(*np.nonzero(surface["Converged"])):
+        curvature = surface["Curvature"][j]
+        eps0 = -(surface["NeutralAxis"][i,j] + top) * curvature
+        sumF, sumMx, sumMy, strain, stress = section.evaluate_strain_plane(eps0, curvature)
+        scale = np.sum(np.abs(stress * section.fiber_area)) + abs(surface["P"][i])
+        assert abs(sumF - surface["P"][i]) < 1e-6 * scale
+        np.testing.assert_allclose(sumMx, surface["Moment"][i,j], rtol=1e-9)
+
+
+def test_zero_axial_level_matches_moment_curvature(section):
+    expected = fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],
+                                               fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+    df = expected.run_moment_curvature(phi_target=0.003, N_step=30)
+    np.testing.assert_allclose(df["Curvature"], section.MK_surface["Curvature"])
+    np.testing.assert_allclose(df["Moment"][:20], section.MK_surface["Moment"][2,:20], rtol=1e-3)
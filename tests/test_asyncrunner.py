@@ -0,0 +1,63 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+import fkit
+import fkit.asyncrunner
+
+
+@pytest.fixture
+def section():
+    fkit.progress.set_verbosity(None)
+    return fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],
+                                           fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+
+
+@pytest.fixture
+def executor():
+    fkit.asyncrunner.shutdown()
+    yield fkit.asyncrunner.get_executor(max_workers=1)
+    fkit.asyncrunner.shutdown()
+
+
+def test_submit_and_await(section, executor):
+    result = asyncio.run(fkit.asyncrunner.run_moment_curvature_async(section, phi_target=0.001, N_step=10))
+    assert len(result.table_MK) == 10
+    assert not section.MK_solved
+
+
+def test_cancel_stops_running_job(section, executor):
+    async def main():
+        # about a minute if it ran to the end
+        task = asyncio.create_task(fkit.asyncrunner.run_moment_curvature_async(section, phi_target=0.003, N_step=20000))
+        await asyncio.sleep(1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # the single worker is free again once the cancelled analysis stops
+        return await asyncio.wait_for(fkit.asyncrunner.run_moment_curvature_async(section, phi_target=0.001, N_step=10), timeout=20)
+    assert len(asyncio.run(main()).table_MK) == 10
+
+
+def test_cancelled_PM_job_stops_after_first_orientation(section):
+    cancel_event = threading.Event()
+    cancel_event.set()
+    result = fkit.asyncrunner._run_PM_interaction_job(section, cancel_event, {"fpc": 5, "fy": 60, "Es": 29000})
+    assert not result.PM_solved
+    assert set(result.table_PM["Rotation"]) == {0}
+
+
+def test_export_returns_folder_of_caller(section, executor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    section.run_moment_curvature(phi_target=0.001, N_step=10)
+
+    async def main():
+        first = await fkit.asyncrunner.export_data_async(section)
+        second = await fkit.asyncrunner.export_data_async(section, file_format="npz")
+        return first, second
+    first, second = asyncio.run(main())
+    assert first == second == section.output_dir
+    assert os.path.dirname(first) == str(tmp_path)
+    assert sorted(os.listdir(first)) == ["fiber_geometry.npz", "fiber_strain_history.npy", "moment_curvature.npz"]
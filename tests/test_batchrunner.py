@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+import fkit.batchrunner
+
+
+MANIFEST = {
+    "materials": {"concrete": {"type": "patchfiber.Todeschini", "fpc": 5},
+                  "steel": {"type": "nodefiber.Bilinear", "fy": 60, "fu": 90, "Es": 29000}},
+    "sections": {"col1": {"builder": "rectangular", "width": 12, "height": 12, "cover": 1.5,
+                          "top_bar": [0.6, 2, 1, 0], "bot_bar": [0.6, 2, 1, 0],
+                          "concrete_fiber": "concrete", "steel_fiber": "steel"}},
+}
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_malformed_jobs_do_not_abort_batch(tmp_path, n_workers):
+    jobs = [{"name": "good", "section": "col1", "analysis": "PM_interaction", "options": {"fpc": 5, "fy": 60, "Es": 29000}},
+            {"name": "no_analysis", "section": "col1", "options": {}},
+            {"name": "no_section", "analysis": "PM_interaction", "options": {"fpc": 5, "fy": 60, "Es": 29000}}]
+    manifest = dict(MANIFEST, jobs=jobs)
+    df_summary = fkit.batchrunner.run_batch(manifest, str(tmp_path), n_workers=n_workers)
+
+    assert df_summary["Status"].tolist() == ["success", "failed", "failed"]
+    assert df_summary["Error"][1].startswith("KeyError")
+    assert df_summary["Error"][2].startswith("KeyError")
+    assert os.path.isfile(tmp_path / "good.csv")
+    assert os.path.isfile(tmp_path / "summary.csv")
@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture
+def section():
+    """no concrete fiber crushes (emax) before phi_target. A fiber dropping out makes the residual discontinuous"""
+    fkit.progress.set_verbosity(None)
+    return fkit.sectionbuilder.rectangular(12, 18, 1.5, [0.6, 2, 1, 0], [0.6, 3, 1, 0],
+                                           fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+
+
+def test_biaxial_equilibrium_residual(section):
+    P, moment_ratio = -100, 0.5
+    df = section.run_biaxial_moment_curvature(phi_target=0.001, P=P, N_step=40, moment_ratio=moment_ratio)
+    assert len(df) == 40
+
+    # rebuild each plane of strain from reported neutral axis depth and angle. The first step is skipped:
+    # at very small curvature the moment ratio cannot be met and only axial equilibrium is solved
+    fibers = section.patch_fibers + section.node_fibers
+    for i, row in df.iloc[1:].iterrows():
+        theta = math.radians(row["NeutralAxisAngle"])
+        vertex_depth = section.vertex_ecc[:,1]*math.cos(theta) + section.vertex_ecc[:,0]*math.sin(theta)
+        eps0 = -(row["NeutralAxis"] + vertex_depth.min()) * row["Curvature"]
+        sumF, sumMx, sumMy, strain, stress = section.evaluate_strain_plane(eps0, row["Curvature"]*math.cos(theta), row["Curvature"]*math.sin(theta))
+
+        # same normalization as solve_strain_plane()
+        scale = np.sum(np.abs(stress * section.fiber_area)) + abs(P)
+        assert abs(sumF - P) < 1e-6 * scale
+        assert abs(sumMy - moment_ratio*sumMx) < 1e-6 * scale * section.depth
+        np.testing.assert_allclose([sumMx, sumMy], [row["Moment"], row["MinorAxisMoment"]], rtol=1e-9)
+        np.testing.assert_allclose(strain, [f.strain[i] for f in fibers], atol=1e-15)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture(scope="module")
+def section():
+    fkit.progress.set_verbosity(None)
+    return fkit.sectionbuilder.rectangular_confined(18, 24, 1.5, [0.6, 3, 1, 0], [0.6, 3, 1, 0],
+                                                    fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014),
+                                                    fkit.patchfiber.Todeschini(fpc=5),
+                                                    fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+
+
+@pytest.fixture(scope="module")
+def deformation():
+    rng = np.random.default_rng(0)
+    return np.column_stack([rng.uniform(-0.002, 0.001, 50), rng.uniform(-4e-4, 4e-4, 50), rng.uniform(-4e-4, 4e-4, 50)])
+
+
+def fiber_sum(section, deformation):
+    """[N, Mx, My] summed fiber by fiber with the scalar stress-strain relationship of each fiber"""
+    forces = np.zeros(3)
+    for fiber in section.patch_fibers + section.node_fibers:
+        dx, dy = fiber.ecc
+        force = fiber.stress_strain(deformation[0] + deformation[1]*dy + deformation[2]*dx) * fiber.area
+        forces += [force, force*dy, force*dx]
+    return forces
+
+
+def test_evaluate_matches_fiber_sum(section, deformation):
+    compiled = section.compile()
+    forces = compiled.evaluate(deformation)
+    assert forces.shape == (50, 3)
+    expected = np.array([fiber_sum(section, d) for d in deformation])
+    np.testing.assert_allclose(forces, expected, rtol=1e-9, atol=1e-9 * np.abs(expected).max())
+
+    # single plane and chunked evaluation
+    np.testing.assert_allclose(compiled.evaluate(deformation[3]), forces[3])
+    np.testing.assert_allclose(section.compile(chunk_size=3 * compiled.N_fiber).evaluate(deformation), forces)
+
+
+def test_tangent_matches_section_tangent(section, deformation):
+    forces, K = section.compile().evaluate(deformation[:10], tangent=True)
+    assert K.shape == (10, 3, 3)
+    for d, k in zip(deformation[:10], K):
+        strain = d[0] + d[1]*section.fiber_ecc[:,1] + d[2]*section.fiber_ecc[:,0]
+        np.testing.assert_allclose(k, section.get_section_tangent(strain), rtol=1e-9, atol=1e-9 * np.abs(k).max())
@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+
+import fkit
+
+
+def build_section():
+    fkit.progress.set_verbosity(None)
+    return fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],
+                                           fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+
+
+def test_compressed_export_replaces_earlier_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    section = build_section()
+    section.run_biaxial_moment_curvature(phi_target=0.001, N_step=10)
+    section.export_data("npz")
+    assert os.path.isfile(os.path.join(section.output_dir, "fiber_strain_history.npy"))
+
+    # second run appends to the fiber strain history
+    section.run_biaxial_moment_curvature(phi_target=0.002, N_step=15)
+    section.export_data("npz", compression=True)
+    assert not os.path.isfile(os.path.join(section.output_dir, "fiber_strain_history.npy"))
+
+    data = fkit.section.load_data(section.output_dir)
+    assert data["fiber_strain_history"].shape == (len(section.fiber_area), 25)
+    assert len(data["moment_curvature"]) == 25
+
+
+def test_load_data_prefers_latest_file(tmp_path):
+    old, new = np.zeros((3, 2), dtype=np.float32), np.ones((3, 4), dtype=np.float32)
+    np.save(tmp_path / "fiber_strain_history.npy", old)
+    np.savez_compressed(tmp_path / "fiber_strain_history.npz", strain=new)
+    os.utime(tmp_path / "fiber_strain_history.npy", (1e9, 1e9))
+    data = fkit.section.load_data(str(tmp_path))
+    np.testing.assert_array_equal(data["fiber_strain_history"], new)
@@ -0,0 +1,80 @@
+import numpy as np
+
+import fkit
+
+
+def run_path(material, strain_path):
+    """stress of a single fiber following strain_path. Every step is committed"""
+    state = material.init_state(1)
+    stress = []
+    for strain in strain_path:
+        s, state = material.stress_strain_cyclic(np.array([strain]), state)
+        stress.append(s[0])
+    return np.array(stress)
+
+
+def test_bilinear_unload_reload():
+    steel = fkit.nodefiber.BilinearHysteretic(fy=60, Es=29000, fu=90)
+    Esh = (steel.fu - steel.fy) / (steel.emax - steel.ey)
+    load = np.linspace(0, 0.01, 11)
+    unload = np.linspace(0.01, -0.01, 21)[1:]
+    reload = np.linspace(-0.01, 0.02, 31)[1:]
+    stress = run_path(steel, np.concatenate([load, unload, reload]))
+    stress_load, stress_unload, stress_reload = np.split(stress, [len(load), len(load) + len(unload)])
+
+    # loading follows the backbone
+    np.testing.assert_allclose(stress_load, steel.stress_strain_array(load))
+
+    # unloading is elastic from the reversal point until the stress reaches the lower hardening line
+    upper = lambda e: steel.fy + Esh*(e - steel.ey)
+    lower = lambda e: -steel.fy + Esh*(e + steel.ey)
+    elastic = upper(0.01) + steel.Es*(unload - 0.01)
+    np.testing.assert_allclose(stress_unload, np.maximum(elastic, lower(unload)))
+    assert np.sum(elastic > lower(unload)) == 4
+
+    # reloading is elastic from the most negative point, then follows the upper hardening line
+    elastic = lower(-0.01) + steel.Es*(reload + 0.01)
+    np.testing.assert_allclose(stress_reload, np.minimum(elastic, upper(reload)))
+    np.testing.assert_allclose(stress_reload[-1], steel.stress_strain(0.02))
+
+
+def test_concrete_unload_reload():
+    concrete = fkit.patchfiber.ManderHysteretic(fpc=6, eo=0.004, emax=0.014)
+    load = np.linspace(0, -0.006, 7)
+    unload = np.linspace(-0.006, 0, 7)[1:]
+    reload = np.linspace(0, -0.008, 9)[1:]
+    stress = run_path(concrete, np.concatenate([load, unload, reload]))
+    stress_load, stress_unload, stress_reload = np.split(stress, [len(load), len(load) + len(unload)])
+    np.testing.assert_allclose(stress_load, concrete.stress_strain_array(load))
+
+    # straight line from the most compressive point to the plastic strain, no tension beyond
+    strain_min, stress_min = load[-1], stress_load[-1]
+    x = strain_min / concrete.eo
+    strain_p = concrete.eo * (0.145*x**2 + 0.13*x)
+    assert strain_min < strain_p < 0
+    line = lambda e: np.where(e < strain_p, stress_min * (e - strain_p) / (strain_min - strain_p), 0.0)
+    np.testing.assert_allclose(stress_unload, line(unload))
+
+    # reloading retraces the same line back to the envelope, then follows the envelope
+    on_envelope = reload <= strain_min
+    np.testing.assert_allclose(stress_reload[~on_envelope], line(reload[~on_envelope]))
+    np.testing.assert_allclose(stress_reload[on_envelope], concrete.stress_strain_array(reload[on_envelope]))
+
+
+def test_menegotto_pinto_reversal():
+    steel = fkit.nodefiber.MenegottoPintoHysteretic(fy=60, Es=29000, b=0.02, n=20)
+    load = np.linspace(0, 0.01, 11)
+    unload = np.linspace(0.01, -0.01, 201)[1:]
+    stress = run_path(steel, np.concatenate([load, unload]))
+    stress_load, stress_unload = stress[:len(load)], stress[len(load):]
+
+    # first branch from the origin is the monotonic curve
+    np.testing.assert_allclose(stress_load, steel.stress_strain_array(load))
+
+    # reversal starts with the elastic slope and approaches the lower yield asymptote
+    slope = (stress_unload[0] - stress_load[-1]) / (unload[0] - load[-1])
+    np.testing.assert_allclose(slope, steel.Es, rtol=1e-3)
+    ey = steel.fy / steel.Es
+    asymptote = -steel.fy + steel.b*steel.Es*(unload[-1] + ey)
+    np.testing.assert_allclose(stress_unload[-1], asymptote, rtol=0.02)
+    assert np.all(np.diff(stress_unload) < 0)
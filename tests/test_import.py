@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# importing these eagerly took import time from about 0.14 s (mostly numpy) to about 1.7 s.
+# Wall-clock time depends on the machine, so only the modules that are loaded are checked
+HEAVY_MODULES = ["matplotlib", "pandas", "scipy"]
+STATEMENTS = ["fkit",
+              "fkit.section",
+              "fkit.section, fkit.sectionbuilder, fkit.patchfiber, fkit.nodefiber"]
+
+
+def loaded_modules(statement):
+    """heavy modules loaded by an import statement in a fresh interpreter"""
+    code = ("import json, sys\n"
+            "import {}\n"
+            "print(json.dumps([m for m in {!r} if m in sys.modules]))\n").format(statement, HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("statement", STATEMENTS)
+def test_import_does_not_load_heavy_modules(statement):
+    loaded = loaded_modules(statement)
+    assert loaded == [], "import {} loaded {}".format(statement, loaded)
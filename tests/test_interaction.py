@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture
+def circular_section():
+    """circular section. sectionbuilder.circular() trims patch fibers after meshing"""
+    fkit.progress.set_verbosity(None)
+    steel = fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000)
+    concrete = fkit.patchfiber.Todeschini(fpc=5)
+    return fkit.sectionbuilder.circular(24, 1.5, 12, 0.6, concrete, concrete, steel, mesh_n=0.3)
+
+
+def test_fiber_PM_steel_pivot_circular(circular_section):
+    section = circular_section
+    N_profile = 20
+    df = section.run_fiber_PM_interaction(esu=0.05, rotation=[0], N_profile=N_profile)
+
+    # steel pivot profiles: extreme tension bar reaches esu
+    steel_pivot = df.iloc[:N_profile]
+    bar_depth = section.fiber_depth[section.N_patch:]
+    bar_strain = steel_pivot["StrainTop"].to_numpy() + steel_pivot["Curvature"].to_numpy() * bar_depth.max()
+    np.testing.assert_allclose(bar_strain, 0.05)
+
+    # same capacity point as the direct strain-limit solver
+    row = steel_pivot.iloc[N_profile // 2]
+    result = section.solve_strain_limit(0.05, P=row["P"], fiber="tension")
+    assert result["Converged"]
+    np.testing.assert_allclose(result["Moment"], row["Mx"], rtol=1e-4)
+
+
+
+def test_ACI_PM_circular_matches_baseline(circular_section):
+    """reference values computed with the fiber-by-fiber implementation (baseline da546e7)"""
+    df = circular_section.run_PM_interaction(fpc=5, fy=60, Es=29000)
+    assert len(df) == 72
+    rows = [0, 9, 15, 25, 34, 45, 60]
+    np.testing.assert_allclose(df["P"].to_numpy()[rows], [432.0, 47.015339, -480.621147, -1427.54458, -2237.761554, 47.015339, -1288.252503], rtol=1e-6)
+    np.testing.assert_allclose(df["Mx"].to_numpy()[rows], [0.0, 3636.341108, 6635.849115, 6060.994565, 758.897977, 3636.341108, 6448.806267], rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(df["ResistanceFactor"].to_numpy()[rows], [0.9, 0.9, 0.8484, 0.65, 0.65, 0.9, 0.65], atol=1e-4)
+    np.testing.assert_allclose([df["P"].max(), df["P"].min()], [432.0, -2338.593622], rtol=1e-6)
+    np.testing.assert_allclose([df["Mx"][df["Rotation"] == 0].max(), df["Mx"][df["Rotation"] == 180].max()], [7226.258711, 7226.258711], rtol=1e-6)
+
+@pytest.mark.parametrize("flip", [False, True])
+def test_stress_block_index_circular(circular_section, flip):
+    section = circular_section
+    n = section.N_patch
+    block_depth = np.linspace(-1, section.depth + 1, 200)
+    depth = section.depth - section.fiber_depth[:n] if flip else section.fiber_depth[:n]
+    sign = -1 if flip else 1
+
+    # brute force: mask of patch fibers within the block
+    area = (depth <= block_depth[:,None]) * section.fiber_area[:n]
+    expected = np.column_stack([area.sum(axis=1), sign * area @ section.fiber_ecc[:n,1], sign * area @ section.fiber_ecc[:n,0]])
+    np.testing.assert_allclose(section.get_stress_block(block_depth, flip=flip), expected, atol=1e-9 * section.area * section.depth)
+    np.testing.assert_allclose(section.get_stress_block([section.depth + 1], flip=flip)[0,0], section.area)
@@ -0,0 +1,32 @@
+import numpy as np
+
+import fkit
+import fkit.kernels
+
+
+class DoubledBilinear(fkit.nodefiber.Bilinear):
+    """user subclass overriding the stress-strain relationship of a supported model"""
+    def stress_strain(self, strain):
+        return 2 * super().stress_strain(strain)
+
+    def stress_strain_array(self, strain):
+        return 2 * super().stress_strain_array(strain)
+
+
+def test_get_model_matches_exact_class():
+    steel = fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000)
+    assert fkit.kernels.get_model(steel)[0] == fkit.kernels.BILINEAR
+    assert fkit.kernels.get_model(fkit.nodefiber.BilinearHysteretic(fy=60, Es=29000))[0] == fkit.kernels.BILINEAR
+    assert fkit.kernels.get_model(DoubledBilinear(fy=60, fu=90, Es=29000))[0] == fkit.kernels.UNSUPPORTED
+
+
+def test_subclass_override_is_evaluated(monkeypatch):
+    # run the kernels as pure python functions (numba is optional)
+    monkeypatch.setattr(fkit.kernels, "_compiled", True)
+    fkit.progress.set_verbosity(None)
+    section = fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],
+                                              fkit.patchfiber.Todeschini(fpc=5), DoubledBilinear(fy=60, fu=90, Es=29000))
+    expected = section.evaluate_strain_plane(-0.001, 0.0005)
+    result = fkit.kernels.evaluate_strain_plane(section, -0.001, 0.0005)
+    np.testing.assert_allclose(result[:3], expected[:3], atol=1e-9)
+    np.testing.assert_allclose(result[4], expected[4])
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import fkit
+import fkit.member
+
+
+@pytest.fixture(scope="module")
+def column():
+    fkit.progress.set_verbosity(None)
+    section = fkit.sectionbuilder.rectangular_confined(18, 24, 1.5, [0.6, 3, 1, 0], [0.6, 3, 1, 0],
+                                                       fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014),
+                                                       fkit.patchfiber.Todeschini(fpc=5),
+                                                       fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+    return fkit.member.Member(section, length=120, N_ip=5)
+
+
+def test_pushover_with_axial_load_reaches_target(column):
+    P = -200
+    df = column.run_pushover(target_displacement=6, P=P, N_step=200)
+    assert len(df) == 200
+    np.testing.assert_allclose(df["Displacement"].iloc[-1], 6)
+
+    # post-peak softening is traced
+    assert df["Shear"].iloc[-1] < 0.75 * df["Shear"].max()
+
+    # cantilever equilibrium: M_base = V*L - P*delta
+    np.testing.assert_allclose(df["BaseMoment"], df["Shear"] * 120 - P * df["Displacement"], rtol=1e-6)
+
+    # base section resists the base moment under the applied axial load
+    kappa = np.array(column.ip_curvature)[:,0]
+    eps0 = np.array(column.ip_strain)[:,0]
+    forces = column.compiled.evaluate(np.column_stack([eps0, kappa, np.zeros(len(kappa))]))
+    np.testing.assert_allclose(forces[:,0], P, atol=1e-3)
+    np.testing.assert_allclose(forces[:,1], df["BaseMoment"], rtol=1e-5, atol=1e-2)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture(scope="module")
+def section():
+    fkit.progress.set_verbosity(None)
+    section = fkit.sectionbuilder.rectangular(18, 18, 1.5, [0.6, 3, 1, 0], [0.6, 3, 1, 0],
+                                              fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+    section.run_moment_curvature(phi_target=0.003, P=-100, N_step=100)
+    return section
+
+
+def test_idealize_MK_table(section):
+    df = fkit.postprocessor.idealize_MK([section, section.table_MK], secant_fraction=0.75)
+
+    # first yield requires fiber strain history
+    assert np.isfinite(df["FirstYieldCurvature"][0])
+    assert np.isnan(df["FirstYieldCurvature"][1])
+
+    # dataframe: secant stiffness at 0.75 peak moment
+    table = section.table_MK
+    M_target = 0.75 * table["Moment"].max()
+    phi_target = np.interp(M_target, table["Moment"][:table["Moment"].idxmax() + 1], table["Curvature"][:table["Moment"].idxmax() + 1])
+    np.testing.assert_allclose(df["EI_eff"][1], M_target / phi_target, rtol=1e-6)
+    for column in ["EI_eff", "IdealYieldCurvature", "IdealPlasticMoment", "Ductility"]:
+        assert np.all(np.isfinite(df[column])), column
+
+    # peak and ultimate points do not depend on EI_eff
+    for column in ["PeakMoment", "PeakCurvature", "UltimateCurvature", "UltimateMoment"]:
+        np.testing.assert_allclose(df[column][0], df[column][1])
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+
+def test_import_does_not_configure_console_output():
+    code = ("import logging, fkit.section\n"
+            "logger = logging.getLogger('fkit')\n"
+            "assert logger.propagate\n"
+            "assert all(isinstance(h, logging.NullHandler) for h in logger.handlers)\n"
+            "logging.basicConfig(level=logging.INFO, format='%(name)s:%(message)s')\n"
+            "logging.getLogger('fkit.section').info('hello')\n")
+    result = run_python(code)
+    assert "fkit.section:hello" in result.stderr
+    assert result.stdout == ""
+
+
+def test_set_verbosity_opts_in_to_console_output():
+    code = ("import logging, fkit.section\n"
+            "fkit.progress.set_verbosity()\n"
+            "logging.getLogger('fkit.section').info('hello')\n")
+    result = run_python(code)
+    assert result.stdout == "hello\n"
+
+
+def test_show_progress_prints_for_duration_of_run():
+    code = ("import logging, fkit.section\n"
+            "section = fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],\n"
+            "    fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))\n"
+            "section.run_moment_curvature(phi_target=0.001, N_step=5, show_progress=True)\n"
+            "logger = logging.getLogger('fkit')\n"
+            "assert logger.propagate and logger.level == logging.NOTSET\n"
+            "assert all(isinstance(h, logging.NullHandler) for h in logger.handlers)\n"
+            "section.run_moment_curvature(phi_target=0.001, N_step=5)\n")
+    result = run_python(code)
+    lines = result.stdout.splitlines()
+    assert len([line for line in lines if line.startswith("\tstep")]) == 5
+    assert lines[-1].startswith("Moment-curvature analysis completed")
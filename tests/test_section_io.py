@@ -0,0 +1,31 @@
+import numpy as np
+
+import fkit
+
+
+class ScaledBilinear(fkit.nodefiber.Bilinear):
+    """material with an attribute that is not valid JSON"""
+    def __init__(self, fy, fu, Es, factor):
+        super().__init__(fy=fy, fu=fu, Es=Es)
+        self.factor = np.array(factor)
+
+    def stress_strain(self, strain):
+        return float(self.factor * super().stress_strain(strain))
+
+    def stress_strain_array(self, strain):
+        return self.factor * super().stress_strain_array(strain)
+
+
+def test_save_load_round_trip(tmp_path):
+    fkit.progress.set_verbosity(None)
+    section = fkit.sectionbuilder.rectangular(12, 18, 1.5, [0.6, 2, 1, 0], [0.6, 3, 1, 0],
+                                              fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014),
+                                              ScaledBilinear(fy=60, fu=90, Es=29000, factor=1.1))
+    section.save(tmp_path / "section")
+    loaded = fkit.section.Section.load(tmp_path / "section")
+
+    assert isinstance(loaded.materials[1].factor, np.ndarray)
+    expected = section.run_moment_curvature(phi_target=0.003, N_step=30)
+    result = loaded.run_moment_curvature(phi_target=0.003, N_step=30)
+    np.testing.assert_allclose(result["Moment"], expected["Moment"])
+    np.testing.assert_allclose(result["NeutralAxis"], expected["NeutralAxis"])
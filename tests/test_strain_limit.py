@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture(scope="module")
+def section():
+    fkit.progress.set_verbosity(None)
+    return fkit.sectionbuilder.rectangular(12, 18, 1.5, [0.6, 2, 1, 0], [0.6, 3, 1, 0],
+                                           fkit.patchfiber.Todeschini(fpc=5), fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000))
+
+
+def strain_plane(section, result, angle):
+    """fiber and vertex strains of the plane of strain found by solve_strain_limit()"""
+    theta = math.radians(angle)
+    fiber_r = section.fiber_ecc[:,1]*math.cos(theta) + section.fiber_ecc[:,0]*math.sin(theta)
+    vertex_r = section.vertex_ecc[:,1]*math.cos(theta) + section.vertex_ecc[:,0]*math.sin(theta)
+    eps0 = -(result["NeutralAxis"] + vertex_r.min()) * result["Curvature"]
+    return eps0, theta, eps0 + result["Curvature"]*fiber_r, eps0 + result["Curvature"]*vertex_r
+
+
+@pytest.mark.parametrize("strain_limit, P, fiber, angle", [(-0.003, 0, "compression", 0),
+                                                           (-0.003, -300, "compression", 30),
+                                                           (-0.003, 100, "compression", 90),
+                                                           (0.05, 0, "tension", 0),
+                                                           (0.01, 100, "tension", 45)])
+def test_strain_limit_lands_on_limit(section, strain_limit, P, fiber, angle):
+    result = section.solve_strain_limit(strain_limit, P=P, fiber=fiber, angle=angle)
+    assert result["Converged"]
+    eps0, theta, fiber_strain, vertex_strain = strain_plane(section, result, angle)
+
+    # governing fiber is at the limit and no other fiber of its kind goes beyond it
+    if fiber == "compression":
+        np.testing.assert_allclose(vertex_strain.min(), strain_limit, rtol=1e-9)
+    else:
+        np.testing.assert_allclose(fiber_strain[section.N_patch:].max(), strain_limit, rtol=1e-9)
+
+    # axial equilibrium and reported moments
+    sumF, sumMx, sumMy, strain, stress = section.evaluate_strain_plane(eps0, result["Curvature"]*math.cos(theta), result["Curvature"]*math.sin(theta))
+    scale = np.sum(np.abs(stress * section.fiber_area)) + abs(P)
+    assert abs(sumF - P) < 1e-6 * scale
+    assert abs(result["Axial"] - P) < 1e-6 * scale
+    np.testing.assert_allclose([sumMx, sumMy], [result["Moment"], result["MinorAxisMoment"]], rtol=1e-9, atol=1e-9 * abs(sumMx))
+
+
+def test_unattainable_axial_load_stays_within_curvature_cap(section):
+    # bar strain of 0.01 needs more compression than the section can carry once concrete crushes
+    result = section.solve_strain_limit(0.01, P=-200, fiber="tension", angle=45)
+    assert not result["Converged"]
+    eps0, theta, fiber_strain, vertex_strain = strain_plane(section, result, 45)
+    assert vertex_strain.max() - vertex_strain.min() <= 1.0 + 1e-9
+    np.testing.assert_allclose(fiber_strain[section.N_patch:].max(), 0.01, rtol=1e-9)
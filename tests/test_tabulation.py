@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import fkit
+import fkit.tabulation
+
+
+MATERIALS = [fkit.patchfiber.Todeschini(fpc=5),
+             fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014),
+             fkit.nodefiber.Bilinear(fy=60, fu=90, Es=29000),
+             fkit.nodefiber.RambergOsgood(fy=60, Es=29000, n=25)]
+
+
+class CountingBilinear(fkit.nodefiber.Bilinear):
+    """counts every evaluation of the material model"""
+    calls = 0
+
+    def stress_strain(self, strain):
+        CountingBilinear.calls += 1
+        return super().stress_strain(strain)
+
+    def stress_strain_array(self, strain):
+        CountingBilinear.calls += 1
+        return super().stress_strain_array(strain)
+
+
+@pytest.mark.parametrize("material", MATERIALS, ids=lambda m: type(m).__name__)
+def test_interpolation_error_within_tolerance(material):
+    tol = 1e-4
+    table = fkit.tabulation.tabulate(material, tol=tol, strain_limit=0.2)
+    scale = np.abs(table.stress).max()
+    assert table.max_error <= tol * scale
+
+    # dense sample away from discontinuities (jumps are bracketed by intervals narrower than min_width)
+    strain = np.linspace(-0.2, 0.2, 200_001)
+    error = np.abs(table.stress_strain_array(strain) - material.stress_strain_array(strain))
+    i = np.searchsorted(table.strain, strain)
+    smooth = np.diff(table.strain)[np.clip(i - 1, 0, len(table) - 2)] > 1e-9
+    assert error[smooth].max() <= 2 * tol * scale
+
+
+def test_max_error_measured_on_final_grid():
+    material = fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014)
+    table = fkit.tabulation.tabulate(material, tol=1e-6, max_refine=2)
+
+    # recompute the error at the check points of the returned grid
+    a, b = table.strain[:-1], table.strain[1:]
+    check = a + (b - a) * np.array([0.25, 0.5, 0.75])[:,None]
+    error = np.abs(material.stress_strain_array(check) - table.stress_strain_array(check))
+    np.testing.assert_allclose(table.max_error, error[:, b - a > 1e-9].max())
+    assert table.max_error > 1e-6 * np.abs(table.stress).max()
+
+
+def test_moment_curvature_uses_tables():
+    fkit.progress.set_verbosity(None)
+    def build():
+        return fkit.sectionbuilder.rectangular(12, 12, 1.5, [0.6, 2, 1, 0], [0.6, 2, 1, 0],
+                                               fkit.patchfiber.Todeschini(fpc=5), CountingBilinear(fy=60, fu=90, Es=29000))
+    expected = build().run_moment_curvature(phi_target=0.003, N_step=30)
+
+    section = build()
+    section.tabulate_materials(tol=1e-5)
+    CountingBilinear.calls = 0
+    result = section.run_moment_curvature(phi_target=0.003, N_step=30)
+    assert CountingBilinear.calls == 0
+    np.testing.assert_allclose(result["Moment"], expected["Moment"], rtol=1e-3, atol=1e-3 * expected["Moment"].abs().max())
+    assert len(section.node_fibers[0].strain) == 30
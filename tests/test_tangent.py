@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import fkit
+
+
+@pytest.fixture
+def section():
+    fkit.progress.set_verbosity(None)
+    return fkit.sectionbuilder.rectangular(12, 18, 1.5, [0.6, 2, 1, 0], [0.6, 3, 1, 0],
+                                           fkit.patchfiber.Mander(fpc=6, eo=0.004, emax=0.014),
+                                           fkit.nodefiber.RambergOsgood(fy=60, Es=29000, n=25))
+
+
+@pytest.mark.parametrize("deformation", [[0.0, 1e-5, 0.0], [-0.0005, 2e-4, 5e-5], [-0.001, 4e-4, -1e-4]])
+def test_section_tangent_matches_finite_difference(section, deformation):
+    deformation = np.array(deformation)
+    strain = deformation[0] + deformation[1]*section.fiber_ecc[:,1] + deformation[2]*section.fiber_ecc[:,0]
+    K = section.get_section_tangent(strain)
+    np.testing.assert_allclose(K, K.T, rtol=1e-12, atol=1e-12 * np.abs(K).max())
+
+    # central difference of [N, Mx, My] with respect to [eps0, kx, ky]
+    h = np.array([1e-8, 1e-9, 1e-9])
+    K_fd = np.zeros((3,3))
+    for j in range(3):
+        dx = np.zeros(3)
+        dx[j] = h[j]
+        forward = section.evaluate_strain_plane(*(deformation + dx))[:3]
+        backward = section.evaluate_strain_plane(*(deformation - dx))[:3]
+        K_fd[:,j] = (np.array(forward) - np.array(backward)) / (2*h[j])
+    np.testing.assert_allclose(K, K_fd, rtol=1e-3, atol=1e-3 * np.abs(K).max())
+
+
+def test_moment_curvature_reports_section_tangent(section):
+    df = section.run_moment_curvature(phi_target=0.001, N_step=20)
+    strain = np.array([f.strain for f in section.patch_fibers + section.node_fibers])
+    for i in [1, 10, 19]:
+        K = section.get_section_tangent(strain[:,i])
+        np.testing.assert_allclose(df.loc[i, ["EA", "ESx", "EIx"]].to_numpy(dtype=float), [K[0,0], K[0,1], K[1,1]])